@@ -0,0 +1,330 @@
+import argparse
+import json
+import math
+import sqlite3
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_STORE_FILE = "EMPLOYEE_AGGS.sqlite"
+DEFAULT_KEY = "EmpID"
+DEFAULT_GROUPS = ("Department", "Country")
+DEFAULT_VALUE = "Salary"
+STATS = ("total", "count", "min", "max")
+
+# SQLite's default limit on bound parameters per statement is 999.
+IN_BATCH = 900
+
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def plain(frame):
+    # Python scalars for sqlite3: NaN becomes NULL, numpy ints become int.
+    return frame.astype(object).where(frame.notna(), None)
+
+
+def plain_keys(keys):
+    # Keys as Python scalars, NaN as None. An object column (or a list of
+    # array items) can hold numpy ints, which sqlite3 binds as BLOBs that
+    # match no stored key.
+    return [
+        None if pd.isna(k) else k.item() if isinstance(k, np.generic) else k
+        for k in keys
+    ]
+
+
+class AggregateStore:
+    # Materialized sum/count/min/max of `value` per combination of `groups`,
+    # kept next to a copy of the rows they came from. Deltas adjust the
+    # affected groups only; a group's min or max is re-read from its rows
+    # (through the group index) only when a removed value was the extreme.
+    # Missing group values are stored as "" and left out of the views, like
+    # groupby() leaves out NaN keys.
+
+    def __init__(self, path=DEFAULT_STORE_FILE, key=DEFAULT_KEY,
+                 groups=DEFAULT_GROUPS, value=DEFAULT_VALUE):
+        self.key = key
+        self.groups = list(groups)
+        self.value = value
+        self.columns = [key, *self.groups, value]
+
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (config TEXT)")
+        config = json.dumps({"key": key, "groups": self.groups, "value": value})
+        stored = self._db.execute("SELECT config FROM meta").fetchone()
+        if stored is None:
+            self._create(config)
+        elif stored[0] != config:
+            self._db.close()
+            raise ValueError(f"{path} was built for {stored[0]}")
+
+        self._group_where = " AND ".join(f"{quote(g)} = ?" for g in self.groups)
+
+    def _create(self, config):
+        groups = ", ".join(f"{quote(g)} TEXT" for g in self.groups)
+        group_list = ", ".join(quote(g) for g in self.groups)
+        with self._db:
+            self._db.execute("INSERT INTO meta VALUES (?)", (config,))
+            self._db.execute(
+                f"CREATE TABLE rows ({quote(self.key)} PRIMARY KEY, {groups}, "
+                f"{quote(self.value)} REAL)"
+            )
+            self._db.execute(
+                f"CREATE INDEX rows_groups ON rows ({group_list}, {quote(self.value)})"
+            )
+            self._db.execute(
+                f"CREATE TABLE aggs ({groups}, total REAL, count INTEGER, "
+                f"min REAL, max REAL, PRIMARY KEY ({group_list})) WITHOUT ROWID"
+            )
+
+    def _prepare(self, frame):
+        missing = [c for c in self.columns if c not in frame.columns]
+        if missing:
+            raise ValueError(f"rows are missing columns {missing}")
+        frame = frame[self.columns].drop_duplicates(self.key, keep="last").copy()
+        for group in self.groups:
+            frame[group] = frame[group].astype(object).where(frame[group].notna(), "")
+            frame[group] = frame[group].astype(str)
+        frame[self.value] = pd.to_numeric(frame[self.value], errors="coerce")
+        return frame
+
+    def _stored_rows(self, keys):
+        keys = plain_keys(keys)
+        frames = []
+        for i in range(0, len(keys), IN_BATCH):
+            batch = keys[i:i + IN_BATCH]
+            frames.append(pd.read_sql_query(
+                f"SELECT {', '.join(quote(c) for c in self.columns)} FROM rows "
+                f"WHERE {quote(self.key)} IN ({', '.join('?' * len(batch))})",
+                self._db, params=batch
+            ))
+        if not frames:
+            return pd.DataFrame(columns=self.columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def _group_stats(self, frame):
+        if frame.empty:
+            return {}
+        stats = frame.groupby(self.groups, sort=False)[self.value].agg(
+            total="sum", n="count", low="min", high="max"
+        )
+        return {
+            (key if isinstance(key, tuple) else (key,)): row
+            for key, row in zip(stats.index, stats.itertuples(index=False))
+        }
+
+    def _adjust(self, removed, added):
+        # Fold the removed and added rows into `aggs`; `rows` must already
+        # hold the new state so extremes can be re-read from it.
+        gone = self._group_stats(removed)
+        new = self._group_stats(added)
+        for group in set(gone) | set(new):
+            total, count, low, high = self._db.execute(
+                f"SELECT total, count, min, max FROM aggs WHERE {self._group_where}",
+                group
+            ).fetchone() or (0.0, 0, None, None)
+
+            out, into = gone.get(group), new.get(group)
+            if out is not None:
+                total -= out.total
+                count -= out.n
+            if into is not None:
+                total += into.total
+                count += into.n
+
+            if out is not None and out.n and low is not None and (
+                out.low <= low or out.high >= high
+            ):
+                low, high = self._db.execute(
+                    f"SELECT MIN({quote(self.value)}), MAX({quote(self.value)}) "
+                    f"FROM rows WHERE {self._group_where}", group
+                ).fetchone()
+            elif into is not None and into.n:
+                low = into.low if low is None else min(low, into.low)
+                high = into.high if high is None else max(high, into.high)
+
+            if count <= 0:
+                self._db.execute(f"DELETE FROM aggs WHERE {self._group_where}", group)
+            else:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO aggs VALUES "
+                    f"({', '.join('?' * (len(self.groups) + 4))})",
+                    (*group, float(total), int(count), float(low), float(high))
+                )
+
+    def upsert(self, frame):
+        # Insert new employees and replace existing ones by key.
+        frame = self._prepare(frame)
+        if frame.empty:
+            return 0
+        with self._db:
+            old = self._prepare(self._stored_rows(frame[self.key]))
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO rows VALUES ({', '.join('?' * len(self.columns))})",
+                plain(frame).itertuples(index=False, name=None)
+            )
+            self._adjust(old, frame)
+        return len(frame)
+
+    insert = update = upsert
+
+    def delete(self, keys):
+        keys = pd.Series(plain_keys(keys), dtype=object).drop_duplicates()
+        with self._db:
+            old = self._prepare(self._stored_rows(keys))
+            params = plain(old[[self.key]]).itertuples(index=False, name=None)
+            self._db.executemany(
+                f"DELETE FROM rows WHERE {quote(self.key)} = ?", params
+            )
+            self._adjust(old, old.iloc[:0])
+        return len(old)
+
+    def apply(self, delta, op="op"):
+        # A delta frame with an `op` column: insert, update or delete.
+        ops = delta[op].str.lower()
+        unknown = set(ops) - {"insert", "update", "delete"}
+        if unknown:
+            raise ValueError(f"unknown delta ops {sorted(unknown)}")
+        deleted = self.delete(delta.loc[ops == "delete", self.key])
+        changed = self.upsert(delta[ops != "delete"])
+        return changed, deleted
+
+    def load(self, frame):
+        # Replace everything with `frame` and aggregate it in one pass.
+        frame = self._prepare(frame)
+        with self._db:
+            self._db.execute("DELETE FROM rows")
+            self._db.execute("DELETE FROM aggs")
+            self._db.executemany(
+                f"INSERT INTO rows VALUES ({', '.join('?' * len(self.columns))})",
+                plain(frame).itertuples(index=False, name=None)
+            )
+            self._db.execute(
+                f"INSERT INTO aggs SELECT {self._select_groups()}, "
+                f"SUM({quote(self.value)}), COUNT({quote(self.value)}), "
+                f"MIN({quote(self.value)}), MAX({quote(self.value)}) "
+                f"FROM rows GROUP BY {self._select_groups()} "
+                f"HAVING COUNT({quote(self.value)}) > 0"
+            )
+        return len(frame)
+
+    def _select_groups(self, groups=None):
+        return ", ".join(quote(g) for g in (groups or self.groups))
+
+    def _check_by(self, by):
+        by = [by] if isinstance(by, str) else list(by or self.groups)
+        unknown = [g for g in by if g not in self.groups]
+        if unknown:
+            raise ValueError(f"not a stored group: {unknown}")
+        return by
+
+    def _query(self, sql, by):
+        frame = pd.read_sql_query(sql, self._db).set_index(by)
+        frame["mean"] = frame["total"] / frame["count"]
+        return frame.sort_index()
+
+    def aggregates(self, by=None):
+        # Roll the stored groups up to `by` (a subset of the groups).
+        by = self._check_by(by)
+        cols = self._select_groups(by)
+        blank = " AND ".join(f"{quote(g)} != ''" for g in by)
+        return self._query(
+            f"SELECT {cols}, SUM(total) AS total, SUM(count) AS count, "
+            f"MIN(min) AS min, MAX(max) AS max FROM aggs WHERE {blank} "
+            f"GROUP BY {cols}", by
+        )
+
+    def recompute(self, by=None):
+        # The same figures straight from the stored rows.
+        by = self._check_by(by)
+        cols = self._select_groups(by)
+        value = quote(self.value)
+        blank = " AND ".join(f"{quote(g)} != ''" for g in by)
+        return self._query(
+            f"SELECT {cols}, SUM({value}) AS total, COUNT({value}) AS count, "
+            f"MIN({value}) AS min, MAX({value}) AS max FROM rows "
+            f"WHERE {blank} GROUP BY {cols} HAVING COUNT({value}) > 0", by
+        )
+
+    def mean(self, by):
+        return self.aggregates(by)["mean"].rename(self.value)
+
+    def pivot(self, index, columns, stat="mean"):
+        # Same shape as pd.pivot_table(values=value, index=..., columns=...).
+        return self.aggregates([index, columns])[stat].unstack(columns)
+
+    def check(self, by=None, tolerance=1e-6):
+        # Groups whose maintained figures differ from a full recompute.
+        kept, fresh = self.aggregates(by), self.recompute(by)
+        if not kept.index.equals(fresh.index):
+            return sorted(set(kept.index) ^ set(fresh.index))
+        bad = []
+        for group, a, b in zip(kept.index, kept.itertuples(), fresh.itertuples()):
+            if (a.count != b.count or a.min != b.min or a.max != b.max
+                    or not math.isclose(a.total, b.total, rel_tol=tolerance)):
+                bad.append(group)
+        return bad
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Incrementally maintained salary aggregates."
+    )
+    parser.add_argument("--store", default=DEFAULT_STORE_FILE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("load", help="rebuild from an employee CSV")
+    load.add_argument("source")
+
+    apply = commands.add_parser(
+        "apply", help="apply a delta CSV with an op column (insert/update/delete)"
+    )
+    apply.add_argument("delta")
+
+    mean = commands.add_parser("mean", help="mean salary per group")
+    mean.add_argument("--by", nargs="+", default=["Country"])
+
+    pivot = commands.add_parser("pivot", help="Department x Country pivot")
+    pivot.add_argument("--stat", choices=("mean", *STATS), default="mean")
+
+    commands.add_parser("check", help="compare with a full recompute")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    with AggregateStore(args.store) as store:
+        if args.command == "load":
+            rows = store.load(pd.read_csv(args.source))
+            print(f"{args.store}: {rows} rows loaded")
+        elif args.command == "apply":
+            changed, deleted = store.apply(pd.read_csv(args.delta))
+            print(f"{changed} rows inserted/updated, {deleted} deleted")
+        elif args.command == "mean":
+            print(store.mean(args.by))
+        elif args.command == "pivot":
+            print(store.pivot("Department", "Country", args.stat))
+        elif args.command == "check":
+            bad = store.check()
+            if bad:
+                raise SystemExit(f"{len(bad)} groups differ: {bad[:10]}")
+            print("aggregates match a full recompute")
+
+
+if __name__ == "__main__":
+    main()
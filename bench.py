@@ -0,0 +1,320 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+
+DEFAULT_BENCH_DIR = "benchmarks"
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_REPEATS = 7
+DEFAULT_WARMUP = 2
+DEFAULT_THRESHOLD = 0.10
+# Calls are batched until one trial takes at least this long, like
+# timeit's autorange, so fast operations are not lost in timer overhead.
+MIN_TRIAL_NS = 2_000_000
+
+# name -> (setup, max_size). setup(size) prepares the inputs and returns the
+# zero-argument callable to time; setup cost is never measured.
+BENCHMARKS = {}
+_scratch = None
+
+
+def benchmark(name, max_size=None):
+    def register(setup):
+        BENCHMARKS[name] = (setup, max_size)
+        return setup
+    return register
+
+
+def scratch(name):
+    # A path in a temporary folder that is removed when the process exits.
+    global _scratch
+    if _scratch is None:
+        _scratch = tempfile.TemporaryDirectory(prefix="bench-")
+    return os.path.join(_scratch.name, name)
+
+
+def employees(size):
+    from frame_io import synthetic_employees
+    df = synthetic_employees(size)
+    df["Department"] = np.random.default_rng(1).choice(["IT", "HR", "Finance"], size)
+    return df
+
+
+@benchmark("python_loop_math", max_size=1_000_000)
+def _python_loop(size):
+    arr = np.random.default_rng(0).random(size)
+    return lambda: [x * 2 for x in arr]
+
+
+@benchmark("vector_math")
+def _vector_math(size):
+    arr = np.random.default_rng(0).random(size)
+    return lambda: arr * 2
+
+
+@benchmark("moving_average")
+def _moving_average(size):
+    data = np.random.default_rng(0).random(size)
+    kernel = np.ones(30) / 30
+    return lambda: np.convolve(data, kernel, mode="valid")
+
+
+@benchmark("rolling_mean")
+def _rolling_mean(size):
+    from rolling import rolling
+    data = np.random.default_rng(0).random(size)
+    return lambda: rolling(data, 30, stats=("mean",))
+
+
+@benchmark("histogram")
+def _histogram(size):
+    values = np.random.default_rng(0).normal(50000, 10000, size)
+    return lambda: np.histogram(values, bins=50)
+
+
+@benchmark("einsum_dot")
+def _einsum(size):
+    rng = np.random.default_rng(0)
+    a, b = rng.random(size), rng.random(size)
+    return lambda: np.einsum("i,i->", a, b)
+
+
+@benchmark("groupby_mean")
+def _groupby(size):
+    df = employees(size)
+    return lambda: df.groupby("Country")["Salary"].mean()
+
+
+@benchmark("pivot_table")
+def _pivot(size):
+    df = employees(size)
+    return lambda: pd.pivot_table(
+        df, values="Salary", index="Department", columns="Country", aggfunc="mean"
+    )
+
+
+@benchmark("band_apply", max_size=1_000_000)
+def _band_apply(size):
+    from comp_rules import DEFAULT_RULES
+    salary = employees(size)["Salary"]
+    return lambda: salary.apply(DEFAULT_RULES.band_scalar)
+
+
+@benchmark("band_vectorized")
+def _band_vectorized(size):
+    from comp_rules import salary_band
+    salary = employees(size)["Salary"]
+    return lambda: salary_band(salary)
+
+
+@benchmark("csv_write")
+def _csv_write(size):
+    df = employees(size)
+    path = scratch("write.csv")
+    return lambda: df.to_csv(path, index=False)
+
+
+@benchmark("csv_read")
+def _csv_read(size):
+    path = scratch("read.csv")
+    employees(size).to_csv(path, index=False)
+    return lambda: pd.read_csv(path)
+
+
+def calibrate(fn):
+    # Smallest power-of-ten call count that fills MIN_TRIAL_NS.
+    number = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            fn()
+        if time.perf_counter_ns() - start >= MIN_TRIAL_NS or number >= 10**6:
+            return number
+        number *= 10
+
+
+def measure(fn, repeats=DEFAULT_REPEATS, warmup=DEFAULT_WARMUP, number=None):
+    """Time fn() after `warmup` untimed calls. Returns per-call times in ns
+    for each of `repeats` trials and the calls batched per trial, which
+    calibrate() picks unless `number` is given."""
+    for _ in range(warmup):
+        fn()
+    if number is None:
+        number = calibrate(fn)
+    trials = []
+    for _ in range(repeats):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            fn()
+        trials.append((time.perf_counter_ns() - start) / number)
+    return trials, number
+
+
+def summarize(trials, number):
+    q1, median, q3 = np.percentile(trials, [25, 50, 75])
+    return {
+        "median_ns": float(median),
+        "q1_ns": float(q1),
+        "q3_ns": float(q3),
+        "iqr_ns": float(q3 - q1),
+        "min_ns": float(min(trials)),
+        "repeats": len(trials),
+        "number": number,
+    }
+
+
+def run(names=None, sizes=DEFAULT_SIZES, repeats=DEFAULT_REPEATS,
+        warmup=DEFAULT_WARMUP, echo=True):
+    results = {}
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            raise KeyError(f"unknown benchmark {name!r}")
+        setup, max_size = BENCHMARKS[name]
+        results[name] = {}
+        for size in sizes:
+            if max_size and size > max_size:
+                continue
+            fn = setup(size)
+            stats = summarize(*measure(fn, repeats, warmup))
+            results[name][str(size)] = stats
+            if echo:
+                print(f"{name:<18} {size:>10} {format_ns(stats['median_ns']):>10} "
+                      f"± {format_ns(stats['iqr_ns'])}")
+    return new_record(results, repeats, warmup)
+
+
+def new_record(results, repeats, warmup):
+    return {
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "repeats": repeats,
+        "warmup": warmup,
+        "results": results,
+    }
+
+
+def write_record(record, path=None):
+    if path is None:
+        os.makedirs(DEFAULT_BENCH_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(DEFAULT_BENCH_DIR, f"bench-{stamp}.json")
+    with open(path, "w") as f:
+        json.dump(record, f, indent=2)
+    return path
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def format_ns(ns):
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    # Returns [(name, size, before, after, change)] for every benchmark
+    # whose median grew by more than `threshold` and by more than the
+    # larger of the two IQRs, so ordinary jitter is not reported.
+    regressions = []
+    for name, sizes in current["results"].items():
+        for size, after in sizes.items():
+            before = baseline["results"].get(name, {}).get(size)
+            if before is None:
+                continue
+            old, new = before["median_ns"], after["median_ns"]
+            spread = max(before["iqr_ns"], after["iqr_ns"])
+            change = (new - old) / old if old else float("inf")
+            if change > threshold and new - old > spread:
+                regressions.append((name, size, old, new, change))
+    return regressions
+
+
+def print_comparison(baseline, current):
+    print(f"{'benchmark':<18} {'size':>10} {'before':>10} {'after':>10} {'change':>8}")
+    for name, sizes in current["results"].items():
+        for size, after in sizes.items():
+            before = baseline["results"].get(name, {}).get(size)
+            if before is None:
+                continue
+            old, new = before["median_ns"], after["median_ns"]
+            change = (new - old) / old if old else float("inf")
+            print(f"{name:<18} {size:>10} {format_ns(old):>10} "
+                  f"{format_ns(new):>10} {change:>+8.0%}")
+
+
+def report(regressions):
+    for name, size, old, new, change in regressions:
+        print(f"REGRESSION {name}[{size}]: {format_ns(old)} -> "
+              f"{format_ns(new)} (+{change:.0%})")
+    if regressions:
+        sys.exit(1)
+    print("No regressions")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="NumPy/pandas step benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="list the benchmarks")
+
+    bench = commands.add_parser("run", help="run benchmarks and save JSON")
+    bench.add_argument("--only", nargs="+", metavar="NAME")
+    bench.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    bench.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    bench.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    bench.add_argument("--output", metavar="PATH",
+                       help="result file (default benchmarks/bench-<time>.json)")
+    bench.add_argument("--baseline", metavar="PATH",
+                       help="compare the new results against this file")
+    bench.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    diff = commands.add_parser(
+        "compare", help="flag benchmarks that regressed against a baseline"
+    )
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                      help="allowed relative growth (default 0.10 = 10%%)")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    if args.command == "list":
+        for name, (_, max_size) in BENCHMARKS.items():
+            print(name + (f" (sizes up to {max_size})" if max_size else ""))
+        return
+
+    if args.command == "run":
+        unknown = set(args.only or ()) - set(BENCHMARKS)
+        if unknown:
+            sys.exit(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+        current = run(args.only, args.sizes, args.repeats, args.warmup)
+        print(f"Results written to {write_record(current, args.output)}")
+        if not args.baseline:
+            return
+        baseline = load(args.baseline)
+    else:
+        baseline, current = load(args.baseline), load(args.current)
+
+    print_comparison(baseline, current)
+    report(compare(baseline, current, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 import subprocess
 import sys
 import os
+import time
+import argparse
+
+import pipeline
+import run_metrics
 
 DEFAULT_IFSC = "SBIN0000001"
 
@@ -14,10 +19,11 @@ def run_script(script_name, args=None):
     if not os.path.exists(script_name):
         raise FileNotFoundError(f"{script_name} not found")
 
-    subprocess.run(
-        [sys.executable, script_name] + args,
-        check=True
-    )
+    command = [sys.executable, script_name] + args
+    returncode, metrics = run_metrics.run_measured(command)
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command)
+    return metrics
 
 
 def ask_ifsc_code():
@@ -27,19 +33,141 @@ def ask_ifsc_code():
     return value or DEFAULT_IFSC
 
 
+def pipeline_steps(ifsc_code):
+    # Only check_missing reads what another step writes; everything else
+    # can run side by side. The local modules each script imports are found
+    # by the build cache, so steps list only their script here.
+    return [
+        {"name": "hello", "script": "hello.py"},
+        {
+            "name": "pandas_basic",
+            "script": "pandas_basic_step.py",
+            "outputs": ["employees.csv", "employees_final.xlsx"],
+        },
+        {
+            "name": "pandas_advance",
+            "script": "pandas_advance_step.py",
+            "outputs": ["employees_final.csv"],
+        },
+        {"name": "numpy_basics", "script": "numpy_basics_step.py"},
+        {"name": "numpy_advance", "script": "numpy_advance_step.py"},
+        {
+            "name": "check_missing",
+            "script": "check_missing.py",
+            "args": ["employees_final.csv"],
+            "inputs": ["employees_final.csv"],
+        },
+        {
+            "name": "ifsc",
+            "script": "ifsc.py",
+            "args": [ifsc_code],
+            "outputs": ["IFSC_CODE.csv"],
+            # Looks up live data and appends to its output every run.
+            "cache": False,
+        },
+    ]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the example pipeline.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument(
+        "--continue-on-error", action="store_true",
+        help="keep running steps that do not depend on a failed one"
+    )
+    parser.add_argument("--ifsc", help="IFSC code (skips the prompt)")
+    parser.add_argument("--log-dir", default=pipeline.DEFAULT_LOG_DIR)
+    parser.add_argument(
+        "--quiet", action="store_true", help="do not echo step output"
+    )
+    parser.add_argument(
+        "--force", nargs="*", metavar="STEP",
+        help="rerun these steps (all steps when none are named) even if "
+             "their inputs are unchanged"
+    )
+    parser.add_argument(
+        "--only", nargs="+", metavar="STEP",
+        help="run just these steps, using existing files for their inputs"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="explain which steps would run and why, then exit"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="always run every step"
+    )
+    parser.add_argument("--cache-dir", default=pipeline.DEFAULT_CACHE_DIR)
+    parser.add_argument(
+        "--record", metavar="JSON",
+        help="where to write the run record "
+             "(default: runs/run-<timestamp>.json)"
+    )
+    parser.add_argument(
+        "--baseline", metavar="JSON",
+        help="fail when a step regressed against this run record"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=run_metrics.DEFAULT_THRESHOLD
+    )
+    return parser.parse_args(argv)
+
+
 def main():
+    args = parse_args()
     print("=== MASTER PIPELINE STARTED ===")
 
-    run_script("hello.py")
-    run_script("Pandas_basic_step.py")
-    run_script("pandas_advance_step.py")
-    run_script("numpy_basics_step.py")
-    run_script("numpy_advance_step.py")
-    run_script("check_missing.py")
+    if args.ifsc:
+        ifsc_code = args.ifsc
+    elif args.dry_run:
+        ifsc_code = DEFAULT_IFSC
+    else:
+        ifsc_code = ask_ifsc_code()
+    steps = pipeline_steps(ifsc_code)
+    names = [step["name"] for step in steps]
+    for name in (args.only or []) + (args.force or []):
+        if name not in names:
+            sys.exit(f"unknown step {name}; steps are {', '.join(names)}")
+    if args.only:
+        steps = [step for step in steps if step["name"] in args.only]
+
+    cache = None if args.no_cache else pipeline.BuildCache(args.cache_dir)
+    if args.force is None:
+        force = set()
+    else:
+        force = set(args.force or names)
+
+    if args.dry_run:
+        if cache is None:
+            print("Cache disabled: every step would run")
+            return
+        for name, reason in pipeline.explain(steps, cache, force).items():
+            print(f"{name:<20} {'up to date' if reason is None else 'run: ' + reason}")
+        return
+
+    policy = pipeline.CONTINUE if args.continue_on_error else pipeline.FAIL_FAST
+
+    start = time.time()
+    results = pipeline.run_pipeline(
+        steps, args.workers, policy, args.log_dir, echo=not args.quiet,
+        cache=cache, force=force
+    )
+    pipeline.print_summary(steps, results, time.time() - start)
+
+    record = run_metrics.new_record(pipeline.run_record_steps(steps, results))
+    print(f"Run record: {run_metrics.write_record(record, args.record)}")
 
-    ifsc_code = ask_ifsc_code()
-    run_script("Ifsc.py", args=[ifsc_code])
+    failed = any(r["status"] != "ok" for r in results.values())
+    if args.baseline:
+        regressions = run_metrics.compare(
+            run_metrics.load(args.baseline), record, args.threshold
+        )
+        for name, metric, old, new, change in regressions:
+            print(f"REGRESSION {name}.{metric}: {old} -> {new} (+{change:.0%})")
+        failed = failed or bool(regressions)
 
+    if failed:
+        print("\n=== MASTER PIPELINE FAILED ===")
+        sys.exit(1)
     print("\n=== MASTER PIPELINE COMPLETED SUCCESSFULLY ===")
 
 
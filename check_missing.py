@@ -1,49 +1,454 @@
 # This script checks a CSV file for missing values.
-# It takes one command line argument - the filename to check.
+# Usage: python check_missing.py <filename> [--fast | --incremental]
+#                                [--workers N] [--samples N] [--verify]
+#
+# The default mode walks every cell and prints one line per missing value.
+# --fast memory-maps the file, splits it on row boundaries into byte ranges
+# and counts missing tokens per column on a process pool, then prints a
+# per-column summary with at most --samples example locations. Fast mode
+# assumes quoted fields do not contain line breaks. Rows with more fields
+# than headers are reported as malformed in every mode; rows with fewer
+# count their absent trailing cells as missing, and blank lines count as
+# rows with nothing missing.
+#
+# --incremental is fast mode for append-only files: it keeps a checkpoint
+# next to the file (<filename>.missing.json) with the scanned byte offset,
+# a header fingerprint, checksums of the scanned prefix and the cumulative
+# counts, and later runs only scan the bytes appended since. The prefix is
+# checked through its last CHECK_BYTES so the cost stays flat as the file
+# grows; --verify re-checksums the whole prefix instead. A rewritten or
+# truncated file falls back to a full rescan.
 
 # Import necessary libraries
 import csv 
-import numpy as np
+import hashlib
+import io
+import json
+import mmap
+import os
 import sys
+import tempfile
+import warnings
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Cell values that count as missing
+MISSING_TOKENS = ['', 'nan']
+
+# Upper bound on the bytes one worker task parses at a time
+CHUNK_BYTES = 64 * 1024 * 1024
+
+# Bytes at the end of the scanned prefix re-checked on incremental runs
+CHECK_BYTES = 64 * 1024
+
+# Bytes fed to the checksum at a time, so checking a prefix never copies it
+CRC_BLOCK = 8 * 1024 * 1024
+
+CHECKPOINT_VERSION = 1
+
+
+def parse_args(argv):
+  # Returns a dict of options
+  options = {
+    'mode': 'slow',
+    'workers': os.cpu_count() or 1,
+    'samples': 20,
+    'verify': False,
+  }
+  positional = []
+
+  args = iter(argv)
+  for arg in args:
+    if arg == '--fast':
+      options['mode'] = 'fast'
+    elif arg == '--incremental':
+      options['mode'] = 'incremental'
+    elif arg == '--verify':
+      options['verify'] = True
+    elif arg == '--workers':
+      options['workers'] = max(1, int(next(args)))
+    elif arg == '--samples':
+      options['samples'] = max(0, int(next(args)))
+    else:
+      positional.append(arg)
+
+  # Check if input to check filename provided  
+  if len(positional) != 1:
+    print('Usage: python check_missing.py <filename> [--fast | --incremental] '
+          '[--workers N] [--samples N] [--verify]') 
+    sys.exit(1)
+
+  options['filename'] = positional[0]
+  return options
+
+
+def percentage(num_missing, num_rows):
+  # An empty file has nothing missing rather than an undefined share
+  return num_missing / num_rows if num_rows else 0.0
+
+
+def scan_slow(filename):
+  # Open the CSV file
+  with open(filename) as f:
+
+    # Create CSV reader
+    reader = csv.reader(f)
+    
+    # Read first row of headers
+    headers = next(reader, None)
+    if headers is None:
+      print(f'{filename}: empty file')
+      return
+
+    # Initialize counts
+    num_rows = 0
+    num_missing = 0
+    num_malformed = 0
+
+    # Iterate through each row 
+    for row in reader:
+
+      # Increment row count
+      num_rows += 1
+
+      # Rows with more fields than headers do not line up; skip them
+      if len(row) > len(headers):
+        print(f'Malformed row in {filename}, row {num_rows}: '
+              f'{len(row)} fields for {len(headers)} columns')
+        num_malformed += 1
+        continue
+
+      # Blank lines have no cells; in short rows the absent cells are missing
+      if row:
+        row = row + [''] * (len(headers) - len(row))
+
+      # Check each cell for missing values
+      for i, d in enumerate(row):
+        if d in MISSING_TOKENS:
+          
+          # Print location of missing value
+          print(f'Missing value in {filename}, row {num_rows}, column {headers[i]}')
+          
+          # Increment missing count 
+          num_missing += 1
+
+    # Print statistics
+    print(f'Total rows: {num_rows}')
+    if num_malformed:
+      print(f'Malformed rows (more fields than headers): {num_malformed}')
+    print(f'Total missing: {num_missing}')
+    print(f'Missing percentage: {percentage(num_missing, num_rows):.2%}')
+
+
+def read_headers(filename):
+  # Returns the header names and the byte offset where the data starts
+  with open(filename, 'rb') as f:
+    line = f.readline()
+  headers = next(csv.reader([line.decode('utf-8-sig')]), [])
+  return headers, len(line)
+
+
+def split_ranges(filename, start, parts, chunk_bytes=CHUNK_BYTES, end=None):
+  # Cut [start, end or EOF) into byte ranges that each end just after a newline
+  size = os.path.getsize(filename) if end is None else end
+  if size <= start:
+    return []
+
+  count = max(parts, -(-(size - start) // chunk_bytes))
+  step = -(-(size - start) // count)
+  ranges = []
+
+  with open(filename, 'rb') as f:
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+      pos = start
+      while pos < size:
+        end = min(pos + step, size)
+        if end < size:
+          newline = mm.find(b'\n', end - 1)
+          end = size if newline == -1 else newline + 1
+        ranges.append((pos, end))
+        pos = end
+
+  return ranges
+
+
+def blank_lines(data):
+  # Boolean per line of `data`: True where the line is empty (LF or CRLF)
+  buf = np.frombuffer(data, dtype=np.uint8)
+  ends = np.flatnonzero(buf == ord('\n'))
+  if len(buf) and buf[-1] != ord('\n'):
+    ends = np.append(ends, len(buf))
+  starts = np.concatenate(([0], ends[:-1] + 1)).astype(np.int64)
+  lengths = ends - starts
+  carriage = np.zeros(len(starts), dtype=bool)
+  has_byte = lengths > 0
+  carriage[has_byte] = buf[starts[has_byte]] == ord('\r')
+  return (lengths == 0) | ((lengths == 1) & carriage)
+
+
+def scan_rows(data, headers, samples):
+  # csv-module scan of one range, used when some row has more fields than
+  # headers: such rows do not line up with the columns and are counted as
+  # malformed instead of as missing values, the same as scan_slow()
+  counts = np.zeros(len(headers), dtype=np.int64)
+  found = []
+  rows = malformed = 0
+  text = io.StringIO(data.decode('utf-8', errors='replace'), newline='')
+  for row in csv.reader(text):
+    rows += 1
+    if len(row) > len(headers):
+      malformed += 1
+      continue
+    if not row:
+      continue
+    # Short rows count their absent cells as missing
+    row = row + [''] * (len(headers) - len(row))
+    for col, value in enumerate(row):
+      if value in MISSING_TOKENS:
+        counts[col] += 1
+        if len(found) < samples:
+          found.append((rows - 1, col))
+  return rows, counts, found, malformed
+
 
-# Check if input to check filename provided  
-if len(sys.argv) < 2:
-  print('Usage: python check_missing.py <filename>') 
-  sys.exit(1)
+def scan_range(task):
+  # Count missing cells per column in one byte range of the file.
+  # Returns (rows, per-column counts, sample (row, column) positions,
+  # malformed rows)
+  filename, start, end, headers, samples = task
 
-# Get filename  
-filename = sys.argv[1]
+  with open(filename, 'rb') as f:
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+      data = mm[start:end]
 
-# Open the CSV file
-with open(filename) as f:
+  blank = blank_lines(data)
+  if blank.all():
+    return len(blank), np.zeros(len(headers), dtype=np.int64), [], 0
 
-  # Create CSV reader
-  reader = csv.reader(f)
-  
-  # Read first row of headers
-  headers = next(reader)  
+  try:
+    # index_col=False: without it pandas turns the extra leading fields of
+    # an over-long row into the index and shifts the rest silently. When
+    # the range starts with an over-long row pandas only warns and cuts
+    # the row short, so the warning is an error here too
+    with warnings.catch_warnings():
+      warnings.simplefilter('error', pd.errors.ParserWarning)
+      frame = pd.read_csv(
+        io.BytesIO(data), header=None, names=headers, dtype=str,
+        index_col=False, keep_default_na=False, na_filter=False,
+        skip_blank_lines=True
+      )
+  except (pd.errors.ParserError, pd.errors.ParserWarning):
+    return scan_rows(data, headers, samples)
 
-  # Initialize counts
-  num_rows = 0
-  num_missing = 0
+  # Short rows come back as empty strings; they count as missing too
+  mask = frame.isin(MISSING_TOKENS).to_numpy()
+  counts = mask.sum(axis=0, dtype=np.int64)
 
-  # Iterate through each row 
-  for row in reader:
+  # Number samples by file line, counting the blank lines pandas skipped
+  lines = np.flatnonzero(~blank)
+  if len(lines) != len(frame):
+    # Quoted line breaks (unsupported, see above); fall back to row order
+    lines = np.arange(len(frame))
+  rows, cols = np.nonzero(mask)
+  found = list(zip(lines[rows[:samples]].tolist(), cols[:samples].tolist()))
+  return len(blank), counts, found, 0
 
-    # Increment row count
-    num_rows += 1
 
-    # Check each cell for missing values
-    for i, d in enumerate(row):
-      if d == '' or d == 'nan':
-        
-        # Print location of missing value
-        print(f'Missing value in {filename}, row {num_rows}, column {headers[i]}')
-        
-        # Increment missing count 
-        num_missing += 1
+def merge_results(results, headers, samples, row_offset=0):
+  # Fold per-range results (in file order) into one summary
+  num_rows = row_offset
+  counts = np.zeros(len(headers), dtype=np.int64)
+  found = []
+  malformed = 0
+
+  for rows, range_counts, range_samples, range_malformed in results:
+    for row, col in range_samples:
+      if len(found) < samples:
+        found.append((num_rows + row + 1, headers[col]))
+    num_rows += rows
+    counts += range_counts
+    malformed += range_malformed
+
+  return {
+    'rows': num_rows - row_offset,
+    'columns': dict(zip(headers, counts.tolist())),
+    'samples': found,
+    'malformed': malformed,
+  }
+
+
+def scan_fast(filename, workers, samples, start=None, end=None, row_offset=0):
+  # Scan from `start` (default: first data row) to `end` (default: EOF).
+  # Sample rows are numbered from `row_offset`
+  headers, data_start = read_headers(filename)
+  start = data_start if start is None else start
+
+  tasks = [
+    (filename, a, b, headers, samples)
+    for a, b in split_ranges(filename, start, workers, end=end)
+  ]
+
+  if len(tasks) <= 1 or workers == 1:
+    results = [scan_range(task) for task in tasks]
+  else:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+      results = list(pool.map(scan_range, tasks))
+
+  return merge_results(results, headers, samples, row_offset)
+
+
+def checkpoint_path(filename):
+  return filename + '.missing.json'
+
+
+def load_checkpoint(path):
+  try:
+    with open(path) as f:
+      checkpoint = json.load(f)
+  except (FileNotFoundError, ValueError):
+    return None
+  if checkpoint.get('version') != CHECKPOINT_VERSION:
+    return None
+  return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+  # Write to a temp file and rename so a crash never leaves half a checkpoint
+  folder = os.path.dirname(os.path.abspath(path))
+  fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+  with os.fdopen(fd, 'w') as f:
+    json.dump(checkpoint, f)
+  os.replace(tmp, path)
+
+
+def crc_range(mm, start, end, crc=0):
+  # zlib.crc32 of mm[start:end] read through a memoryview in CRC_BLOCK
+  # pieces; slicing the mmap itself would copy the whole range into memory
+  with memoryview(mm) as view:
+    for pos in range(start, end, CRC_BLOCK):
+      crc = zlib.crc32(view[pos:min(pos + CRC_BLOCK, end)], crc)
+  return crc
+
+
+def checkpoint_matches(checkpoint, mm, header, verify):
+  # True when the file still starts with exactly the bytes already scanned
+  offset = checkpoint['offset']
+  if len(mm) < offset:
+    return False
+  if hashlib.sha256(header).hexdigest() != checkpoint['header']:
+    return False
+  window = max(0, offset - CHECK_BYTES)
+  if crc_range(mm, window, offset) != checkpoint['tail_crc']:
+    return False
+  if verify and crc_range(mm, 0, offset) != checkpoint['crc']:
+    return False
+  return True
+
+
+def scan_incremental(filename, workers, samples, verify=False, path=None):
+  # Scan only what was appended since the last checkpoint
+  path = path or checkpoint_path(filename)
+  headers, data_start = read_headers(filename)
+  if os.path.getsize(filename) == 0:
+    return scan_fast(filename, workers, samples)
+
+  with open(filename, 'rb') as f:
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+      header = mm[:data_start]
+
+      # Stop at the last complete line; a half-written row waits for next run
+      end = max(mm.rfind(b'\n') + 1, data_start)
+
+      checkpoint = load_checkpoint(path)
+      if checkpoint and checkpoint['columns'].keys() == set(headers) \
+          and checkpoint_matches(checkpoint, mm, header, verify):
+        start = checkpoint['offset']
+        base_rows = checkpoint['rows']
+        base_columns = checkpoint['columns']
+        base_malformed = checkpoint.get('malformed', 0)
+        crc = checkpoint['crc']
+        full = False
+      else:
+        start = data_start
+        base_rows = 0
+        base_columns = dict.fromkeys(headers, 0)
+        base_malformed = 0
+        crc = zlib.crc32(header)
+        full = True
+
+      summary = scan_fast(filename, workers, samples, start, end, base_rows)
+      crc = crc_range(mm, start, end, crc)
+      window = max(0, end - CHECK_BYTES)
+      tail_crc = crc_range(mm, window, end)
+
+  summary['rows'] += base_rows
+  summary['columns'] = {
+    column: base_columns[column] + missing
+    for column, missing in summary['columns'].items()
+  }
+  summary['malformed'] += base_malformed
+  summary['scanned_bytes'] = end - start
+  summary['full_rescan'] = full
+
+  save_checkpoint(path, {
+    'version': CHECKPOINT_VERSION,
+    'offset': end,
+    'header': hashlib.sha256(header).hexdigest(),
+    'crc': crc,
+    'tail_crc': tail_crc,
+    'rows': summary['rows'],
+    'columns': summary['columns'],
+    'malformed': summary['malformed'],
+  })
+  return summary
+
+
+def print_summary(filename, summary):
+  num_rows = summary['rows']
+  num_missing = sum(summary['columns'].values())
+
+  # Print capped sample locations
+  for row, column in summary['samples']:
+    print(f'Missing value in {filename}, row {row}, column {column}')
+  if num_missing > len(summary['samples']):
+    print(f'... {num_missing - len(summary["samples"])} more not shown')
+
+  # Print per-column counts
+  width = max([len(c) for c in summary['columns']] + [6])
+  print(f'{"Column":<{width}}  {"Missing":>10}  {"Percent":>8}')
+  for column, missing in summary['columns'].items():
+    print(f'{column:<{width}}  {missing:>10}  {percentage(missing, num_rows):>8.2%}')
 
   # Print statistics
+  if 'scanned_bytes' in summary:
+    kind = 'full rescan' if summary['full_rescan'] else 'appended tail'
+    print(f'Scanned: {summary["scanned_bytes"]} bytes ({kind})')
   print(f'Total rows: {num_rows}')
+  if summary.get('malformed'):
+    print(f'Malformed rows (more fields than headers): {summary["malformed"]}')
   print(f'Total missing: {num_missing}')
-  print(f'Missing percentage: {num_missing/num_rows:.2%}')
\ No newline at end of file
+  print(f'Missing percentage: {percentage(num_missing, num_rows):.2%}')
+
+
+def main():
+  options = parse_args(sys.argv[1:])
+  filename = options['filename']
+  workers, samples = options['workers'], options['samples']
+
+  if os.path.getsize(filename) == 0:
+    print(f'{filename}: empty file')
+    return
+
+  if options['mode'] == 'incremental':
+    summary = scan_incremental(filename, workers, samples, options['verify'])
+    print_summary(filename, summary)
+  elif options['mode'] == 'fast':
+    print_summary(filename, scan_fast(filename, workers, samples))
+  else:
+    scan_slow(filename)
+
+
+if __name__ == '__main__':
+  main()
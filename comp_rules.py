@@ -0,0 +1,133 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+
+# Declarative compensation rules. A band applies from its threshold upwards
+# (salary >= threshold), so 80000 is High; anything below the first
+# threshold gets the base band. Missing salaries get no band.
+RULES = {
+    "base_band": "Low",
+    "bands": [(70000, "Medium"), (80000, "High")],
+    "bonus_rate": 0.10,
+    "tax_rate": 0.2,
+    "senior_age": 35,
+    "senior_labels": ("Senior", "Junior"),
+}
+
+
+class CompRules:
+    # Compiles RULES once into sorted threshold arrays so every rule runs as
+    # a handful of whole-column NumPy operations.
+
+    def __init__(self, rules=None):
+        rules = {**RULES, **(rules or {})}
+        bands = sorted(rules["bands"])
+        self.edges = np.array([threshold for threshold, _ in bands], dtype=float)
+        self.labels = [rules["base_band"]] + [label for _, label in bands]
+        self.bonus_rate = rules["bonus_rate"]
+        self.tax_rate = rules["tax_rate"]
+        self.senior_age = rules["senior_age"]
+        self.senior_labels = rules["senior_labels"]
+
+    def band(self, salary):
+        values = np.asarray(salary, dtype=float)
+        codes = np.searchsorted(self.edges, values, side="right")
+        codes = np.where(np.isnan(values), -1, codes)
+        band = pd.Categorical.from_codes(codes, categories=self.labels, ordered=True)
+        if isinstance(salary, pd.Series):
+            return pd.Series(band, index=salary.index, name="SalaryBand")
+        return band
+
+    def bonus(self, salary):
+        return salary * self.bonus_rate
+
+    def tax(self, salary):
+        return salary * self.tax_rate
+
+    def seniority(self, age):
+        senior, junior = self.senior_labels
+        values = np.asarray(age, dtype=float)
+        flags = np.select([values >= self.senior_age], [senior], junior)
+        if isinstance(age, pd.Series):
+            return pd.Series(flags, index=age.index, name="SeniorFlag")
+        return flags
+
+    def apply(self, df, salary="Salary", age="Age"):
+        df["Bonus"] = self.bonus(df[salary])
+        df["TotalComp"] = df[salary] + df["Bonus"]
+        df["Tax"] = self.tax(df[salary])
+        df["SalaryBand"] = self.band(df[salary])
+        df["SeniorFlag"] = self.seniority(df[age])
+        return df
+
+    def band_scalar(self, salary):
+        # Row-at-a-time reference, kept for the benchmark and for checks.
+        # Like band(), a missing salary gets no band.
+        if pd.isna(salary):
+            return None
+        label = self.labels[0]
+        for threshold, name in zip(self.edges, self.labels[1:]):
+            if salary >= threshold:
+                label = name
+        return label
+
+
+DEFAULT_RULES = CompRules()
+
+salary_band = DEFAULT_RULES.band
+bonus = DEFAULT_RULES.bonus
+tax = DEFAULT_RULES.tax
+seniority = DEFAULT_RULES.seniority
+apply_rules = DEFAULT_RULES.apply
+
+
+def timed(fn, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def benchmark(rows=1_000_000, rules=DEFAULT_RULES, seed=0):
+    rng = np.random.default_rng(seed)
+    salary = pd.Series(rng.integers(40_000, 150_000, rows).astype(float))
+    salary.iloc[rng.integers(0, rows, 3)] = 80_000
+
+    apply_band, slow = timed(lambda: salary.apply(rules.band_scalar), repeats=1)
+    apply_tax, _ = timed(lambda: salary.apply(lambda x: x * rules.tax_rate), repeats=1)
+    vector_band, fast = timed(lambda: rules.band(salary))
+    vector_tax, _ = timed(lambda: rules.tax(salary))
+
+    if not (fast.astype(str) == slow).all():
+        raise AssertionError("vectorized bands differ from the .apply path")
+    return {
+        "rows": rows,
+        "band": (apply_band, vector_band),
+        "tax": (apply_tax, vector_tax),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark vectorized compensation rules against .apply."
+    )
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    result = benchmark(args.rows)
+    print(f"{result['rows']} rows")
+    for rule in ("band", "tax"):
+        slow, fast = result[rule]
+        print(f"{rule:<5} apply {slow:.3f}s  vectorized {fast:.4f}s  "
+              f"({slow / fast:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import argparse
+import os
+import re
+import pandas as pd
+
+
+# Rows per worksheet, header included.
+EXCEL_MAX_ROWS = 1_048_576
+SHEET_NAME_LENGTH = 31
+DEFAULT_CHUNKSIZE = 50_000
+
+
+def sheet_title(name, part=1):
+    # Excel forbids []:*?/\ in sheet titles and caps them at 31 characters.
+    title = re.sub(r"[\[\]:*?/\\]", "_", str(name)) or "Sheet"
+    suffix = f" ({part})" if part > 1 else ""
+    return title[:SHEET_NAME_LENGTH - len(suffix)] + suffix
+
+
+def unique_title(name, part, taken):
+    # sheet_title(), numbered further while another worksheet already has
+    # that title (Excel compares titles case-insensitively). Different
+    # groups can sanitize or truncate to the same 31 characters.
+    title = sheet_title(name, part)
+    while title.lower() in taken:
+        part += 1
+        title = sheet_title(name, part)
+    taken.add(title.lower())
+    return title
+
+
+def iter_chunks(frames, chunksize=DEFAULT_CHUNKSIZE):
+    if isinstance(frames, pd.DataFrame):
+        for start in range(0, len(frames), chunksize):
+            yield frames.iloc[start:start + chunksize]
+    else:
+        yield from frames
+
+
+def excel_rows(chunk):
+    # Plain Python values for openpyxl: NaN/NaT become empty cells and
+    # categoricals their labels.
+    values = chunk.astype(object)
+    values = values.where(chunk.notna(), None)
+    return values.itertuples(index=False, name=None)
+
+
+class SheetSplitter:
+    # One logical sheet spread over as many worksheets as the row limit
+    # needs, each starting with the header row. `taken` holds the titles of
+    # every worksheet in the workbook; `title` is this sheet's first one.
+
+    def __init__(self, workbook, name, header, max_rows, taken):
+        self.workbook = workbook
+        self.name = name
+        self.header = header
+        self.max_rows = max_rows
+        self.taken = taken
+        self.title = None
+        self.sheet = None
+        self.parts = 0
+        self.rows = 0
+        self.used = max_rows
+
+    def append(self, row):
+        if self.used >= self.max_rows:
+            self.parts += 1
+            title = unique_title(self.name, self.parts, self.taken)
+            self.title = self.title or title
+            self.sheet = self.workbook.create_sheet(title)
+            self.sheet.append(self.header)
+            self.used = 1
+        self.sheet.append(row)
+        self.used += 1
+        self.rows += 1
+
+
+def write_excel(frames, path, sheet_name="Sheet1", group_by=None,
+                max_rows=EXCEL_MAX_ROWS, chunksize=DEFAULT_CHUNKSIZE):
+    """Stream a DataFrame, or an iterable of DataFrame chunks, into an xlsx
+    file with openpyxl's write-only mode so memory does not grow with the
+    row count. Sheets past max_rows continue as "<name> (2)" and so on;
+    with group_by each value of that column gets its own sheet(s), numbered
+    the same way when two values share a title.
+    Returns {sheet name: data rows}."""
+    from openpyxl import Workbook
+
+    if max_rows < 2:
+        raise ValueError("max_rows must leave room for the header and a row")
+
+    workbook = Workbook(write_only=True)
+    sheets = {}
+    taken = set()
+    header = None
+
+    for chunk in iter_chunks(frames, chunksize):
+        if header is None:
+            header = [str(column) for column in chunk.columns]
+        if group_by is None:
+            groups = [(sheet_name, chunk)]
+        else:
+            groups = chunk.groupby(group_by, sort=False, dropna=False, observed=True)
+        for key, part in groups:
+            if key not in sheets:
+                name = "(blank)" if pd.isna(key) else key
+                sheets[key] = SheetSplitter(workbook, name, header, max_rows,
+                                            taken)
+            splitter = sheets[key]
+            for row in excel_rows(part):
+                splitter.append(row)
+
+    if not sheets:
+        sheet = workbook.create_sheet(sheet_title(sheet_name))
+        if header:
+            sheet.append(header)
+
+    workbook.save(path)
+    return {s.title: s.rows for s in sheets.values()}
+
+
+def export_excel(frames, path="employees_final.xlsx", fallback=None, **options):
+    # write_excel() when openpyxl is available, otherwise the rows go to a
+    # CSV file chunk by chunk (by default <name>_excel.csv next to `path`, so
+    # it never overwrites another step's CSV). Returns the path written.
+    if fallback is None:
+        fallback = os.path.splitext(path)[0] + "_excel.csv"
+    try:
+        write_excel(frames, path, **options)
+        return path
+    except ModuleNotFoundError:
+        print("openpyxl is not installed — cannot write Excel files.")
+        print("Falling back to CSV export instead.")
+
+    chunksize = options.get("chunksize", DEFAULT_CHUNKSIZE)
+    for i, chunk in enumerate(iter_chunks(frames, chunksize)):
+        chunk.to_csv(fallback, index=False, mode="a" if i else "w", header=not i)
+    return fallback
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a CSV into an xlsx file.")
+    parser.add_argument("source", help="CSV file to export")
+    parser.add_argument("target", help="xlsx file to write")
+    parser.add_argument("--group-by", metavar="COLUMN",
+                        help="one sheet per value of this column")
+    parser.add_argument("--sheet", default="Sheet1")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--max-rows", type=int, default=EXCEL_MAX_ROWS,
+                        help="rows per sheet, header included")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    chunks = pd.read_csv(args.source, chunksize=args.chunksize)
+    sheets = write_excel(chunks, args.target, sheet_name=args.sheet,
+                         group_by=args.group_by, max_rows=args.max_rows)
+    for name, rows in sheets.items():
+        print(f"{name}: {rows} rows")
+    print(f"{args.target} created")
+
+
+if __name__ == "__main__":
+    main()
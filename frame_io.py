@@ -0,0 +1,187 @@
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+
+
+# Object/string columns with at most this share of distinct values become
+# categoricals.
+CATEGORY_RATIO = 0.5
+
+DATE_COLUMNS = ["JoinDate"]
+
+FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+}
+
+
+def file_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"unsupported file type {ext!r} for {path}")
+    return FORMATS[ext]
+
+
+def optimize_dtypes(df, category_ratio=CATEGORY_RATIO):
+    # Returns a copy with low-cardinality strings as categoricals, integers
+    # downcast to the smallest type that holds them and floats downcast to
+    # float32 only when that loses nothing. Datetimes are left native.
+    out = df.copy()
+    for name in out.columns:
+        col = out[name]
+        kind = col.dtype.kind
+
+        if kind in "iu":
+            out[name] = pd.to_numeric(col, downcast="integer")
+        elif kind == "f":
+            small = col.astype(np.float32)
+            same = (small.astype(np.float64) == col) | (col.isna() & small.isna())
+            if same.all():
+                out[name] = small
+        elif kind == "M" or isinstance(col.dtype, pd.CategoricalDtype):
+            continue
+        elif kind == "O" or pd.api.types.is_string_dtype(col.dtype):
+            if len(col) and col.nunique(dropna=True) <= category_ratio * len(col):
+                out[name] = col.astype("category")
+    return out
+
+
+def memory_bytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def human_size(size):
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def memory_report(before, after):
+    old, new = memory_bytes(before), memory_bytes(after)
+    saved = 1 - new / old if old else 0.0
+    return f"memory {human_size(old)} -> {human_size(new)} ({saved:.0%} saved)"
+
+
+def write_frame(df, path):
+    fmt = file_format(path)
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_csv(path, index=False)
+
+
+def read_frame(path, columns=None, date_columns=DATE_COLUMNS):
+    # Columnar files come back with their stored dtypes; CSV gets known
+    # date columns parsed so JoinDate is a datetime either way.
+    fmt = file_format(path)
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    if fmt == "feather":
+        return pd.read_feather(path, columns=columns)
+
+    header = pd.read_csv(path, nrows=0).columns
+    wanted = header if columns is None else columns
+    dates = [c for c in date_columns if c in wanted]
+    return pd.read_csv(path, usecols=columns, parse_dates=dates)
+
+
+def synthetic_employees(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    salary = rng.integers(40_000, 150_000, rows)
+    age = rng.integers(21, 65, rows).astype(float)
+    age[rng.random(rows) < 0.02] = np.nan
+    return pd.DataFrame({
+        "EmpID": np.arange(100_000, 100_000 + rows),
+        "Name": rng.choice(["Kabir", "Amit", "Sara", "John", "Ravi"], rows),
+        "Age": age,
+        "Country": rng.choice(["Sweden", "India", "USA", "UK"], rows),
+        "Salary": salary,
+        "Bonus": salary * 0.1,
+        "JoinDate": pd.Timestamp("2010-01-01")
+        + pd.to_timedelta(rng.integers(0, 5000, rows), unit="D"),
+        "SalaryBand": rng.choice(["Low", "Medium", "High"], rows),
+        "SeniorFlag": np.where(age >= 35, "Senior", "Junior"),
+    })
+
+
+def benchmark(rows=1_000_000, folder=".", formats=("csv", "parquet", "feather")):
+    # Write/read time, file size and loaded memory for each format, with
+    # and without optimize_dtypes(). Returns a list of result dicts.
+    raw = synthetic_employees(rows)
+    optimized = optimize_dtypes(raw)
+    print(f"{rows} rows: {memory_report(raw, optimized)}")
+
+    results = []
+    for fmt in formats:
+        ext = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}[fmt]
+        for label, frame in (("raw", raw), ("optimized", optimized)):
+            path = os.path.join(folder, f"bench_employees_{label}{ext}")
+            try:
+                start = time.perf_counter()
+                write_frame(frame, path)
+                written = time.perf_counter() - start
+
+                start = time.perf_counter()
+                loaded = read_frame(path)
+                read = time.perf_counter() - start
+            except ImportError as exc:
+                print(f"{fmt}: skipped ({exc})")
+                break
+
+            results.append({
+                "format": fmt,
+                "dtypes": label,
+                "write_s": round(written, 3),
+                "read_s": round(read, 3),
+                "file_mib": round(os.path.getsize(path) / 2**20, 2),
+                "loaded_mib": round(memory_bytes(loaded) / 2**20, 2),
+            })
+            os.remove(path)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Employee frame I/O.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", help="convert between formats")
+    convert.add_argument("source")
+    convert.add_argument("target")
+    convert.add_argument("--optimize", action="store_true")
+
+    bench = commands.add_parser("bench", help="compare formats and dtypes")
+    bench.add_argument("--rows", type=int, default=1_000_000)
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    if args.command == "convert":
+        df = read_frame(args.source)
+        if args.optimize:
+            optimized = optimize_dtypes(df)
+            print(memory_report(df, optimized))
+            df = optimized
+        write_frame(df, args.target)
+        print(f"{args.target}: {len(df)} rows written")
+        return
+
+    results = benchmark(args.rows)
+    print(f"{'format':<8} {'dtypes':<10} {'write s':>8} {'read s':>8} "
+          f"{'file MiB':>9} {'mem MiB':>8}")
+    for r in results:
+        print(f"{r['format']:<8} {r['dtypes']:<10} {r['write_s']:>8} "
+              f"{r['read_s']:>8} {r['file_mib']:>9} {r['loaded_mib']:>8}")
+
+
+if __name__ == "__main__":
+    main()
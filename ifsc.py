@@ -1,8 +1,14 @@
+import os
 import sys
-import time
-import pandas as pd
+import argparse
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from ifsc_cache import IfscCache, MISSING, DEFAULT_CACHE_FILE
+from ifsc_store import IfscStore
+from ifsc_endpoints import EndpointManager
 
 
 ENDPOINTS = [
@@ -10,17 +16,102 @@ ENDPOINTS = [
     "https://ifsc.bankifsccode.com/{}"
 ]
 
+DEFAULT_IFSC = "SBIN0000001"
+DEFAULT_WORKERS = 16
 
-def fetch_ifsc(ifsc):
-    for url in ENDPOINTS:
-        for attempt in range(3):
-            try:
-                r = requests.get(url.format(ifsc), timeout=5)
-                if r.status_code == 200:
-                    return r.json()
-            except requests.RequestException:
-                time.sleep(2 ** attempt)
-    return None
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def make_session(pool_size=DEFAULT_WORKERS, endpoints=None):
+    # One keep-alive pool per endpoint host, sized for the worker count,
+    # so a batch pays the TLS handshake once per connection, not per code.
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=len(endpoints or ENDPOINTS),
+        pool_maxsize=pool_size
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def endpoint_manager(endpoints=None):
+    # One manager per endpoint list and process, so latency history and
+    # circuit breakers carry over between lookups.
+    key = tuple(endpoints or ENDPOINTS)
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = EndpointManager(
+                key, make_session(endpoints=key)
+            )
+        return _managers[key]
+
+
+def lookup_ifsc(ifsc, session=None, endpoints=None):
+    # Returns (data, status); status is "ok", "not_found" when every
+    # endpoint answered 404, or "error" otherwise.
+    return endpoint_manager(endpoints).lookup(ifsc, session)
+
+
+def fetch_ifsc(ifsc, session=None, endpoints=None):
+    return lookup_ifsc(ifsc, session, endpoints)[0]
+
+
+def cached_fetch(ifsc, cache, refresh=False, session=None, endpoints=None):
+    if not refresh:
+        data = cache.get(ifsc)
+        if data is not MISSING:
+            return data
+
+    data, status = lookup_ifsc(ifsc, session, endpoints)
+    if status == "ok":
+        cache.put(ifsc, data)
+    elif status == "not_found":
+        cache.put_negative(ifsc)
+    return data
+
+
+def resolve(ifsc, cache=None, refresh=False, index=None, session=None,
+            endpoints=None):
+    # Offline index first, then the cache, then the network.
+    if index is not None:
+        data = index.lookup(ifsc)
+        if data is not None:
+            return data
+    if cache is None:
+        return fetch_ifsc(ifsc, session, endpoints)
+    return cached_fetch(ifsc, cache, refresh, session, endpoints)
+
+
+def fetch_batch(codes, workers=DEFAULT_WORKERS, session=None, endpoints=None,
+                cache=None, refresh=False, index=None):
+    codes = list(codes)
+    session = session or make_session(workers, endpoints)
+
+    def fetch(code):
+        return resolve(code, cache, refresh, index, session, endpoints)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(fetch, codes)
+        return [
+            normalize(data or {}, code)
+            for code, data in zip(codes, results)
+        ]
+
+
+def read_codes(source):
+    # source is a path or "-" for stdin; blank lines and "#" comments are
+    # skipped and repeated codes are only looked up once.
+    f = sys.stdin if source == "-" else open(source)
+    try:
+        codes = (line.strip().upper() for line in f)
+        return list(dict.fromkeys(
+            code for code in codes if code and not code.startswith("#")
+        ))
+    finally:
+        if f is not sys.stdin:
+            f.close()
 
 
 def normalize(data, ifsc):
@@ -33,26 +124,146 @@ def normalize(data, ifsc):
     }
 
 
+def save_csv_bulk(records, file="IFSC_CODE.csv"):
+    with IfscStore(file) as store:
+        store.add_many(records)
+
+
 def save_csv(record, file="IFSC_CODE.csv"):
-    df_new = pd.DataFrame([record])
-    try:
-        df_old = pd.read_csv(file)
-        df = pd.concat([df_old, df_new], ignore_index=True)
-    except FileNotFoundError:
-        df = df_new
+    save_csv_bulk([record], file)
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve IFSC codes.")
+    parser.add_argument("ifsc", nargs="?", default=DEFAULT_IFSC)
+    parser.add_argument(
+        "--batch", metavar="FILE",
+        help="resolve every code in FILE (one per line, '-' for stdin)"
+    )
+    parser.add_argument("--workers", type=positive_int, default=DEFAULT_WORKERS)
+    parser.add_argument("--cache-file", default=DEFAULT_CACHE_FILE)
+    parser.add_argument(
+        "--ttl", type=float, metavar="SECONDS",
+        help="lifetime of newly cached entries"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="always go to the network"
+    )
+    parser.add_argument(
+        "--refresh", action="store_true",
+        help="ignore cached entries and refetch (the cache is updated)"
+    )
+    parser.add_argument(
+        "--seed-cache", metavar="CSV",
+        help="load codes already saved in CSV into the cache first"
+    )
+    parser.add_argument(
+        "--cache-stats", action="store_true", help="print cache hit/miss counts"
+    )
+    parser.add_argument(
+        "--endpoint-stats", action="store_true",
+        help="print per-endpoint latency, error rate and breaker state"
+    )
+    parser.add_argument(
+        "--index", metavar="SQLITE",
+        help="answer from an offline index built by ifsc_index.py first"
+    )
+    parser.add_argument(
+        "--service", metavar="URL", default=os.environ.get("IFSC_SERVICE"),
+        help="delegate to a running ifsc_server.py (http://host:port or "
+             "unix:/path); defaults to $IFSC_SERVICE"
+    )
+    parser.add_argument(
+        "--compact", action="store_true",
+        help="deduplicate IFSC_CODE.csv to the latest row per code and exit"
+    )
+    args = parser.parse_args(argv)
+    # Codes are cached and stored upper-case, as read_codes() returns them.
+    args.ifsc = args.ifsc.strip().upper()
+    return args
+
 
-    df.to_csv(file, index=False)
+def open_index(path):
+    # Imported here so thin clients of the lookup service skip pandas.
+    from ifsc_index import IfscIndex
+    return IfscIndex(path)
+
+
+def open_cache(args):
+    if args.no_cache:
+        return None
+    cache = IfscCache(args.cache_file)
+    if args.ttl is not None:
+        cache.ttl = args.ttl
+    if args.seed_cache:
+        cache.seed_csv(args.seed_cache)
+    return cache
+
+
+def run_remote(args):
+    # The service resolves and saves; this process only forwards codes.
+    from ifsc_server import lookup_remote, batch_remote, call
+
+    if args.batch:
+        records = batch_remote(args.service, read_codes(args.batch),
+                               args.refresh)
+        resolved = sum(r["Bank"] != "N/A" for r in records)
+        print(f"IFSC saved: {len(records)} records ({resolved} resolved)")
+    else:
+        record = lookup_remote(args.service, args.ifsc, args.refresh)
+        print("IFSC saved:", record)
+
+    if args.cache_stats or args.endpoint_stats:
+        print("Service:", call(args.service, "GET", "/stats"))
 
 
 def main():
+    args = parse_args()
+
+    if args.compact:
+        kept = IfscStore().compact()
+        print(f"IFSC_CODE.csv compacted: {kept} codes")
+        return
 
-    ifsc = sys.argv[1] if len(sys.argv) > 1 else "SBIN0000001"
+    if args.service:
+        run_remote(args)
+        return
 
-    data = fetch_ifsc(ifsc)
-    record = normalize(data or {}, ifsc)
-    save_csv(record)
+    cache = open_cache(args)
+    index = open_index(args.index) if args.index else None
+
+    try:
+        if args.batch:
+            records = fetch_batch(
+                read_codes(args.batch), args.workers,
+                cache=cache, refresh=args.refresh, index=index
+            )
+            save_csv_bulk(records)
+            resolved = sum(r["Bank"] != "N/A" for r in records)
+            print(f"IFSC saved: {len(records)} records ({resolved} resolved)")
+        else:
+            data = resolve(args.ifsc, cache, args.refresh, index)
+            record = normalize(data or {}, args.ifsc)
+            save_csv(record)
+            print("IFSC saved:", record)
 
-    print("IFSC saved:", record)
+        if cache is not None and args.cache_stats:
+            print("Cache:", cache.stats())
+        if args.endpoint_stats:
+            for stats in endpoint_manager().summary():
+                print("Endpoint:", stats)
+    finally:
+        if cache is not None:
+            cache.close()
+        if index is not None:
+            index.close()
 
 
 if __name__ == "__main__":
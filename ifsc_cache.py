@@ -0,0 +1,172 @@
+import csv
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+
+DEFAULT_CACHE_FILE = "IFSC_CACHE.sqlite"
+DEFAULT_CAPACITY = 50_000
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_NEGATIVE_TTL = 24 * 3600
+
+# Returned by get() when a code is not cached; a cached None means the
+# upstream answered 404 for that code (negative entry).
+MISSING = object()
+
+
+class IfscCache:
+    # In-process LRU in front of a SQLite file. Entries hold the raw API
+    # payload (what fetch_ifsc() returns) and an absolute expiry time.
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, capacity=DEFAULT_CAPACITY,
+                 ttl=DEFAULT_TTL, negative_ttl=DEFAULT_NEGATIVE_TTL):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.disk_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            # WAL keeps the per-put commit cheap during large batches.
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS ifsc_cache ("
+                "ifsc TEXT PRIMARY KEY, data TEXT, expires REAL"
+                ") WITHOUT ROWID"
+            )
+            self._db.commit()
+
+    def get(self, ifsc):
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(ifsc)
+            if entry is not None and entry[0] > now:
+                self._lru.move_to_end(ifsc)
+                return self._hit(entry[1])
+
+            entry = self._load(ifsc)
+            if entry is not None and entry[0] > now:
+                self._remember(ifsc, entry)
+                self.disk_hits += 1
+                return self._hit(entry[1])
+
+            self._lru.pop(ifsc, None)
+            self.misses += 1
+            return MISSING
+
+    def contains(self, ifsc):
+        # Like get() is not MISSING, but leaves the hit/miss counts alone.
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(ifsc)
+            if entry is None:
+                entry = self._load(ifsc)
+            return entry is not None and entry[0] > now
+
+    def put(self, ifsc, data, ttl=None):
+        if ttl is None:
+            ttl = self.ttl if data is not None else self.negative_ttl
+        self._store(ifsc, data, time.time() + ttl)
+
+    def put_negative(self, ifsc):
+        self.put(ifsc, None)
+
+    def invalidate(self, ifsc):
+        with self._lock:
+            self._lru.pop(ifsc, None)
+            if self._db is not None:
+                self._db.execute(
+                    "DELETE FROM ifsc_cache WHERE ifsc = ?", (ifsc,)
+                )
+                self._db.commit()
+
+    def seed_csv(self, file):
+        # Import codes already resolved into an IFSC_CODE.csv-style file.
+        # Each row expires `ttl` after its Timestamp; cached codes are kept.
+        seeded = 0
+        with open(file, newline="") as f:
+            for row in csv.DictReader(f):
+                ifsc = (row.get("IFSC") or "").strip().upper()
+                if not ifsc or row.get("Bank") in (None, "", "N/A"):
+                    continue
+                try:
+                    stamp = datetime.fromisoformat(row["Timestamp"]).timestamp()
+                except (KeyError, TypeError, ValueError):
+                    stamp = time.time()
+                expires = stamp + self.ttl
+                if expires <= time.time() or self.contains(ifsc):
+                    continue
+                data = {
+                    "IFSC": ifsc,
+                    "BANK": row["Bank"],
+                    "BRANCH": row.get("Branch") or "N/A",
+                    "STATE": row.get("State") or "N/A",
+                }
+                self._store(ifsc, data, expires)
+                seeded += 1
+        return seeded
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._lru),
+            "capacity": self.capacity,
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _hit(self, data):
+        self.hits += 1
+        if data is None:
+            self.negative_hits += 1
+        return data
+
+    def _remember(self, ifsc, entry):
+        self._lru[ifsc] = entry
+        self._lru.move_to_end(ifsc)
+        while len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    def _load(self, ifsc):
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT expires, data FROM ifsc_cache WHERE ifsc = ?", (ifsc,)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _store(self, ifsc, data, expires):
+        with self._lock:
+            self._remember(ifsc, (expires, data))
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO ifsc_cache VALUES (?, ?, ?)",
+                    (ifsc, json.dumps(data), expires)
+                )
+                self._db.commit()
@@ -0,0 +1,217 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import requests
+
+
+OK, NOT_FOUND, FAILED = "ok", "not_found", "error"
+
+
+class EndpointStats:
+    # Rolling latency / outcome window for one endpoint plus its circuit
+    # breaker. The breaker opens after `max_failures` consecutive failures or
+    # when the windowed error rate passes `max_error_rate`; after `cooldown`
+    # seconds one probe is let through (half-open) and its result decides.
+
+    def __init__(self, url, window=200, min_samples=10, min_timeout=0.5,
+                 max_timeout=5.0, default_hedge=1.0, max_failures=5,
+                 max_error_rate=0.5, cooldown=30.0):
+        self.url = url
+        self.min_samples = min_samples
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.default_hedge = default_hedge
+        self.max_failures = max_failures
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def percentile(self, q):
+        with self._lock:
+            values = sorted(self.latencies)
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def timeout(self):
+        # Generous multiple of p99, clamped, once there is enough history.
+        if len(self.latencies) < self.min_samples:
+            return self.max_timeout
+        p99 = self.percentile(0.99)
+        return min(self.max_timeout, max(self.min_timeout, 3 * p99))
+
+    def hedge_delay(self):
+        if len(self.latencies) < self.min_samples:
+            return self.default_hedge
+        return self.percentile(0.95)
+
+    def error_rate(self):
+        with self._lock:
+            if not self.outcomes:
+                return 0.0
+            return self.outcomes.count(False) / len(self.outcomes)
+
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.probing:
+                return False
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                self.probing = True
+                return True
+            return False
+
+    def record(self, latency, ok):
+        with self._lock:
+            self.outcomes.append(ok)
+            self.probing = False
+            if ok:
+                self.latencies.append(latency)
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            rate = self.outcomes.count(False) / len(self.outcomes)
+            if self.failures >= self.max_failures or (
+                len(self.outcomes) >= self.min_samples
+                and rate >= self.max_error_rate
+            ):
+                self.opened_at = time.monotonic()
+
+    def summary(self):
+        return {
+            "url": self.url,
+            "state": self.state(),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "timeout": self.timeout(),
+            "error_rate": self.error_rate(),
+            "samples": len(self.outcomes),
+        }
+
+
+class EndpointManager:
+    # Races endpoints instead of walking them: the first healthy endpoint
+    # gets the request, the next one is hedged in once the first has run
+    # past its p95 latency, and a failure starts the next one immediately.
+    # Rounds are retried with exponential backoff; endpoints whose breaker
+    # is open are skipped.
+
+    def __init__(self, endpoints, session=None, attempts=3, backoff=0.25,
+                 max_workers=32, **stats_options):
+        self.endpoints = [EndpointStats(url, **stats_options)
+                          for url in endpoints]
+        self.session = session or requests.Session()
+        self.attempts = attempts
+        self.backoff = backoff
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def _request(self, stats, ifsc, session):
+        start = time.monotonic()
+        try:
+            r = session.get(stats.url.format(ifsc), timeout=stats.timeout())
+        except requests.RequestException:
+            stats.record(time.monotonic() - start, False)
+            return FAILED, None
+        latency = time.monotonic() - start
+
+        if r.status_code == 200:
+            try:
+                data = r.json()
+            except ValueError:
+                stats.record(latency, False)
+                return FAILED, None
+            stats.record(latency, True)
+            return OK, data
+        if r.status_code == 404:
+            stats.record(latency, True)
+            return NOT_FOUND, None
+        stats.record(latency, False)
+        return FAILED, None
+
+    def _race(self, queue, ifsc, session, not_found, force=False):
+        # Returns (data, []) on success, else (None, endpoints that failed).
+        # force sends to endpoints even when their breaker says no.
+        pending = {}
+        failed = []
+        while queue or pending:
+            if queue and not pending:
+                stats = queue.pop(0)
+                if force or stats.allow():
+                    future = self._pool.submit(
+                        self._request, stats, ifsc, session
+                    )
+                    pending[future] = stats
+                continue
+
+            hedge = None
+            if queue:
+                hedge = max(s.hedge_delay() for s in pending.values())
+            done, _ = wait(pending, timeout=hedge, return_when=FIRST_COMPLETED)
+            if not done:
+                # The running request is slower than its p95: hedge.
+                stats = queue.pop(0)
+                if force or stats.allow():
+                    future = self._pool.submit(
+                        self._request, stats, ifsc, session
+                    )
+                    pending[future] = stats
+                continue
+
+            for future in done:
+                stats = pending.pop(future)
+                status, data = future.result()
+                if status == OK:
+                    return data, []
+                if status == NOT_FOUND:
+                    not_found.add(stats.url)
+                else:
+                    failed.append(stats)
+        return None, failed
+
+    def lookup(self, ifsc, session=None):
+        # Returns (data, status) like ifsc.lookup_ifsc().
+        session = session or self.session
+        candidates = [s for s in self.endpoints if s.state() != "open"]
+        # Every breaker is open; try them all rather than fail outright.
+        force = not candidates
+        if force:
+            candidates = list(self.endpoints)
+
+        not_found = set()
+        queue = candidates
+        for attempt in range(self.attempts):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            data, failed = self._race(list(queue), ifsc, session, not_found,
+                                      force)
+            if data is not None:
+                return data, OK
+            queue = [s for s in failed if s.url not in not_found]
+            if not queue:
+                break
+
+        if len(not_found) == len(candidates):
+            return None, NOT_FOUND
+        return None, FAILED
+
+    def summary(self):
+        return [stats.summary() for stats in self.endpoints]
+
+    def close(self):
+        self._pool.shutdown(wait=False)
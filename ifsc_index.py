@@ -0,0 +1,234 @@
+import argparse
+import os
+import sqlite3
+import sys
+import pandas as pd
+
+
+DEFAULT_INDEX_FILE = "IFSC_INDEX.sqlite"
+DEFAULT_CHUNKSIZE = 200_000
+
+# Columns kept from the master dump, in the upper-case names the IFSC API
+# returns, so index rows can go straight through ifsc.normalize().
+COLUMNS = [
+    "IFSC", "BANK", "BRANCH", "CENTRE", "CITY", "DISTRICT", "STATE",
+    "ADDRESS", "CONTACT", "MICR",
+]
+
+# SQLite's default limit on bound parameters per statement is 999.
+IN_BATCH = 900
+
+
+def read_chunks(path, chunksize, **options):
+    # pd.read_csv in chunks; an empty file has no chunks instead of raising.
+    try:
+        return pd.read_csv(path, chunksize=chunksize, **options)
+    except pd.errors.EmptyDataError:
+        return iter(())
+
+
+def build_index(dump, path=DEFAULT_INDEX_FILE, chunksize=DEFAULT_CHUNKSIZE):
+    # Load a full IFSC master CSV into a fresh SQLite file, then swap it in,
+    # so readers never see a half-built index.
+    tmp = path + ".building"
+    if os.path.exists(tmp):
+        os.unlink(tmp)
+
+    db = sqlite3.connect(tmp)
+    db.execute("PRAGMA journal_mode=OFF")
+    db.execute("PRAGMA synchronous=OFF")
+    db.execute(
+        "CREATE TABLE ifsc (BANKCODE TEXT, "
+        + ", ".join(f"{c} TEXT" for c in COLUMNS)
+        + ", PRIMARY KEY (IFSC)) WITHOUT ROWID"
+    )
+
+    rows = 0
+    insert = (
+        f"INSERT OR REPLACE INTO ifsc VALUES (?, {', '.join('?' * len(COLUMNS))})"
+    )
+    for chunk in read_chunks(
+        dump, chunksize, dtype=str, keep_default_na=False
+    ):
+        chunk.columns = chunk.columns.str.strip().str.upper()
+        if "IFSC" not in chunk.columns:
+            db.close()
+            os.unlink(tmp)
+            raise ValueError(f"{dump} has no IFSC column")
+        chunk = chunk.reindex(columns=COLUMNS, fill_value="")
+        chunk["IFSC"] = chunk["IFSC"].str.strip().str.upper()
+        chunk["STATE"] = chunk["STATE"].str.strip().str.upper()
+        chunk["BRANCH"] = chunk["BRANCH"].str.strip()
+        chunk.insert(0, "BANKCODE", chunk["IFSC"].str[:4])
+        db.executemany(insert, chunk.itertuples(index=False, name=None))
+        rows += len(chunk)
+
+    # Branch names keep their case for display and match case-insensitively.
+    db.execute(
+        "CREATE INDEX ifsc_branch ON ifsc (BANKCODE, BRANCH COLLATE NOCASE)"
+    )
+    db.execute("CREATE INDEX ifsc_state ON ifsc (STATE)")
+    db.commit()
+    db.close()
+    os.replace(tmp, path)
+    return rows
+
+
+def prefix_range(prefix):
+    # [prefix, prefix + max char) lets SQLite answer prefix queries from the
+    # B-tree instead of scanning with LIKE.
+    return prefix, prefix + "\U0010ffff"
+
+
+class IfscIndex:
+
+    def __init__(self, path=DEFAULT_INDEX_FILE):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self._db = sqlite3.connect(
+            f"file:{path}?mode=ro", uri=True, check_same_thread=False
+        )
+        self._db.row_factory = sqlite3.Row
+
+    def lookup(self, ifsc):
+        row = self._db.execute(
+            f"SELECT {', '.join(COLUMNS)} FROM ifsc WHERE IFSC = ?",
+            (ifsc.strip().upper(),)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def lookup_many(self, codes):
+        # Returns a frame indexed by IFSC with the normalize() columns.
+        codes = list(codes)
+        frames = []
+        for i in range(0, len(codes), IN_BATCH):
+            batch = codes[i:i + IN_BATCH]
+            frames.append(pd.read_sql_query(
+                "SELECT IFSC, BANK AS Bank, BRANCH AS Branch, STATE AS State "
+                f"FROM ifsc WHERE IFSC IN ({', '.join('?' * len(batch))})",
+                self._db, params=batch
+            ))
+        if not frames:
+            return pd.DataFrame(columns=["Bank", "Branch", "State"])
+        return pd.concat(frames, ignore_index=True).set_index("IFSC")
+
+    def search(self, prefix=None, branch=None, state=None, limit=100):
+        # prefix matches the start of the IFSC (e.g. "SBIN" or "SBIN00012");
+        # branch is a branch-name prefix, in any case, and needs a 4-letter
+        # bank code.
+        clauses, params = [], []
+        if prefix:
+            prefix = prefix.strip().upper()
+            if branch:
+                clauses.append("BANKCODE = ?")
+                params.append(prefix[:4])
+            clauses.append("IFSC >= ? AND IFSC < ?")
+            params.extend(prefix_range(prefix))
+        if branch:
+            if not prefix:
+                raise ValueError("branch search needs a bank code prefix")
+            clauses.append(
+                "BRANCH COLLATE NOCASE >= ? AND BRANCH COLLATE NOCASE < ?"
+            )
+            params.extend(prefix_range(branch.strip()))
+        if state:
+            clauses.append("STATE = ?")
+            params.append(state.strip().upper())
+
+        sql = f"SELECT {', '.join(COLUMNS)} FROM ifsc"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY IFSC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return [dict(row) for row in self._db.execute(sql, params)]
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM ifsc").fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def enrich(source, target, index, column="IFSC", chunksize=DEFAULT_CHUNKSIZE):
+    # Join account records on their IFSC column chunk by chunk. Each chunk
+    # costs one batched query per 900 distinct codes and a vectorized
+    # reindex; unknown codes get "N/A" like normalize() does.
+    rows = 0
+    header = True
+    for chunk in read_chunks(source, chunksize, dtype=str):
+        codes = chunk[column].str.strip().str.upper()
+        found = index.lookup_many(codes.dropna().unique())
+        details = found.reindex(codes.to_numpy())
+        for name in ("Bank", "Branch", "State"):
+            chunk[name] = details[name].fillna("N/A").to_numpy()
+        chunk.to_csv(target, mode="w" if header else "a",
+                     header=header, index=False)
+        header = False
+        rows += len(chunk)
+    if header:
+        # No rows at all: still write the header, with the added columns.
+        columns = [*next(read_chunks(source, 1, dtype=str), pd.DataFrame()).columns]
+        columns += [c for c in ("Bank", "Branch", "State") if c not in columns]
+        pd.DataFrame(columns=columns).to_csv(target, index=False)
+    return rows
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline IFSC master index.")
+    parser.add_argument("--index", default=DEFAULT_INDEX_FILE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="import a master CSV dump")
+    build.add_argument("dump")
+
+    lookup = commands.add_parser("lookup", help="exact lookup")
+    lookup.add_argument("codes", nargs="+")
+
+    search = commands.add_parser("search", help="prefix / state query")
+    search.add_argument("prefix", nargs="?")
+    search.add_argument("--branch")
+    search.add_argument("--state")
+    search.add_argument("--limit", type=int, default=100)
+
+    enrich_cmd = commands.add_parser("enrich", help="add Bank/Branch/State")
+    enrich_cmd.add_argument("source")
+    enrich_cmd.add_argument("target")
+    enrich_cmd.add_argument("--column", default="IFSC")
+    enrich_cmd.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    if args.command == "build":
+        rows = build_index(args.dump, args.index)
+        print(f"{args.index}: {rows} rows indexed")
+        return
+
+    with IfscIndex(args.index) as index:
+        if args.command == "lookup":
+            for code in args.codes:
+                print(index.lookup(code) or f"{code}: not found")
+        elif args.command == "search":
+            if not (args.prefix or args.state):
+                sys.exit("search needs a prefix or --state")
+            for row in index.search(args.prefix, args.branch, args.state,
+                                    args.limit):
+                print(row)
+        elif args.command == "enrich":
+            rows = enrich(args.source, args.target, index, args.column,
+                          args.chunksize)
+            print(f"{args.target}: {rows} rows enriched")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+import ifsc
+from ifsc_cache import IfscCache, DEFAULT_CACHE_FILE
+from ifsc_store import IfscStore
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+FLUSH_INTERVAL = 1.0
+MAX_BODY = 16 * 1024 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+class LookupService:
+    # Keeps the cache, session pools, endpoint stats and optional index warm
+    # and coalesces concurrent lookups of the same code into one upstream
+    # fetch (singleflight). Resolved records are appended to IFSC_CODE.csv
+    # in batches; the store is only touched from one writer thread, since
+    # a flush takes a file lock and fsyncs.
+
+    def __init__(self, cache=None, index=None, store=None,
+                 workers=ifsc.DEFAULT_WORKERS):
+        self.cache = cache
+        self.index = index
+        self.store = store
+        self.session = ifsc.make_session(workers)
+        self.requests = 0
+        self.coalesced = 0
+        self.upstream = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        self._inflight = {}
+
+    async def resolve(self, code, refresh=False):
+        self.requests += 1
+        # A refresh must not be answered by a cached lookup already running.
+        key = (code, refresh)
+        future = self._inflight.get(key)
+        if future is None:
+            self.upstream += 1
+            future = asyncio.ensure_future(self._fetch(code, refresh))
+            self._inflight[key] = future
+            future.add_done_callback(
+                lambda _: self._inflight.pop(key, None)
+            )
+        else:
+            self.coalesced += 1
+        return dict(await asyncio.shield(future))
+
+    async def _fetch(self, code, refresh):
+        # The singleflight leader: one upstream lookup and one stored row,
+        # however many requests wait on it.
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(
+            self._pool, ifsc.resolve, code, self.cache, refresh,
+            self.index, self.session
+        )
+        record = ifsc.normalize(data or {}, code)
+        if self.store is not None:
+            await loop.run_in_executor(self._writer, self.store.add, record)
+        return record
+
+    async def resolve_many(self, codes, refresh=False):
+        return await asyncio.gather(
+            *(self.resolve(code, refresh) for code in codes)
+        )
+
+    def stats(self):
+        stats = {
+            "requests": self.requests,
+            "upstream": self.upstream,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "endpoints": ifsc.endpoint_manager().summary(),
+        }
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+    async def flush_forever(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            await asyncio.get_running_loop().run_in_executor(
+                self._writer, self.flush
+            )
+
+    def flush(self):
+        if self.store is not None:
+            self.store.flush()
+
+    def close(self):
+        self._writer.shutdown(wait=True)
+        self.flush()
+        self._pool.shutdown(wait=False)
+
+
+async def route(service, method, target, body):
+    url = urlsplit(target)
+    query = parse_qs(url.query)
+    refresh = query.get("refresh", ["0"])[0] in ("1", "true")
+    parts = [p for p in url.path.split("/") if p]
+
+    if method == "GET" and parts == ["health"]:
+        return 200, {"status": "ok"}
+    if method == "GET" and parts == ["stats"]:
+        return 200, service.stats()
+    if method == "GET" and len(parts) == 2 and parts[0] == "ifsc":
+        record = await service.resolve(parts[1].upper(), refresh)
+        return 200, {"record": record}
+    if method == "POST" and parts == ["batch"]:
+        try:
+            payload = json.loads(body or b"{}")
+            codes = [str(c).strip().upper() for c in payload["codes"]]
+        except (ValueError, KeyError, TypeError):
+            return 400, {"error": 'expected {"codes": [...]}'}
+        records = await service.resolve_many(
+            list(dict.fromkeys(c for c in codes if c)),
+            bool(payload.get("refresh", refresh))
+        )
+        return 200, {"records": records}
+    if parts and parts[0] in ("health", "stats", "ifsc", "batch"):
+        return 405, {"error": f"{method} not allowed"}
+    return 404, {"error": f"no route for {url.path}"}
+
+
+async def handle(service, reader, writer):
+    # Minimal HTTP/1.1 with keep-alive; enough for the JSON API.
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                method, target, version = line.decode("latin-1").split()
+            except ValueError:
+                break
+
+            headers = {}
+            while True:
+                header = await reader.readline()
+                if header in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = header.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            try:
+                length = int(headers.get("content-length", 0))
+            except ValueError:
+                length = -1
+            body = None
+            if length < 0:
+                status, payload = 400, {"error": "bad Content-Length"}
+            elif length > MAX_BODY:
+                status, payload = 413, {"error": "request body too large"}
+            else:
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, payload = await route(service, method, target, body)
+                except Exception as e:
+                    # Answer rather than drop the connection; the body was
+                    # read, so the connection can stay open.
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+            keep_alive = (
+                version == "HTTP/1.1"
+                and headers.get("connection", "").lower() != "close"
+                and body is not None
+            )
+            data = json.dumps(payload).encode()
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                "\r\n".encode() + data
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+    handler = lambda r, w: handle(service, r, w)
+    if path:
+        server = await asyncio.start_unix_server(handler, path=path)
+        where = f"unix:{path}"
+    else:
+        server = await asyncio.start_server(handler, host, port)
+        where = f"http://{host}:{server.sockets[0].getsockname()[1]}"
+    print(f"IFSC lookup service listening on {where}", flush=True)
+
+    flusher = asyncio.create_task(service.flush_forever())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        flusher.cancel()
+        service.close()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+
+    def __init__(self, path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+def connect(service_url, timeout=60):
+    # service_url is "http://host:port" or "unix:/path/to/socket".
+    if service_url.startswith("unix:"):
+        return UnixHTTPConnection(service_url[len("unix:"):], timeout)
+    url = urlsplit(service_url)
+    return http.client.HTTPConnection(url.hostname, url.port, timeout=timeout)
+
+
+def call(service_url, method, path, payload=None):
+    conn = connect(service_url)
+    try:
+        body = json.dumps(payload) if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body else {}
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        result = json.loads(response.read() or b"{}")
+        if response.status != 200:
+            raise RuntimeError(
+                f"{service_url}{path}: {response.status} "
+                f"{result.get('error', '')}"
+            )
+        return result
+    finally:
+        conn.close()
+
+
+def lookup_remote(service_url, code, refresh=False):
+    path = f"/ifsc/{code}" + ("?refresh=1" if refresh else "")
+    return call(service_url, "GET", path)["record"]
+
+
+def batch_remote(service_url, codes, refresh=False):
+    payload = {"codes": list(codes), "refresh": refresh}
+    return call(service_url, "POST", "/batch", payload)["records"]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="IFSC lookup service.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", metavar="PATH",
+                        help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=ifsc.DEFAULT_WORKERS)
+    parser.add_argument("--cache-file", default=DEFAULT_CACHE_FILE)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--index", metavar="SQLITE")
+    parser.add_argument("--no-save", action="store_true",
+                        help="do not append lookups to IFSC_CODE.csv")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    cache = None if args.no_cache else IfscCache(args.cache_file)
+    index = ifsc.open_index(args.index) if args.index else None
+    store = None if args.no_save else IfscStore(batch_size=100)
+    service = LookupService(cache, index, store, args.workers)
+
+    if args.socket and os.path.exists(args.socket):
+        os.unlink(args.socket)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import csv
+import fcntl
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+
+
+DEFAULT_FILE = "IFSC_CODE.csv"
+DEFAULT_FIELDS = ["IFSC", "Bank", "Branch", "State", "Timestamp"]
+DEFAULT_BATCH_SIZE = 1000
+# IFSC_CODE.csv is LF-terminated; csv's default "\r\n" would mix endings.
+LINE_END = "\n"
+
+
+@contextmanager
+def locked(file):
+    # Writers and compaction serialise on a sidecar lock file; the data
+    # file itself is replaced during compaction, so it cannot hold the lock.
+    with open(file + ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def read_header(file):
+    try:
+        with open(file, newline="") as f:
+            return next(csv.reader(f), None)
+    except FileNotFoundError:
+        return None
+
+
+def ends_with_newline(file):
+    with open(file, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def timestamp_key(row):
+    # Timestamps are a mix of "YYYY-MM-DD HH:MM:SS" and isoformat(); both
+    # parse with fromisoformat. Unparseable stamps sort first.
+    try:
+        return datetime.fromisoformat(row.get("Timestamp") or "")
+    except ValueError:
+        return datetime.min
+
+
+class IfscStore:
+    # Append-only record log on top of IFSC_CODE.csv. add() buffers rows and
+    # flush() appends them under a file lock, so an insert costs the same
+    # at ten rows or ten million. Repeat lookups of a code are appended as
+    # new rows; latest() and compact() resolve them to the newest Timestamp.
+
+    def __init__(self, file=DEFAULT_FILE, batch_size=DEFAULT_BATCH_SIZE):
+        self.file = file
+        self.batch_size = batch_size
+        self._pending = []
+
+    def add(self, record):
+        self._pending.append(record)
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, records):
+        for record in records:
+            self.add(record)
+
+    def flush(self):
+        if not self._pending:
+            return
+        with locked(self.file):
+            fields = read_header(self.file)
+            with open(self.file, "a", newline="") as f:
+                if not fields:
+                    fields = DEFAULT_FIELDS
+                    csv.writer(f, lineterminator=LINE_END).writerow(fields)
+                elif not ends_with_newline(self.file):
+                    f.write(LINE_END)
+                writer = csv.DictWriter(
+                    f, fieldnames=fields, restval="", extrasaction="ignore",
+                    lineterminator=LINE_END
+                )
+                writer.writerows(self._pending)
+                f.flush()
+                os.fsync(f.fileno())
+        self._pending = []
+
+    def latest(self):
+        # One streaming pass; memory is bounded by the number of distinct
+        # codes, not by the length of the log.
+        latest = {}
+        try:
+            with open(self.file, newline="") as f:
+                for row in csv.DictReader(f):
+                    current = latest.get(row["IFSC"])
+                    if current is None or (
+                        timestamp_key(row) >= timestamp_key(current)
+                    ):
+                        latest[row["IFSC"]] = row
+        except FileNotFoundError:
+            pass
+        return latest
+
+    def get(self, ifsc):
+        return self.latest().get(ifsc)
+
+    def compact(self):
+        # Fold the log into a deduplicated snapshot, written to a temp file
+        # and swapped in atomically while writers are locked out.
+        self.flush()
+        with locked(self.file):
+            fields = read_header(self.file)
+            if not fields:
+                return 0
+            rows = self.latest()
+            folder = os.path.dirname(os.path.abspath(self.file))
+            fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", newline="") as f:
+                    writer = csv.DictWriter(
+                        f, fieldnames=fields, restval="",
+                        extrasaction="ignore", lineterminator=LINE_END
+                    )
+                    writer.writeheader()
+                    writer.writerows(rows.values())
+                    f.flush()
+                    os.fsync(f.fileno())
+                # mkstemp files are 0600; keep the permissions of the log.
+                shutil.copymode(self.file, tmp)
+                os.replace(tmp, self.file)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        return len(rows)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,27 +1,88 @@
 import sys
 import subprocess
 import os
-import re
-from importlib.metadata import version, PackageNotFoundError
+import json
+import time
+import site
+import hashlib
+import runpy
+import signal
+import socket
+import tempfile
+import traceback
+import importlib
+from importlib.metadata import version, requires, PackageNotFoundError
+
+from run_metrics import run_measured, usage_metrics, new_record, write_record
+
+try:
+    from packaging.requirements import Requirement, InvalidRequirement
+except ImportError:
+    # pip always ships a copy; the launcher already depends on pip.
+    from pip._vendor.packaging.requirements import (
+        Requirement, InvalidRequirement
+    )
+
+
+# Modules the warm forkserver imports once, before it forks any script.
+DEFAULT_PRELOAD = ["numpy", "pandas"]
+
+# Remembers that a requirements file was satisfied in this environment.
+DEPS_CACHE = ".master_run_deps.json"
+
+# The warm server exits after this long without a launch.
+IDLE_TIMEOUT = 30 * 60
+
+# Longest the server waits for a connected client to send its request.
+REQUEST_TIMEOUT = 5.0
+
+SOCKET_PATH = os.environ.get(
+    "MASTER_RUN_SOCKET",
+    os.path.join(tempfile.gettempdir(), f"master_run-{os.getuid()}.sock")
+)
 
 
 def parse_args():
-    quiet = True
-    force_install = False
+    options = {
+        "quiet": True,
+        "force_install": False,
+        "warm": False,
+        "serve": False,
+        "stop": False,
+        "preload": DEFAULT_PRELOAD,
+        "record": None,
+    }
     script_args = []
 
     for arg in sys.argv[1:]:
-        if arg == "--verbose":
-            quiet = False
+        if script_args:
+            # Everything after the script name belongs to the script.
+            script_args.append(arg)
+        elif arg == "--verbose":
+            options["quiet"] = False
+        elif arg == "--quiet":
+            options["quiet"] = True
         elif arg == "--force-install":
-            force_install = True
+            options["force_install"] = True
+        elif arg == "--warm":
+            options["warm"] = True
+        elif arg == "--cold":
+            options["warm"] = False
+        elif arg == "--serve":
+            options["serve"] = True
+        elif arg == "--stop-server":
+            options["stop"] = True
+        elif arg.startswith("--preload="):
+            options["preload"] = [m for m in arg[10:].split(",") if m]
+        elif arg.startswith("--record="):
+            options["record"] = arg[9:]
         else:
             script_args.append(arg)
 
-    if not script_args:
+    if not script_args and not (options["serve"] or options["stop"]):
         raise ValueError("Usage: python master_run.py <script.py>")
 
-    return quiet, force_install, script_args
+    return options, script_args
 
 
 def get_requirements_file():
@@ -32,45 +93,441 @@ def get_requirements_file():
     return None
 
 
+def include_target(line):
+    # ("r" or "c", path) for a -r/-c include in any of pip's spellings
+    # (-r file, -rfile, --requirement file, --requirement=file), else None.
+    for flag, kind in (("--requirement", "r"), ("--constraint", "c"),
+                       ("-r", "r"), ("-c", "c")):
+        if not line.startswith(flag):
+            continue
+        rest = line[len(flag):]
+        if flag.startswith("--"):
+            if rest[:1] not in ("=", " ", "\t"):
+                return None
+            rest = rest[1:]
+        rest = rest.strip()
+        return (kind, rest) if rest else None
+    return None
+
+
+def read_requirements(req_file, seen=None):
+    # Returns (requirements, raw bytes of every file read). Follows -r/-c
+    # includes; other pip options (-e, --index-url, ...) are skipped.
+    seen = set() if seen is None else seen
+    path = os.path.abspath(req_file)
+    if path in seen:
+        return [], b""
+    seen.add(path)
+
+    with open(req_file, "rb") as f:
+        raw = f.read()
+
+    requirements = []
+    for line in raw.decode().splitlines():
+        line = line.split(" #", 1)[0].strip()
+        if not line or line.startswith("#"):
+            continue
+
+        target = include_target(line)
+        if target is not None:
+            kind, include = target
+            include = os.path.join(os.path.dirname(req_file), include)
+            if kind == "r":
+                nested, nested_raw = read_requirements(include, seen)
+                requirements += nested
+            else:
+                with open(include, "rb") as f:
+                    nested_raw = f.read()
+            raw += nested_raw
+            continue
+        if line.startswith("-"):
+            continue
+
+        try:
+            requirements.append(Requirement(line))
+        except InvalidRequirement:
+            print(f"Skipping unparseable requirement: {line}", file=sys.stderr)
+
+    return requirements, raw
+
+
+def unsatisfied(requirements, extra=None):
+    # Requirements that are missing or installed at a version outside
+    # their specifier. Markers are evaluated for this interpreter and
+    # requested extras pull in the package's own extra requirements.
+    missing = []
+    for req in requirements:
+        env = {"extra": extra} if extra else None
+        if req.marker and not req.marker.evaluate(env):
+            continue
+
+        try:
+            installed = version(req.name)
+        except PackageNotFoundError:
+            missing.append(str(req))
+            continue
+        if not req.specifier.contains(installed, prereleases=True):
+            missing.append(f"{req} (installed {installed})")
+            continue
+
+        for name in sorted(req.extras):
+            extra_reqs = []
+            for spec in requires(req.name) or []:
+                try:
+                    extra_reqs.append(Requirement(spec))
+                except InvalidRequirement:
+                    continue
+            # Only requirements gated on an extra belong to extras; base
+            # dependencies can carry python_version/sys_platform markers.
+            extra_reqs = [
+                r for r in extra_reqs if r.marker and "extra" in str(r.marker)
+            ]
+            missing += unsatisfied(extra_reqs, name)
+    return missing
+
+
+def environment_fingerprint():
+    # Changes whenever the interpreter changes or a distribution is added,
+    # removed or upgraded (pip rewrites *.dist-info, bumping the mtime of
+    # the site-packages directory).
+    parts = [sys.executable, sys.version, sys.prefix]
+    paths = site.getsitepackages() + [site.getusersitepackages()]
+    for path in paths:
+        try:
+            parts.append(f"{path}:{os.stat(path).st_mtime_ns}")
+        except OSError:
+            parts.append(f"{path}:-")
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def dependency_key(raw):
+    digest = hashlib.sha256(raw).hexdigest()
+    return f"{digest}:{environment_fingerprint()}"
+
+
+def load_verdict(req_file):
+    try:
+        with open(DEPS_CACHE) as f:
+            return json.load(f).get(os.path.abspath(req_file))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def save_verdict(req_file, key):
+    try:
+        with open(DEPS_CACHE) as f:
+            cache = json.load(f)
+    except (FileNotFoundError, ValueError):
+        cache = {}
+    cache[os.path.abspath(req_file)] = key
+    # Write then rename, so a concurrent launch never reads half a file.
+    folder = os.path.dirname(os.path.abspath(DEPS_CACHE))
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp, DEPS_CACHE)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
 def install_dependencies(req_file, force=False, quiet=True):
     if not req_file:
         return
 
-    missing = []
-    with open(req_file) as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-
-            pkg = re.split(r"[<=>!~]", line)[0]
-            try:
-                version(pkg)
-            except PackageNotFoundError:
-                missing.append(pkg)
+    # Warm path: read the file(s) and stat site-packages; no metadata scan.
+    requirements, raw = read_requirements(req_file)
+    key = dependency_key(raw)
+    if not force and load_verdict(req_file) == key:
+        if not quiet:
+            print("Dependencies satisfied (cached)")
+        return
 
+    missing = unsatisfied(requirements)
     if missing or force:
         if not quiet:
             print("Installing dependencies...")
+            for req in missing:
+                print(f"  unsatisfied: {req}")
         subprocess.run(
             [sys.executable, "-m", "pip", "install", "-r", req_file],
             check=True
         )
+        if unsatisfied(requirements):
+            return
+        key = dependency_key(raw)
+
+    save_verdict(req_file, key)
+
+
+# -------------------------------------------------
+# Warm forkserver
+#
+# `master_run.py --serve` (or the first `--warm` launch) imports
+# DEFAULT_PRELOAD once and listens on SOCKET_PATH until IDLE_TIMEOUT passes
+# without a launch. A client sends the script, argv, cwd and environment along
+# with its own stdin/stdout/stderr descriptors (SCM_RIGHTS); the server
+# forks, the child adopts those descriptors and runs the script with runpy,
+# and the exit status goes back to the client. Scripts are re-read on every
+# run; only the preloaded modules are shared, so restart the server after
+# upgrading them. Messages are one JSON object per line; several can
+# arrive in one recv, so each side reads through one buffered reader per
+# connection (conn.makefile("rb")).
+# -------------------------------------------------
 
+def _read_message(reader):
+    line = reader.readline()
+    return json.loads(line) if line else None
 
-def run_script(script, args):
-    subprocess.run([sys.executable, script] + args, check=True)
+
+def _send_line(conn, message):
+    conn.sendall(json.dumps(message).encode() + b"\n")
+
+
+def _exec_forked(request, fds):
+    # Runs in the forked child: become `python script args` in the
+    # client's cwd, environment and terminal.
+    code = 0
+    try:
+        for target, fd in enumerate(fds):
+            os.dup2(fd, target)
+            os.close(fd)
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+        script = request["script"]
+        sys.argv = [script] + request["args"]
+        sys.path[0] = os.path.dirname(os.path.abspath(script))
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as exc:
+        if exc.code is None:
+            code = 0
+        elif isinstance(exc.code, int):
+            code = exc.code
+        else:
+            print(exc.code, file=sys.stderr)
+            code = 1
+    except KeyboardInterrupt:
+        code = 128 + signal.SIGINT
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    os._exit(code & 0xFF)
+
+
+def _handle(conn):
+    # Runs in a forked handler: fork the script, report its pid, wait for
+    # it and report the exit code. Never returns into the server loop.
+    try:
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        message, fds, _, _ = socket.recv_fds(conn, 1 << 20, 3)
+        request = json.loads(message)
+
+        pid = os.fork()
+        if pid == 0:
+            conn.close()
+            _exec_forked(request, fds)
+        for fd in fds:
+            os.close(fd)
+
+        start = time.perf_counter()
+        _send_line(conn, {"pid": pid})
+        _, status, usage = os.wait4(pid, 0)
+        _send_line(conn, {
+            "exit": os.waitstatus_to_exitcode(status),
+            "metrics": usage_metrics(usage, time.perf_counter() - start),
+        })
+        conn.close()
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        os._exit(0)
+
+
+def _serve_client(conn, parent):
+    # Runs in a forked child, so a slow or silent client only holds up
+    # itself. Never returns into the server loop.
+    try:
+        conn.settimeout(REQUEST_TIMEOUT)
+        with conn.makefile("rb") as reader:
+            request = _read_message(reader)
+        conn.settimeout(None)
+    except (OSError, ValueError):
+        request = None
+    if request == {"stop": True}:
+        os.kill(parent, signal.SIGTERM)
+    if request != {"run": True}:
+        conn.close()
+        os._exit(0)
+    _send_line(conn, {"ready": True})
+    _handle(conn)
+
+
+def _connect(path=SOCKET_PATH):
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(path)
+    except OSError:
+        conn.close()
+        return None
+    return conn
+
+
+def serve(preload=DEFAULT_PRELOAD, path=SOCKET_PATH, quiet=True):
+    probe = _connect(path)
+    if probe is not None:
+        probe.close()
+        if not quiet:
+            print(f"Warm server already running on {path}")
+        return
+
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except ImportError as exc:
+            print(f"Preload skipped: {exc}", file=sys.stderr)
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, 0o600)
+    server.listen(16)
+
+    # Handlers are never waited for; let the kernel reap them.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    if not quiet:
+        print(f"Warm server ready on {path} "
+              f"(preloaded: {', '.join(preload) or 'nothing'})")
+
+    # A stop request is read in a forked child, which signals back here.
+    def stop(signum, frame):
+        raise SystemExit(0)
+    signal.signal(signal.SIGTERM, stop)
+    parent = os.getpid()
+
+    server.settimeout(IDLE_TIMEOUT)
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                break
+            # A stop raised inside fork's at-fork hooks would be ignored;
+            # hold SIGTERM until fork has returned.
+            signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGTERM})
+            pid = os.fork()
+            if pid == 0:
+                server.close()
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGTERM})
+                _serve_client(conn, parent)
+            conn.close()
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGTERM})
+    finally:
+        server.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def stop_server(path=SOCKET_PATH):
+    conn = _connect(path)
+    if conn is None:
+        return False
+    with conn:
+        _send_line(conn, {"stop": True})
+    return True
+
+
+def start_server(preload=DEFAULT_PRELOAD):
+    # Detached so it outlives this launcher; the next launch finds it warm.
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve",
+         "--preload=" + ",".join(preload)],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL, start_new_session=True
+    )
+
+
+def run_script_warm(script, args, conn):
+    # conn is a connection to the warm server from _connect(). Returns
+    # (returncode, metrics) measured by the server around the forked child.
+    with conn, conn.makefile("rb") as reader:
+        _send_line(conn, {"run": True})
+        _read_message(reader)
+        request = {
+            "script": script,
+            "args": args,
+            "cwd": os.getcwd(),
+            "env": dict(os.environ),
+        }
+        socket.send_fds(conn, [json.dumps(request).encode()],
+                        [0, 1, 2])
+
+        pid = _read_message(reader)["pid"]
+        while True:
+            try:
+                result = _read_message(reader)
+                break
+            except KeyboardInterrupt:
+                # The child is not in our process group; forward Ctrl-C.
+                os.kill(pid, signal.SIGINT)
+
+    if not result:
+        return 1, {}
+    return result["exit"], result["metrics"]
 
 
 def main():
-    quiet, force_install, args = parse_args()
+    options, args = parse_args()
+    quiet = options["quiet"]
+
+    if options["stop"]:
+        stopped = stop_server()
+        if not quiet:
+            print("Warm server stopped" if stopped else "No warm server running")
+        return
+    if options["serve"]:
+        serve(options["preload"], quiet=quiet)
+        return
+
     script, script_args = args[0], args[1:]
 
     if not os.path.exists(script):
         raise FileNotFoundError(script)
 
-    install_dependencies(get_requirements_file(), force_install, quiet)
-    run_script(script, script_args)
+    install_dependencies(get_requirements_file(), options["force_install"], quiet)
+
+    command = [sys.executable, script] + script_args
+    start = time.perf_counter()
+    conn = _connect() if options["warm"] else None
+    mode = "cold" if conn is None else "warm"
+    if conn is not None:
+        returncode, metrics = run_script_warm(script, script_args, conn)
+    else:
+        if options["warm"]:
+            # First warm launch: run cold now and leave a server (which
+            # exits after IDLE_TIMEOUT unused) for next time.
+            start_server(options["preload"])
+        returncode, metrics = run_measured(command)
+    elapsed = time.perf_counter() - start
+
+    if not quiet:
+        usage = " ".join(f"{k}={v}" for k, v in metrics.items())
+        print(f"{script}: {elapsed:.3f}s ({mode}) {usage}", file=sys.stderr)
+    if options["record"]:
+        step = {"status": "ok" if returncode == 0 else "failed", "mode": mode}
+        step.update(metrics)
+        write_record(new_record({script: step}), options["record"])
+
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command)
 
 
 if __name__ == "__main__":
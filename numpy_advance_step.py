@@ -1,68 +1,86 @@
 # advanced_numpy.py
 # Advanced NumPy concepts for Senior Data Analysts / Interview prep
-# Run once: python3 advanced_numpy.py
+# Run once: python3 advanced_numpy.py [--steps 5,11] [--list]
 
+import os
+import tempfile
 from random import choices
 import numpy as np
-import time
+from steps import StepRegistry
 
-def main():
-    print("=== ADVANCED NUMPY: ONE-SHOT EXECUTION ===")
+# bench, record_store, rolling and numeric_summary pull in pandas, so the
+# steps that use them import them when they run.
+steps = StepRegistry()
 
-    # -------------------------------------------------
-    # STEP 1: Advanced Indexing (Fancy Indexing)
-    # -------------------------------------------------
-    print("\n=== STEP 1: FANCY INDEXING ===")
+
+# -------------------------------------------------
+# STEP 1: Advanced Indexing (Fancy Indexing)
+# -------------------------------------------------
+@steps.step(1, "FANCY INDEXING")
+def _fancy_indexing(ctx):
     arr = np.array([10, 20, 30, 40, 50])
     idx = [0, 2, 4]
     print(arr[idx])
 
-    # -------------------------------------------------
-    # STEP 2: Masked Arrays
-    # -------------------------------------------------
-    print("\n=== STEP 2: MASKED ARRAYS ===")
+
+# -------------------------------------------------
+# STEP 2: Masked Arrays
+# -------------------------------------------------
+@steps.step(2, "MASKED ARRAYS")
+def _masked_arrays(ctx):
     data = np.array([100, -1, 200, -1, 300])
     masked = np.ma.masked_where(data == -1, data)
     print(masked)
     print("Mean without masked values:", masked.mean())
 
-    # -------------------------------------------------
-    # STEP 3: Broadcasting (2D vs 1D)
-    # -------------------------------------------------
-    print("\n=== STEP 3: ADVANCED BROADCASTING ===")
+
+# -------------------------------------------------
+# STEP 3: Broadcasting (2D vs 1D)
+# -------------------------------------------------
+@steps.step(3, "ADVANCED BROADCASTING")
+def _advanced_broadcasting(ctx):
     matrix = np.array([[1, 2, 3], [4, 5, 6]])
     vector = np.array([10, 20, 30])
     print(matrix + vector)
 
-    # -------------------------------------------------
-    # STEP 4: Stack & Split
-    # -------------------------------------------------
-    print("\n=== STEP 4: STACK & SPLIT ===")
+
+# -------------------------------------------------
+# STEP 4: Stack & Split
+# -------------------------------------------------
+@steps.step(4, "STACK & SPLIT")
+def _stack_split(ctx):
     a = np.array([1, 2, 3])
     b = np.array([4, 5, 6])
     stacked = np.vstack((a, b))
     print(stacked)
     print(np.hsplit(stacked, 3))
 
-    # -------------------------------------------------
-    # STEP 5: Vectorization vs Loop (Performance)
-    # -------------------------------------------------
-    print("\n=== STEP 5: VECTORIZATION PERFORMANCE ===")
-    size = 1_000_000
+
+# -------------------------------------------------
+# STEP 5: Vectorization vs Loop (Performance)
+# -------------------------------------------------
+@steps.step(5, "VECTORIZATION PERFORMANCE")
+def _vectorization_performance(ctx):
+    from bench import measure
+    size = 200_000
     arr = np.random.rand(size)
 
-    start = time.time()
-    result_loop = [x * 2 for x in arr]
-    print("Loop time:", round(time.time() - start, 4))
+    # Median of a few perf_counter_ns trials with fixed call counts, so the
+    # step stays well under a second; bench.py has the full, calibrated
+    # benchmark suite.
+    loop_trials, _ = measure(lambda: [x * 2 for x in arr],
+                             repeats=3, warmup=0, number=1)
+    print("Loop time:", round(np.median(loop_trials) / 1e9, 4))
+
+    np_trials, _ = measure(lambda: arr * 2, repeats=3, warmup=1, number=10)
+    print("NumPy time:", round(np.median(np_trials) / 1e9, 4))
 
-    start = time.time()
-    result_np = arr * 2
-    print("NumPy time:", round(time.time() - start, 4))
 
-    # -------------------------------------------------
-    # STEP 6: Memory Views vs Copies
-    # -------------------------------------------------
-    print("\n=== STEP 6: VIEW VS COPY ===")
+# -------------------------------------------------
+# STEP 6: Memory Views vs Copies
+# -------------------------------------------------
+@steps.step(6, "VIEW VS COPY")
+def _view_vs_copy(ctx):
     base = np.array([1, 2, 3, 4])
     view = base.view()
     copy = base.copy()
@@ -73,19 +91,35 @@ def main():
     copy[1] = 888
     print("Base after copy change:", base)
 
-    # -------------------------------------------------
-    # STEP 7: Structured Arrays (Like Table)
-    # -------------------------------------------------
-    print("\n=== STEP 7: STRUCTURED ARRAYS ===")
+
+# -------------------------------------------------
+# STEP 7: Structured Arrays (Like Table)
+# -------------------------------------------------
+@steps.step(7, "STRUCTURED ARRAYS")
+def _structured_arrays(ctx):
+    from record_store import RecordStore
     dtype = [("name", "U10"), ("salary", "i4")]
     employees = np.array([("Kabir", 90000), ("Amit", 70000)], dtype=dtype)
     print(employees)
-    print(employees[employees['salary'] > 80000])
 
-    # -------------------------------------------------
-    # STEP 8: np.select (Multiple Conditions)
-    # -------------------------------------------------
-    print("\n=== STEP 8: NP.SELECT ===")
+    # The same records stored on disk and memory-mapped back: the filter
+    # runs on the mapped file without parsing (see record_store.py).
+    with tempfile.TemporaryDirectory() as folder:
+        store = RecordStore.create(
+            os.path.join(folder, "employees.rec"),
+            schema={"Name": ("name", "U10"), "Salary": ("salary", "i4")},
+        )
+        store.append(employees)
+        employees = store.records()
+        print(employees[employees['salary'] > 80000])
+        del employees  # release the mapping before the folder is removed
+
+
+# -------------------------------------------------
+# STEP 8: np.select (Multiple Conditions)
+# -------------------------------------------------
+@steps.step(8, "NP.SELECT")
+def _np_select(ctx):
     salary = np.array([60000, 72000, 90000, 50000])
     conditions = [
     salary < 70000,
@@ -97,64 +131,91 @@ def main():
     print(result)
 
 
-    # -------------------------------------------------
-    # STEP 9: Linear Algebra
-    # -------------------------------------------------
-    print("\n=== STEP 9: LINEAR ALGEBRA ===")
+# -------------------------------------------------
+# STEP 9: Linear Algebra
+# -------------------------------------------------
+@steps.step(9, "LINEAR ALGEBRA")
+def _linear_algebra(ctx):
     A = np.array([[1, 2], [3, 4]])
     B = np.array([[5, 6], [7, 8]])
     print("Dot product:\n", np.dot(A, B))
     print("Determinant:", np.linalg.det(A))
     print("Inverse:\n", np.linalg.inv(A))
 
-    # -------------------------------------------------
-    # STEP 10: Cumulative Operations
-    # -------------------------------------------------
-    print("\n=== STEP 10: CUMULATIVE OPS ===")
+
+# -------------------------------------------------
+# STEP 10: Cumulative Operations
+# -------------------------------------------------
+@steps.step(10, "CUMULATIVE OPS")
+def _cumulative_ops(ctx):
     arr = np.array([1, 2, 3, 4])
     print("Cumsum:", np.cumsum(arr))
     print("Cumprod:", np.cumprod(arr))
 
-    # -------------------------------------------------
-    # STEP 11: Sliding Window (Moving Average)
-    # -------------------------------------------------
-    print("\n=== STEP 11: MOVING AVERAGE ===")
+
+# -------------------------------------------------
+# STEP 11: Sliding Window (Moving Average)
+# -------------------------------------------------
+@steps.step(11, "MOVING AVERAGE")
+def _moving_average(ctx):
+    from rolling import rolling
     data = np.array([10, 20, 30, 40, 50])
     window = 3
-    moving_avg = np.convolve(data, np.ones(window)/window, mode='valid')
+    # O(n) and chunk-friendly; same values as np.convolve(mode='valid').
+    moving_avg = rolling(data, window, stats=("mean",))["mean"]
     print(moving_avg)
 
-    # -------------------------------------------------
-    # STEP 12: Histogram (Distribution Analysis)
-    # -------------------------------------------------
-    print("\n=== STEP 12: HISTOGRAM ===")
+
+# -------------------------------------------------
+# STEP 12: Histogram (Distribution Analysis)
+# -------------------------------------------------
+@steps.step(12, "HISTOGRAM")
+def _histogram(ctx):
+    from numeric_summary import NumericSummary
     values = np.random.normal(50000, 10000, 1000)
-    hist, bins = np.histogram(values, bins=5)
+    # Fed in chunks as a stream would be; same counts as np.histogram.
+    summary = NumericSummary(bins=5, range=(values.min(), values.max()))
+    for chunk in np.array_split(values, 4):
+        summary.update(chunk)
+    hist, bins = summary.histogram()
     print("Histogram:", hist)
     print("Bins:", bins)
+    print("Quartiles:", summary.quantile([0.25, 0.5, 0.75]))
 
-    # -------------------------------------------------
-    # STEP 13: Random Seed (Reproducibility)
-    # -------------------------------------------------
-    print("\n=== STEP 13: RANDOM SEED ===")
+
+# -------------------------------------------------
+# STEP 13: Random Seed (Reproducibility)
+# -------------------------------------------------
+@steps.step(13, "RANDOM SEED")
+def _random_seed(ctx):
     np.random.seed(42)
     print(np.random.rand(3))
 
-    # -------------------------------------------------
-    # STEP 14: np.einsum (Advanced Operations)
-    # -------------------------------------------------
-    print("\n=== STEP 14: EINSUM ===")
-    a = np.array([1, 2, 3])
+
+# -------------------------------------------------
+# STEP 14: np.einsum (Advanced Operations)
+# -------------------------------------------------
+@steps.step(14, "EINSUM")
+def _einsum(ctx):
+    ctx.a = np.array([1, 2, 3])
     b = np.array([4, 5, 6])
-    print("Dot via einsum:", np.einsum('i,i->', a, b))
+    print("Dot via einsum:", np.einsum('i,i->', ctx.a, b))
+
+
+# -------------------------------------------------
+# STEP 15: Memory Size
+# -------------------------------------------------
+@steps.step(15, "MEMORY SIZE", requires=(14,))
+def _memory_size(ctx):
+    print("Array bytes:", ctx.a.nbytes)
 
-    # -------------------------------------------------
-    # STEP 15: Memory Size
-    # -------------------------------------------------
-    print("\n=== STEP 15: MEMORY SIZE ===")
-    print("Array bytes:", a.nbytes)
 
-    print("\n=== ADVANCED NUMPY COMPLETED ===")
+def main(argv=None):
+    args = steps.parse_args("Advanced NumPy walkthrough.", argv)
+    if not args.list:
+        print("=== ADVANCED NUMPY: ONE-SHOT EXECUTION ===")
+    if steps.main(args) is not None:
+        print("\n=== ADVANCED NUMPY COMPLETED ===")
 
 
 if __name__ == "__main__":
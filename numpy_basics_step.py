@@ -1,148 +1,192 @@
 # numpy_basics.py
 
-# One-shot execution: STEP 1 .. STEP 19
+# STEP 1 .. STEP 19, registered with steps.py; importing runs nothing.
+# python numpy_basics_step.py [--steps 6,7,12] [--list]
 
 # Data Analyst focused NumPy examples
 
 import numpy as np
+from steps import StepRegistry
 
-def main():
-    print("=== NUMPY BASICS: ONE-SHOT EXECUTION ===")
+steps = StepRegistry()
 
 
 # -------------------------------------------------
 # STEP 1: Create NumPy Arrays
 # -------------------------------------------------
-print("\n=== STEP 1: CREATE ARRAYS ===")
-arr_1d = np.array([10, 20, 30, 40, 50])
-arr_2d = np.array([[1, 2, 3], [4, 5, 6]])
-print(arr_1d)
-print(arr_2d)
+@steps.step(1, "CREATE ARRAYS")
+def _create_arrays(ctx):
+    ctx.arr_1d = np.array([10, 20, 30, 40, 50])
+    ctx.arr_2d = np.array([[1, 2, 3], [4, 5, 6]])
+    print(ctx.arr_1d)
+    print(ctx.arr_2d)
+
 
 # -------------------------------------------------
 # STEP 2: Array Properties
 # -------------------------------------------------
-print("\n=== STEP 2: ARRAY PROPERTIES ===")
-print("Shape:", arr_2d.shape)
-print("Dimensions:", arr_2d.ndim)
-print("Data type:", arr_2d.dtype)
+@steps.step(2, "ARRAY PROPERTIES", requires=(1,))
+def _array_properties(ctx):
+    print("Shape:", ctx.arr_2d.shape)
+    print("Dimensions:", ctx.arr_2d.ndim)
+    print("Data type:", ctx.arr_2d.dtype)
+
 
 # -------------------------------------------------
 # STEP 3: Zeros, Ones, Full
 # -------------------------------------------------
-print("\n=== STEP 3: ZEROS / ONES / FULL ===")
-print(np.zeros(5))
-print(np.ones(5))
-print(np.full(5, 7))
+@steps.step(3, "ZEROS / ONES / FULL")
+def _zeros_ones_full(ctx):
+    print(np.zeros(5))
+    print(np.ones(5))
+    print(np.full(5, 7))
+
 
 # -------------------------------------------------
 # STEP 4: arange vs linspace
 # -------------------------------------------------
-print("\n=== STEP 4: ARANGE vs LINSPACE ===")
-print(np.arange(0, 10, 2))
-print(np.linspace(0, 10, 5))
+@steps.step(4, "ARANGE vs LINSPACE")
+def _arange_vs_linspace(ctx):
+    print(np.arange(0, 10, 2))
+    print(np.linspace(0, 10, 5))
+
 
 # -------------------------------------------------
 # STEP 5: Indexing & Slicing
 # -------------------------------------------------
-print("\n=== STEP 5: INDEXING & SLICING ===")
-print(arr_1d[0])
-print(arr_1d[1:4])
+@steps.step(5, "INDEXING & SLICING", requires=(1,))
+def _indexing_slicing(ctx):
+    print(ctx.arr_1d[0])
+    print(ctx.arr_1d[1:4])
+
 
 # -------------------------------------------------
 # STEP 6: Boolean Filtering (Use case: salary)
 # -------------------------------------------------
-print("\n=== STEP 6: BOOLEAN FILTERING ===")
-salaries = np.array([50000, 70000, 90000, 60000, 80000])
-print(salaries[salaries > 70000])
+@steps.step(6, "BOOLEAN FILTERING")
+def _boolean_filtering(ctx):
+    ctx.salaries = np.array([50000, 70000, 90000, 60000, 80000])
+    print(ctx.salaries[ctx.salaries > 70000])
+
 
 # -------------------------------------------------
 # STEP 7: Vectorized Operations
 # -------------------------------------------------
-print("\n=== STEP 7: VECTORIZED OPS ===")
-print(salaries * 1.1)
+@steps.step(7, "VECTORIZED OPS", requires=(6,))
+def _vectorized_ops(ctx):
+    print(ctx.salaries * 1.1)
+
 
 # -------------------------------------------------
 # STEP 8: Mathematical Functions
 # -------------------------------------------------
-print("\n=== STEP 8: MATH FUNCTIONS ===")
-print("Mean:", np.mean(salaries))
-print("Std:", np.std(salaries))
+@steps.step(8, "MATH FUNCTIONS", requires=(6,))
+def _math_functions(ctx):
+    print("Mean:", np.mean(ctx.salaries))
+    print("Std:", np.std(ctx.salaries))
+
 
 # -------------------------------------------------
 # STEP 9: Min, Max, Sum
 # -------------------------------------------------
-print("\n=== STEP 9: MIN / MAX / SUM ===")
-print(np.min(salaries), np.max(salaries), np.sum(salaries))
+@steps.step(9, "MIN / MAX / SUM", requires=(6,))
+def _min_max_sum(ctx):
+    print(np.min(ctx.salaries), np.max(ctx.salaries), np.sum(ctx.salaries))
+
 
 # -------------------------------------------------
 # STEP 10: Axis Operations
 # -------------------------------------------------
-print("\n=== STEP 10: AXIS OPERATIONS ===")
-matrix = np.array([[1, 2, 3], [4, 5, 6]])
-print("Column sum:", np.sum(matrix, axis=0))
-print("Row sum:", np.sum(matrix, axis=1))
+@steps.step(10, "AXIS OPERATIONS")
+def _axis_operations(ctx):
+    matrix = np.array([[1, 2, 3], [4, 5, 6]])
+    print("Column sum:", np.sum(matrix, axis=0))
+    print("Row sum:", np.sum(matrix, axis=1))
+
 
 # -------------------------------------------------
 # STEP 11: Reshape
 # -------------------------------------------------
-print("\n=== STEP 11: RESHAPE ===")
-reshaped = np.arange(1, 7).reshape(2, 3)
-print(reshaped)
+@steps.step(11, "RESHAPE")
+def _reshape(ctx):
+    ctx.reshaped = np.arange(1, 7).reshape(2, 3)
+    print(ctx.reshaped)
+
 
 # -------------------------------------------------
 # STEP 12: Flatten
 # -------------------------------------------------
-print("\n=== STEP 12: FLATTEN ===")
-print(reshaped.flatten())
+@steps.step(12, "FLATTEN", requires=(11,))
+def _flatten(ctx):
+    print(ctx.reshaped.flatten())
+
 
 # -------------------------------------------------
 # STEP 13: Sorting
 # -------------------------------------------------
-print("\n=== STEP 13: SORTING ===")
-print(np.sort(salaries))
+@steps.step(13, "SORTING", requires=(6,))
+def _sorting(ctx):
+    print(np.sort(ctx.salaries))
+
 
 # -------------------------------------------------
 # STEP 14: Unique & Counts
 # -------------------------------------------------
-print("\n=== STEP 14: UNIQUE & COUNTS ===")
-countries = np.array(["IN", "SE", "IN", "US", "SE"])
-print(np.unique(countries, return_counts=True))
+@steps.step(14, "UNIQUE & COUNTS")
+def _unique_counts(ctx):
+    countries = np.array(["IN", "SE", "IN", "US", "SE"])
+    print(np.unique(countries, return_counts=True))
+
 
 # -------------------------------------------------
 # STEP 15: Handling NaN
 # -------------------------------------------------
-print("\n=== STEP 15: NaN HANDLING ===")
-data = np.array([10, 20, np.nan, 40])
-print("Nan mean:", np.nanmean(data))
+@steps.step(15, "NaN HANDLING")
+def _nan_handling(ctx):
+    data = np.array([10, 20, np.nan, 40])
+    print("Nan mean:", np.nanmean(data))
+
 
 # -------------------------------------------------
 # STEP 16: Where Condition
 # -------------------------------------------------
-print("\n=== STEP 16: WHERE CONDITION ===")
-print(np.where(salaries >= 80000, "High", "Low"))
+@steps.step(16, "WHERE CONDITION", requires=(6,))
+def _where_condition(ctx):
+    print(np.where(ctx.salaries >= 80000, "High", "Low"))
+
 
 # -------------------------------------------------
 # STEP 17: Random Numbers
 # -------------------------------------------------
-print("\n=== STEP 17: RANDOM ===")
-print(np.random.randint(1, 100, 5))
+@steps.step(17, "RANDOM")
+def _random(ctx):
+    print(np.random.randint(1, 100, 5))
+
 
 # -------------------------------------------------
 # STEP 18: Broadcasting
 # -------------------------------------------------
-print("\n=== STEP 18: BROADCASTING ===")
-print(salaries + 5000)
+@steps.step(18, "BROADCASTING", requires=(6,))
+def _broadcasting(ctx):
+    print(ctx.salaries + 5000)
+
 
 # -------------------------------------------------
 # STEP 19: NumPy vs Python List (Performance Idea)
 # -------------------------------------------------
-print("\n=== STEP 19: NUMPY VS LIST (CONCEPT) ===")
-python_list = [1, 2, 3, 4, 5]
-print("List x2:", [x * 2 for x in python_list])
-print("NumPy x2:", np.array(python_list) * 2)
+@steps.step(19, "NUMPY VS LIST (CONCEPT)")
+def _numpy_vs_list_concept(ctx):
+    python_list = [1, 2, 3, 4, 5]
+    print("List x2:", [x * 2 for x in python_list])
+    print("NumPy x2:", np.array(python_list) * 2)
+
 
-print("\n=== NUMPY BASICS COMPLETED ===")
+def main(argv=None):
+    args = steps.parse_args("NumPy basics walkthrough.", argv)
+    if not args.list:
+        print("=== NUMPY BASICS: ONE-SHOT EXECUTION ===")
+    if steps.main(args) is not None:
+        print("\n=== NUMPY BASICS COMPLETED ===")
 
 
 if __name__ == "__main__":
@@ -1,7 +1,19 @@
+import argparse
+import sys
 import pandas as pd
-import numpy as np
 from datetime import datetime
+from types import SimpleNamespace
 from hello import say_hello
+from comp_rules import bonus, salary_band, seniority
+from frame_io import file_format, optimize_dtypes, write_frame
+from steps import StepRegistry
+
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# The .pipe stages as numbered steps over ctx.df. Streaming runs steps 2-6
+# on every chunk (the chunk replaces STEP 1) and appends at STEP 6.
+steps = StepRegistry()
 
 
 def create_dataframe():
@@ -11,55 +23,167 @@ def create_dataframe():
         "Age": [35, 30, 28, 40, None],
         "Country": ["Sweden", "India", "USA", "UK", "India"],
         "Salary": [90000, 70000, 65000, 80000, 72000],
+        "JoinDate": [
+            "2020-01-10", "2019-03-15", "2021-07-01", "2018-11-20", "2022-06-05"
+        ],
     })
 
 
-def clean_data(df):
-    df["Age"] = df["Age"].fillna(df["Age"].mean())
+def clean_data(df, age_mean=None):
+    # In streaming mode age_mean is the mean over the whole input, so every
+    # chunk is filled with the same value.
+    if age_mean is None:
+        age_mean = df["Age"].mean()
+    df["Age"] = df["Age"].fillna(age_mean)
     return df
 
 
 def enrich_compensation(df):
-    df["Bonus"] = df["Salary"] * 0.1
+    df["Bonus"] = bonus(df["Salary"])
     df["TotalComp"] = df["Salary"] + df["Bonus"]
     return df
 
 
 def add_dates(df):
-    df["JoinDate"] = pd.to_datetime([
-        "2020-01-10", "2019-03-15", "2021-07-01", "2018-11-20", "2022-06-05"
-    ])
+    df["JoinDate"] = pd.to_datetime(df["JoinDate"])
     df["YearsInCompany"] = (datetime.now() - df["JoinDate"]).dt.days // 365
     return df
 
 
 def add_flags(df):
-    df["SalaryBand"] = pd.cut(
-        df["Salary"],
-        bins=[0, 70000, 80000, float("inf")],
-        labels=["Low", "Medium", "High"]
-    )
-    df["SeniorFlag"] = np.where(df["Age"] >= 35, "Senior", "Junior")
+    df["SalaryBand"] = salary_band(df["Salary"])
+    df["SeniorFlag"] = seniority(df["Age"])
     return df
 
 
-def export(df):
-    df.to_csv("employees_final.csv", index=False)
+def export(df, path="employees_final.csv", append=False, optimize=False):
+    # The file extension picks the format (.csv, .parquet, .feather); only
+    # CSV can be appended to.
+    if optimize:
+        df = optimize_dtypes(df)
+    if append:
+        df.to_csv(path, index=False, mode="a", header=False)
+    else:
+        write_frame(df, path)
+
+
+@steps.step(1, "CREATE DATAFRAME")
+def _create(ctx):
+    ctx.df = create_dataframe()
+
+
+@steps.step(2, "CLEAN DATA", requires=(1,))
+def _clean(ctx):
+    ctx.df = clean_data(ctx.df, ctx.age_mean)
+
+
+@steps.step(3, "BONUS & TOTAL COMP", requires=(1,))
+def _compensation(ctx):
+    ctx.df = enrich_compensation(ctx.df)
+
+
+@steps.step(4, "DATES", requires=(1,))
+def _dates(ctx):
+    ctx.df = add_dates(ctx.df)
+
+
+@steps.step(5, "BAND & SENIORITY", requires=(1,))
+def _flags(ctx):
+    ctx.df = add_flags(ctx.df)
+
+
+@steps.step(6, "EXPORT", requires=(1,))
+def _export(ctx):
+    export(ctx.df, ctx.output, append=ctx.append, optimize=ctx.optimize)
+
+
+def column_mean(path, column, chunksize=DEFAULT_CHUNKSIZE):
+    # Cheap first pass: reads one column and keeps a running sum and count.
+    total, count = 0.0, 0
+    for chunk in pd.read_csv(path, usecols=[column], chunksize=chunksize):
+        values = chunk[column]
+        total += values.sum()
+        count += values.count()
+    return total / count if count else float("nan")
+
+
+def stream(source, target="employees_final.csv", chunksize=DEFAULT_CHUNKSIZE,
+           age_mean=None, only=None, optimize=False):
+    # Run the same stages chunk by chunk and append each result, so peak
+    # memory follows chunksize rather than the size of the input. Returns
+    # the rows written and [(step, seconds)] summed over the chunks.
+    # `optimize` shrinks each chunk's dtypes before it is written; the
+    # categories differ per chunk, but CSV text does not record them.
+    if file_format(target) != "csv":
+        raise ValueError("streaming appends chunks and needs a .csv target")
+    numbers = [n for n in steps.select(only) if n != 1]
+    if 4 in numbers:
+        columns = pd.read_csv(source, nrows=0).columns
+        if "JoinDate" not in columns:
+            raise ValueError(f"{source} has no JoinDate column, which STEP 4 "
+                             f"(DATES) needs; leave it out with --steps")
+    if age_mean is None and 2 in numbers:
+        age_mean = column_mean(source, "Age", chunksize)
+
+    ctx = SimpleNamespace(output=target, age_mean=age_mean, optimize=optimize)
+    seconds = dict.fromkeys(numbers, 0.0)
+    rows = 0
+    for i, chunk in enumerate(pd.read_csv(source, chunksize=chunksize)):
+        ctx.df, ctx.append = chunk, i > 0
+        for n in numbers:
+            seconds[n] += steps.run_step(n, ctx, echo=False)
+        if 6 in numbers:
+            rows += len(ctx.df)
+    return rows, list(seconds.items())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Employee enrichment.")
+    parser.add_argument(
+        "--input", metavar="CSV",
+        help="stream this employee CSV instead of the built-in sample "
+             "(needs a JoinDate column)"
+    )
+    parser.add_argument(
+        "--output", default="employees_final.csv",
+        help="output file; .parquet or .feather write a columnar file"
+    )
+    parser.add_argument(
+        "--optimize", action="store_true",
+        help="shrink dtypes (categoricals, downcast numbers) before writing"
+    )
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument(
+        "--age-mean", type=float,
+        help="fill missing Age with this value and skip the first pass"
+    )
+    steps.add_arguments(parser)
+    return parser.parse_args(argv)
 
 
 def main():
+    args = parse_args()
+    if args.list:
+        steps.print_list()
+        return
     say_hello()
 
-    df = (
-        create_dataframe()
-        .pipe(clean_data)
-        .pipe(enrich_compensation)
-        .pipe(add_dates)
-        .pipe(add_flags)
-    )
-
-    print(df)
-    export(df)
+    if args.input:
+        try:
+            rows, timings = stream(args.input, args.output, args.chunksize,
+                                   args.age_mean, args.steps, args.optimize)
+        except ValueError as e:
+            sys.exit(str(e))
+        print(f"{args.output}: {rows} rows written")
+        steps.print_timings(timings)
+        return
+
+    # Without STEP 6 nothing is written; the frame is still printed.
+    ctx = SimpleNamespace(output=args.output, age_mean=args.age_mean,
+                          optimize=args.optimize, append=False)
+    timings = steps.run(args.steps, ctx, echo=False)
+    print(ctx.df)
+    steps.print_timings(timings)
 
 
 if __name__ == "__main__":
@@ -1,18 +1,25 @@
+import argparse
+import sys
 import pandas as pd
-import numpy as np
 from datetime import datetime
- 
-
-
-def main():
-
-    
-    
-    # -------------------------------------------------
-    # STEP 1: Create DataFrame
-    # -------------------------------------------------
-    print("\n=== STEP 1: CREATE DATAFRAME ===")
-
+from types import SimpleNamespace
+from numeric_summary import NumericSummary
+from partition_join import join
+from excel_export import export_excel
+from comp_rules import bonus, salary_band, seniority, tax
+from frame_io import memory_report, optimize_dtypes, read_frame, write_frame
+from steps import StepRegistry
+
+# Each step reads and replaces ctx.df; steps that need columns made by an
+# earlier step (beyond STEP 1's frame) say so in `requires`.
+steps = StepRegistry()
+
+
+# -------------------------------------------------
+# STEP 1: Create DataFrame
+# -------------------------------------------------
+@steps.step(1, "CREATE DATAFRAME")
+def _create_dataframe(ctx):
     data = {
         "EmpID": [101, 102, 103, 104, 105],
         "Name": ["Kabir", "Amit", "Sara", "John", "Ravi"],
@@ -21,187 +28,231 @@ def main():
         "Salary": [90000, 70000, 65000, 80000, 72000]
     }
 
-    df = pd.DataFrame(data)
-    print(df)
-   
-    # -------------------------------------------------
-    # STEP 2: Inspect & Clean Data
-    # -------------------------------------------------
-    print("\n=== STEP 2: INSPECT & CLEAN DATA ===")
-
-    print(df.info())
-    print(df.isnull().sum())
-
-    df["Age"] = df["Age"].fillna(df["Age"].mean())
-    print(df)
-
-    # -------------------------------------------------
-    # STEP 3: Filter, Sort, Group
-    # -------------------------------------------------
-    print("\n=== STEP 3: FILTER, SORT, GROUP ===")
-
-    print(df[df["Salary"] > 75000])
-    print(df.sort_values(by="Salary", ascending=False))
-    print(df.groupby("Country")["Salary"].mean())
-
-    # -------------------------------------------------
-    # STEP 4: Read & Write CSV
-    # -------------------------------------------------
-    print("\n=== STEP 4: READ & WRITE CSV ===")
-
-    df.to_csv("employees.csv", index=False)
-    df = pd.read_csv("employees.csv")
-    print(df)
-
-    # -------------------------------------------------
-    # STEP 5: Bonus & Total Compensation
-    # -------------------------------------------------
-    print("\n=== STEP 5: BONUS & TOTAL COMP ===")
-
-    df["Bonus"] = df["Salary"] * 0.10
-    df["TotalComp"] = df["Salary"] + df["Bonus"]
-    print(df)
-
-    # -------------------------------------------------
-    # STEP 6: Merge / Join
-    # -------------------------------------------------
-    print("\n=== STEP 6: MERGE / JOIN ===")
-
+    ctx.df = pd.DataFrame(data)
+    print(ctx.df)
+
+
+# -------------------------------------------------
+# STEP 2: Inspect & Clean Data
+# -------------------------------------------------
+@steps.step(2, "INSPECT & CLEAN DATA", requires=(1,))
+def _inspect_clean_data(ctx):
+    print(ctx.df.info())
+    print(ctx.df.isnull().sum())
+
+    ctx.df["Age"] = ctx.df["Age"].fillna(ctx.df["Age"].mean())
+    print(ctx.df)
+
+
+# -------------------------------------------------
+# STEP 3: Filter, Sort, Group
+# -------------------------------------------------
+@steps.step(3, "FILTER, SORT, GROUP", requires=(1,))
+def _filter_sort_group(ctx):
+    print(ctx.df[ctx.df["Salary"] > 75000])
+    print(ctx.df.sort_values(by="Salary", ascending=False))
+    print(ctx.df.groupby("Country")["Salary"].mean())
+
+
+# -------------------------------------------------
+# STEP 4: Read & Write CSV
+# -------------------------------------------------
+@steps.step(4, "READ & WRITE CSV", requires=(1,))
+def _read_write_csv(ctx):
+    write_frame(ctx.df, ctx.path)
+    ctx.df = read_frame(ctx.path)
+    if ctx.optimize:
+        optimized = optimize_dtypes(ctx.df)
+        print(memory_report(ctx.df, optimized))
+        ctx.df = optimized
+    print(ctx.df)
+
+
+# -------------------------------------------------
+# STEP 5: Bonus & Total Compensation
+# -------------------------------------------------
+@steps.step(5, "BONUS & TOTAL COMP", requires=(1,))
+def _bonus_total_comp(ctx):
+    ctx.df["Bonus"] = bonus(ctx.df["Salary"])
+    ctx.df["TotalComp"] = ctx.df["Salary"] + ctx.df["Bonus"]
+    print(ctx.df)
+
+
+# -------------------------------------------------
+# STEP 6: Merge / Join
+# -------------------------------------------------
+@steps.step(6, "MERGE / JOIN", requires=(1,))
+def _merge_join(ctx):
     dept_data = {
         "EmpID": [101, 102, 103, 104, 105],
         "Department": ["IT", "Finance", "HR", "IT", "Finance"]
     }
 
     df_dept = pd.DataFrame(dept_data)
-    df = pd.merge(df, df_dept, on="EmpID")
-    print(df)
+    ctx.df = pd.concat(join(ctx.df, df_dept, on="EmpID"), ignore_index=True)
+    print(ctx.df)
 
-    # -------------------------------------------------
-    # STEP 7: Date & Time
-    # -------------------------------------------------
-    print("\n=== STEP 7: DATE & TIME ===")
 
-    df["JoinDate"] = pd.to_datetime([
+# -------------------------------------------------
+# STEP 7: Date & Time
+# -------------------------------------------------
+@steps.step(7, "DATE & TIME", requires=(1,))
+def _date_time(ctx):
+    ctx.df["JoinDate"] = pd.to_datetime([
         "2020-01-10", "2019-03-15", "2021-07-01", "2018-11-20", "2022-06-05"
     ])
 
-    df["YearsInCompany"] = (datetime.now() - df["JoinDate"]).dt.days // 365
-    print(df[["Name", "JoinDate", "YearsInCompany"]])
-
-    # -------------------------------------------------
-    # STEP 8: Apply Function
-    # -------------------------------------------------
-    print("\n=== STEP 8: APPLY FUNCTION ===")
-
-    def salary_band(salary):
-        if salary >= 80000:
-            return "High"
-        elif salary >= 70000:
-            return "Medium"
-        else:
-            return "Low"
-
-    df["SalaryBand"] = df["Salary"].apply(salary_band)
-    print(df[["Name", "Salary", "SalaryBand"]])
-
-    # -------------------------------------------------
-    # STEP 9: Statistics
-    # -------------------------------------------------
-    print("\n=== STEP 9: STATISTICS ===")
-
-    print(df["Salary"].describe())
-    print(df[["Age", "Salary"]].corr())
-
-    # -------------------------------------------------
-    # STEP 10: Value Counts
-    # -------------------------------------------------
-    print("\n=== STEP 10: VALUE COUNTS ===")
-
-    print(df["Country"].value_counts())
-
-    # -------------------------------------------------
-    # STEP 11: Duplicates
-    # -------------------------------------------------
-    print("\n=== STEP 11: DUPLICATES ===")
-
-    print(df.duplicated())
-    df = df.drop_duplicates()
-
-    # -------------------------------------------------
-    # STEP 12: Rename Columns
-    # -------------------------------------------------
-    print("\n=== STEP 12: RENAME COLUMNS ===")
-
-    df = df.rename(columns={"EmpID": "EmployeeID"})
-    print(df.columns)
-
-    # -------------------------------------------------
-    # STEP 13: Lambda Function
-    # -------------------------------------------------
-    print("\n=== STEP 13: LAMBDA FUNCTION ===")
-
-    df["Tax"] = df["Salary"].apply(lambda x: x * 0.2)
-    print(df[["Name", "Salary", "Tax"]])
-
-    # -------------------------------------------------
-    # STEP 14: Ranking
-    # -------------------------------------------------
-    print("\n=== STEP 14: RANKING ===")
-
-    df["SalaryRank"] = df["Salary"].rank(ascending=False)
-    print(df[["Name", "Salary", "SalaryRank"]])
-
-    # -------------------------------------------------
-    # STEP 15: Multi Column Sort
-    # -------------------------------------------------
-    print("\n=== STEP 15: MULTI COLUMN SORT ===")
-
-    print(df.sort_values(by=["Country", "Salary"], ascending=[True, False]))
-
-    # -------------------------------------------------
-    # STEP 16: String Operations
-    # -------------------------------------------------
-    print("\n=== STEP 16: STRING OPS ===")
-
-    df["NameUpper"] = df["Name"].str.upper()
-    print(df[["Name", "NameUpper"]])
-
-    # -------------------------------------------------
-    # STEP 17: Conditional Column
-    # -------------------------------------------------
-    print("\n=== STEP 17: CONDITIONAL COLUMN ===")
-
-    df["SeniorFlag"] = np.where(df["Age"] >= 35, "Senior", "Junior")
-    print(df[["Name", "Age", "SeniorFlag"]])
-
-    # -------------------------------------------------
-    # STEP 18: Pivot Table
-    # -------------------------------------------------
-    print("\n=== STEP 18: PIVOT TABLE ===")
-
+    ctx.df["YearsInCompany"] = (datetime.now() - ctx.df["JoinDate"]).dt.days // 365
+    print(ctx.df[["Name", "JoinDate", "YearsInCompany"]])
+
+
+# -------------------------------------------------
+# STEP 8: Salary Band
+# -------------------------------------------------
+@steps.step(8, "SALARY BAND", requires=(1,))
+def _salary_band(ctx):
+    ctx.df["SalaryBand"] = salary_band(ctx.df["Salary"])
+    print(ctx.df[["Name", "Salary", "SalaryBand"]])
+
+
+# -------------------------------------------------
+# STEP 9: Statistics
+# -------------------------------------------------
+@steps.step(9, "STATISTICS", requires=(1,))
+def _statistics(ctx):
+    salary = NumericSummary("Salary")
+    salary.update(ctx.df["Salary"])
+    print(salary.describe())
+    print(ctx.df[["Age", "Salary"]].corr())
+
+
+# -------------------------------------------------
+# STEP 10: Value Counts
+# -------------------------------------------------
+@steps.step(10, "VALUE COUNTS", requires=(1,))
+def _value_counts(ctx):
+    print(ctx.df["Country"].value_counts())
+
+
+# -------------------------------------------------
+# STEP 11: Duplicates
+# -------------------------------------------------
+@steps.step(11, "DUPLICATES", requires=(1,))
+def _duplicates(ctx):
+    print(ctx.df.duplicated())
+    ctx.df = ctx.df.drop_duplicates()
+
+
+# -------------------------------------------------
+# STEP 12: Rename Columns
+# -------------------------------------------------
+@steps.step(12, "RENAME COLUMNS", requires=(1,))
+def _rename_columns(ctx):
+    ctx.df = ctx.df.rename(columns={"EmpID": "EmployeeID"})
+    print(ctx.df.columns)
+
+
+# -------------------------------------------------
+# STEP 13: Tax
+# -------------------------------------------------
+@steps.step(13, "TAX", requires=(1,))
+def _tax(ctx):
+    ctx.df["Tax"] = tax(ctx.df["Salary"])
+    print(ctx.df[["Name", "Salary", "Tax"]])
+
+
+# -------------------------------------------------
+# STEP 14: Ranking
+# -------------------------------------------------
+@steps.step(14, "RANKING", requires=(1,))
+def _ranking(ctx):
+    ctx.df["SalaryRank"] = ctx.df["Salary"].rank(ascending=False)
+    print(ctx.df[["Name", "Salary", "SalaryRank"]])
+
+
+# -------------------------------------------------
+# STEP 15: Multi Column Sort
+# -------------------------------------------------
+@steps.step(15, "MULTI COLUMN SORT", requires=(1,))
+def _multi_column_sort(ctx):
+    print(ctx.df.sort_values(by=["Country", "Salary"], ascending=[True, False]))
+
+
+# -------------------------------------------------
+# STEP 16: String Operations
+# -------------------------------------------------
+@steps.step(16, "STRING OPS", requires=(1,))
+def _string_ops(ctx):
+    ctx.df["NameUpper"] = ctx.df["Name"].str.upper()
+    print(ctx.df[["Name", "NameUpper"]])
+
+
+# -------------------------------------------------
+# STEP 17: Conditional Column
+# -------------------------------------------------
+@steps.step(17, "CONDITIONAL COLUMN", requires=(1,))
+def _conditional_column(ctx):
+    ctx.df["SeniorFlag"] = seniority(ctx.df["Age"])
+    print(ctx.df[["Name", "Age", "SeniorFlag"]])
+
+
+# -------------------------------------------------
+# STEP 18: Pivot Table
+# -------------------------------------------------
+@steps.step(18, "PIVOT TABLE", requires=(6,))
+def _pivot_table(ctx):
     pivot = pd.pivot_table(
-        df,
+        ctx.df,
         values="Salary",
         index="Department",
         columns="Country",
         aggfunc="mean"
     )
     print(pivot)
-    
-    # -------------------------------------------------
-    # STEP 19: Export Excel
-    # -------------------------------------------------
-    print("\n=== STEP 19: EXPORT EXCEL ===")
-    try:
-        df.to_excel("employees_final.xlsx", index=False)
-        print("employees_final.xlsx created")
-    except ModuleNotFoundError:
-        print("openpyxl is not installed — cannot write Excel files with pandas.")
-        print("Installing openpyxl and re-running will enable Excel export.")
-        print("Falling back to CSV export instead.")
-        df.to_csv("employees_final.csv", index=False)
-        print("employees_final.csv created")
-        
+
+
+# -------------------------------------------------
+# STEP 19: Export Excel
+# -------------------------------------------------
+@steps.step(19, "EXPORT EXCEL", requires=(1,))
+def _export_excel(ctx):
+    if ctx.group_by and ctx.group_by not in ctx.df:
+        sys.exit(f"--group-by {ctx.group_by}: no such column; columns are "
+                 f"{', '.join(map(str, ctx.df.columns))}")
+    path = export_excel(ctx.df, "employees_final.xlsx", group_by=ctx.group_by)
+    print(f"{path} created")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="pandas basics walkthrough.")
+    parser.add_argument(
+        "--path", default="employees.csv",
+        help="STEP 4 round-trip file; .parquet or .feather for columnar"
+    )
+    parser.add_argument(
+        "--optimize", action="store_true",
+        help="shrink dtypes after STEP 4 and report the memory saved"
+    )
+    parser.add_argument(
+        "--group-by", metavar="COLUMN",
+        help="STEP 19 writes one Excel sheet per value, e.g. Department "
+             "(with --steps, STEP 6 runs too to join it in)"
+    )
+    steps.add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.group_by and args.steps and 19 in args.steps:
+        # Sheets usually split on Department, which only STEP 6 joins in.
+        args.steps = sorted(set(args.steps) | {6})
+    context = SimpleNamespace(
+        path=args.path, optimize=args.optimize, group_by=args.group_by
+    )
+    steps.main(args, context)
+    return context
+
 
 if __name__ == "__main__":
     main()
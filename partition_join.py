@@ -0,0 +1,295 @@
+import argparse
+import glob
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from pandas.api.extensions import take
+
+
+JOINS = ("inner", "left")
+DEFAULT_PARTS = 16
+DEFAULT_CHUNKSIZE = 200_000
+# A right-hand CSV smaller than this is loaded and joined through a
+# KeyIndex instead of being partitioned.
+INDEX_LIMIT_BYTES = 256 * 2**20
+SUFFIXES = ("_x", "_y")
+# Both join paths follow SQL: a missing (NaN) key matches nothing, not even
+# another missing key. pd.merge would pair them, so such right-hand rows
+# are dropped before merging.
+
+
+def read_chunks(source, chunksize=DEFAULT_CHUNKSIZE):
+    # A DataFrame, a CSV path or an iterable of chunks, as chunks. An empty
+    # frame still gives one (empty) chunk, so joins keep its columns.
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, max(len(source), 1), chunksize):
+            yield source.iloc[start:start + chunksize]
+    elif isinstance(source, (str, os.PathLike)):
+        yield from pd.read_csv(source, chunksize=chunksize)
+    else:
+        yield from source
+
+
+def partition_of(keys, parts):
+    # Numeric keys are hashed as float64 so 101 and 101.0 land in the same
+    # partition whichever side they come from.
+    if pd.api.types.is_numeric_dtype(keys.dtype):
+        keys = keys.astype("float64")
+    else:
+        keys = keys.astype(str)
+    hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    return hashes % np.uint64(parts)
+
+
+def spill(source, on, parts, folder, side, chunksize=DEFAULT_CHUNKSIZE):
+    # Hash-partition `source` on `on` into pickles named
+    # <side>-<partition>-<chunk>.pkl. Returns an empty frame with the
+    # source's columns and dtypes, for partitions that got no rows.
+    schema = None
+    for i, chunk in enumerate(read_chunks(source, chunksize)):
+        if schema is None:
+            schema = chunk.iloc[:0]
+        buckets = partition_of(chunk[on], parts)
+        for part, piece in chunk.groupby(buckets, sort=False):
+            piece.to_pickle(os.path.join(folder, f"{side}-{part}-{i}.pkl"))
+    if schema is None:
+        raise ValueError(f"{side} input has no header")
+    return schema
+
+
+def load_spill(folder, side, part, schema):
+    paths = sorted(glob.glob(os.path.join(folder, f"{side}-{part}-*.pkl")))
+    if not paths:
+        return schema
+    return pd.concat([pd.read_pickle(path) for path in paths], ignore_index=True)
+
+
+def fanout(left_keys, right_keys):
+    # How many right rows each left key multiplies into. Sums and maxima
+    # over disjoint partitions combine into the whole-join figures.
+    right_counts = right_keys.value_counts()
+    left_counts = left_keys.value_counts()
+    matched = left_keys.isin(right_counts.index)
+    return {
+        "left_rows": len(left_keys),
+        "right_rows": len(right_keys),
+        "matched_left": int(matched.sum()),
+        "unmatched_left": int((~matched).sum()),
+        "left_duplicate_keys": int((left_counts > 1).sum()),
+        "right_duplicate_keys": int((right_counts > 1).sum()),
+        "max_fanout": int(right_counts.max()) if len(right_counts) else 0,
+    }
+
+
+def merge_reports(reports):
+    total = {}
+    for report in reports:
+        for name, value in report.items():
+            if name == "max_fanout":
+                total[name] = max(total.get(name, 0), value)
+            else:
+                total[name] = total.get(name, 0) + value
+    return total
+
+
+def join_partition(task):
+    folder, part, on, how, left_schema, right_schema = task
+    left = load_spill(folder, "left", part, left_schema)
+    right = load_spill(folder, "right", part, right_schema)
+    right = right[right[on].notna()]
+    joined = pd.merge(left, right, on=on, how=how, suffixes=SUFFIXES)
+    report = fanout(left[on], right[on])
+    report["output_rows"] = len(joined)
+
+    path = os.path.join(folder, f"joined-{part}.pkl")
+    joined.to_pickle(path)
+    return path, report
+
+
+def partitioned_join(left, right, on, how="inner", parts=DEFAULT_PARTS,
+                     workers=None, chunksize=DEFAULT_CHUNKSIZE, spill_dir=None,
+                     report=None):
+    """Grace hash join: spill both sides to disk in `parts` hash
+    partitions on `on`, join matching partitions in a process pool and
+    yield each joined partition as it finishes, so only one partition per
+    worker is ever in memory. Row order is not preserved. When `report` is
+    a dict it is filled with the fan-out summary once the join is done."""
+    if how not in JOINS:
+        raise ValueError(f"unsupported join {how!r}; use one of {JOINS}")
+
+    folder = tempfile.mkdtemp(prefix="join-", dir=spill_dir)
+    try:
+        left_schema = spill(left, on, parts, folder, "left", chunksize)
+        right_schema = spill(right, on, parts, folder, "right", chunksize)
+        tasks = [
+            (folder, part, on, how, left_schema, right_schema)
+            for part in range(parts)
+        ]
+
+        reports = []
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            finished = map(join_partition, tasks)
+            for path, part_report in finished:
+                reports.append(part_report)
+                yield pd.read_pickle(path)
+                os.remove(path)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(join_partition, task) for task in tasks]
+                for future in as_completed(futures):
+                    path, part_report = future.result()
+                    reports.append(part_report)
+                    yield pd.read_pickle(path)
+                    os.remove(path)
+
+        if report is not None:
+            report.update(merge_reports(reports))
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+class KeyIndex:
+    # Sorted key index over an in-memory right-hand table. Each left chunk
+    # is joined with searchsorted and take(), keeping the left row order.
+
+    def __init__(self, right, on):
+        right = right[right[on].notna()]
+        order = np.argsort(right[on].to_numpy(), kind="stable")
+        self.right = right.iloc[order].reset_index(drop=True)
+        self.on = on
+        self.keys, self.starts, self.counts = np.unique(
+            self.right[on].to_numpy(), return_index=True, return_counts=True
+        )
+        self.report = {}
+
+    def join(self, chunk, how="inner"):
+        if how not in JOINS:
+            raise ValueError(f"unsupported join {how!r}; use one of {JOINS}")
+        keys = chunk[self.on].to_numpy()
+        matched = np.zeros(len(keys), dtype=bool)
+        counts = np.zeros(len(keys), dtype=np.int64)
+        starts = np.zeros(len(keys), dtype=np.int64)
+        present = np.flatnonzero(pd.notna(keys))
+        if len(self.keys) and len(present):
+            # Missing keys are left out of the search; they match nothing.
+            wanted = keys[present]
+            pos = np.minimum(np.searchsorted(self.keys, wanted), len(self.keys) - 1)
+            hit = self.keys[pos] == wanted
+            matched[present] = hit
+            counts[present] = np.where(hit, self.counts[pos], 0)
+            starts[present] = self.starts[pos]
+        repeats = counts if how == "inner" else np.maximum(counts, 1)
+
+        left_rows = np.repeat(np.arange(len(chunk)), repeats)
+        offsets = np.arange(len(left_rows)) - np.repeat(
+            np.cumsum(repeats) - repeats, repeats
+        )
+        right_rows = np.where(
+            np.repeat(matched, repeats),
+            np.repeat(starts, repeats) + offsets,
+            -1,
+        )
+
+        joined = chunk.iloc[left_rows].reset_index(drop=True)
+        clash = set(chunk.columns) & set(self.right.columns) - {self.on}
+        joined = joined.rename(columns={c: c + SUFFIXES[0] for c in clash})
+        for column in self.right.columns:
+            if column == self.on:
+                continue
+            name = column + SUFFIXES[1] if column in clash else column
+            values = self.right[column].array
+            joined[name] = take(values, right_rows, allow_fill=True)
+
+        self.add_report(chunk[self.on], matched, counts, len(joined))
+        return joined
+
+    def add_report(self, keys, matched, counts, output_rows):
+        part = {
+            "left_rows": len(keys),
+            "right_rows": 0,
+            "matched_left": int(matched.sum()),
+            "unmatched_left": int((~matched).sum()),
+            "output_rows": output_rows,
+            "max_fanout": int(counts.max()) if len(counts) else 0,
+        }
+        self.report = merge_reports([self.report, part])
+        self.report["right_rows"] = len(self.right)
+        self.report["right_duplicate_keys"] = int((self.counts > 1).sum())
+
+
+def indexed_join(left, right, on, how="inner", chunksize=DEFAULT_CHUNKSIZE,
+                 report=None):
+    # Stream `left` through a KeyIndex built once over `right`.
+    index = KeyIndex(right, on)
+    for chunk in read_chunks(left, chunksize):
+        yield index.join(chunk, how)
+    if report is not None:
+        report.update(index.report)
+
+
+def join(left, right, on, how="inner", report=None, **options):
+    """Join `left` to `right` on `on` and yield the result in chunks. An
+    in-memory right side, or a right-hand CSV under INDEX_LIMIT_BYTES, is
+    joined through a KeyIndex; anything larger goes through
+    partitioned_join(). `options` are passed to the chosen join."""
+    if isinstance(right, (str, os.PathLike)) and os.path.getsize(right) < INDEX_LIMIT_BYTES:
+        right = pd.read_csv(right)
+    if isinstance(right, pd.DataFrame):
+        chunksize = options.get("chunksize", DEFAULT_CHUNKSIZE)
+        return indexed_join(left, right, on, how, chunksize, report)
+    return partitioned_join(left, right, on, how, report=report, **options)
+
+
+def print_report(report):
+    for name in ("left_rows", "right_rows", "output_rows", "matched_left",
+                 "unmatched_left", "left_duplicate_keys",
+                 "right_duplicate_keys", "max_fanout"):
+        if name in report:
+            print(f"{name:<22}{report[name]}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Join two CSV files on a key.")
+    parser.add_argument("left")
+    parser.add_argument("right")
+    parser.add_argument("target", help="CSV file for the joined rows")
+    parser.add_argument("--on", required=True, metavar="COLUMN")
+    parser.add_argument("--how", choices=JOINS, default="inner")
+    parser.add_argument("--parts", type=int, default=DEFAULT_PARTS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument("--spill-dir", help="folder for partition files")
+    parser.add_argument(
+        "--partitioned", action="store_true",
+        help="always partition, even when the right side would fit in memory"
+    )
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    report = {}
+    if args.partitioned:
+        chunks = partitioned_join(
+            args.left, args.right, args.on, args.how, parts=args.parts,
+            workers=args.workers, chunksize=args.chunksize,
+            spill_dir=args.spill_dir, report=report,
+        )
+    else:
+        chunks = join(
+            args.left, args.right, args.on, args.how, report=report,
+            parts=args.parts, workers=args.workers, chunksize=args.chunksize,
+            spill_dir=args.spill_dir,
+        )
+
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(args.target, index=False, mode="a" if i else "w", header=not i)
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
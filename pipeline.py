@@ -0,0 +1,422 @@
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from run_metrics import run_measured
+
+
+FAIL_FAST = "fail-fast"
+CONTINUE = "continue"
+
+DEFAULT_LOG_DIR = "logs"
+DEFAULT_CACHE_DIR = ".pipeline_cache"
+
+
+def local_imports(script):
+    # Every module next to `script` that it imports, directly or through
+    # another local module, including imports inside functions. Returns
+    # the sorted file paths; third-party and standard modules are ignored.
+    folder = os.path.dirname(script)
+    found, pending = set(), [script]
+    while pending:
+        try:
+            with open(pending.pop(), encoding="utf-8") as f:
+                tree = ast.parse(f.read())
+        except (OSError, SyntaxError, ValueError):
+            continue
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                path = os.path.join(folder, name.split(".")[0] + ".py")
+                if path != script and path not in found and os.path.exists(path):
+                    found.add(path)
+                    pending.append(path)
+    return sorted(found)
+
+
+def build_graph(steps):
+    # A step depends on the step that declares one of its inputs as an
+    # output, plus any names listed in its "after". Returns
+    # {name: set(dependencies)} and a topological order.
+    by_name = {}
+    producers = {}
+    for step in steps:
+        if step["name"] in by_name:
+            raise ValueError(f"duplicate step name: {step['name']}")
+        by_name[step["name"]] = step
+        for output in step.get("outputs", []):
+            if output in producers:
+                raise ValueError(
+                    f"{output} is written by both {producers[output]} "
+                    f"and {step['name']}"
+                )
+            producers[output] = step["name"]
+
+    deps = {}
+    for step in steps:
+        needs = set(step.get("after", []))
+        needs.update(
+            producers[i] for i in step.get("inputs", []) if i in producers
+        )
+        needs.discard(step["name"])
+        unknown = needs - by_name.keys()
+        if unknown:
+            raise ValueError(f"{step['name']} runs after unknown steps {unknown}")
+        deps[step["name"]] = needs
+
+    order = []
+    remaining = {name: set(needs) for name, needs in deps.items()}
+    while remaining:
+        ready = sorted(n for n, needs in remaining.items() if not needs)
+        if not ready:
+            raise ValueError(f"dependency cycle between {sorted(remaining)}")
+        for name in ready:
+            order.append(name)
+            del remaining[name]
+        for needs in remaining.values():
+            needs.difference_update(ready)
+    return deps, order
+
+
+def run_step(step, log_dir):
+    log_path = os.path.join(log_dir, f"{step['name']}.log")
+    command = [sys.executable, step["script"]] + list(step.get("args", []))
+
+    start = time.time()
+    metrics = {}
+    if not os.path.exists(step["script"]):
+        with open(log_path, "w") as log:
+            log.write(f"{step['script']} not found\n")
+        returncode = 127
+    else:
+        with open(log_path, "w") as log:
+            returncode, metrics = run_measured(
+                command, stdin=subprocess.DEVNULL, stdout=log,
+                stderr=subprocess.STDOUT
+            )
+    return {
+        "status": "ok" if returncode == 0 else "failed",
+        "returncode": returncode,
+        "start": start,
+        "end": time.time(),
+        "log": log_path,
+        "metrics": metrics,
+    }
+
+
+def hash_file(path):
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def step_sources(step):
+    # Declared "sources" (files a step reads that are not imports) plus the
+    # local modules its script imports.
+    return sorted(set(step.get("sources", [])) | set(local_imports(step["script"])))
+
+
+class BuildCache:
+    # Remembers, per step, the hashes of what went into its last successful
+    # run (script, the local modules it imports plus any extra "sources",
+    # args, input files) and of what came out
+    # (output files and the captured log). Outputs are kept in a
+    # content-addressed object store so a skipped step can restore them.
+    # Steps with "cache": False always run.
+
+    def __init__(self, root=DEFAULT_CACHE_DIR):
+        self.root = root
+        self.objects = os.path.join(root, "objects")
+        self.state_path = os.path.join(root, "state.json")
+        self._lock = threading.Lock()
+        try:
+            with open(self.state_path) as f:
+                self.state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.state = {}
+
+    def fingerprint(self, step, known=None):
+        # `known` maps paths to the digest they will have by the time the
+        # step runs (used by dry runs for outputs that would be restored).
+        known = known or {}
+
+        def digest(path):
+            return known[path] if path in known else hash_file(path)
+
+        return {
+            "script": hash_file(step["script"]),
+            "sources": {p: hash_file(p) for p in step_sources(step)},
+            "args": hashlib.sha256(
+                json.dumps(list(step.get("args", []))).encode()
+            ).hexdigest(),
+            "inputs": {p: digest(p) for p in step.get("inputs", [])},
+        }
+
+    def check(self, step, restore=True, known=None):
+        # Returns None when the step is up to date (restoring outputs from
+        # the object store if needed), otherwise the reason it must run.
+        if not step.get("cache", True):
+            return "not cacheable"
+        previous = self.state.get(step["name"])
+        if previous is None:
+            return "no previous successful run"
+
+        current = self.fingerprint(step, known)
+        if current["script"] != previous["script"]:
+            return f"{step['script']} changed"
+        for path, digest in current["sources"].items():
+            if previous["sources"].get(path) != digest:
+                return f"source {path} changed"
+        if current["args"] != previous["args"]:
+            return "arguments changed"
+        for path, digest in current["inputs"].items():
+            if previous["inputs"].get(path) != digest:
+                return f"input {path} changed"
+
+        for path, digest in previous["outputs"].items():
+            if hash_file(path) == digest:
+                continue
+            if not os.path.exists(self._object(digest)):
+                return f"output {path} changed and no cached copy"
+            if restore:
+                self._restore(digest, path)
+        return None
+
+    def record(self, step, fingerprint, log_path):
+        entry = dict(fingerprint)
+        entry["outputs"] = {}
+        for path in step.get("outputs", []):
+            digest = hash_file(path)
+            if digest is None:
+                return
+            self._store(path, digest)
+            entry["outputs"][path] = digest
+        entry["log"] = hash_file(log_path)
+        self._store(log_path, entry["log"])
+
+        with self._lock:
+            self.state[step["name"]] = entry
+            os.makedirs(self.root, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.state, f, indent=2)
+            os.replace(tmp, self.state_path)
+
+    def restore_log(self, step, log_path):
+        digest = self.state[step["name"]]["log"]
+        if os.path.exists(self._object(digest)):
+            self._restore(digest, log_path)
+        else:
+            with open(log_path, "w") as log:
+                log.write("(cached; log not kept)\n")
+
+    def _object(self, digest):
+        return os.path.join(self.objects, digest[:2], digest)
+
+    def _store(self, path, digest):
+        target = self._object(digest)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(path, target + ".tmp")
+            os.replace(target + ".tmp", target)
+
+    def _restore(self, digest, path):
+        folder = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        os.close(fd)
+        shutil.copyfile(self._object(digest), tmp)
+        os.replace(tmp, path)
+
+
+def execute_step(step, log_dir, cache=None, force=False):
+    # run_step() behind the build cache.
+    log_path = os.path.join(log_dir, f"{step['name']}.log")
+    reason = "cache disabled"
+    if cache is not None:
+        reason = "forced" if force else cache.check(step)
+        if reason is None:
+            now = time.time()
+            cache.restore_log(step, log_path)
+            return {"status": "ok", "cached": True, "returncode": 0,
+                    "start": now, "end": now, "log": log_path}
+
+    fingerprint = cache.fingerprint(step) if cache is not None else None
+    result = run_step(step, log_dir)
+    result["reason"] = reason
+    if cache is not None and result["status"] == "ok":
+        cache.record(step, fingerprint, result["log"])
+    return result
+
+
+def explain(steps, cache, force=()):
+    # Dry run: why each step would (or would not) run, without running or
+    # restoring anything. A real run skips a step whose upstream reran but
+    # wrote the same outputs, so upstream outputs are taken to be their last
+    # recorded ones; only an upstream without a record (or one that is not
+    # cacheable, whose outputs can change every run) leaves it undecided.
+    deps, order = build_graph(steps)
+    by_name = {step["name"]: step for step in steps}
+    plan = {}
+    known = {}
+    for name in order:
+        step = by_name[name]
+        inputs = set(step.get("inputs", []))
+        unknown = sorted(
+            d for d in deps[name]
+            if plan[d] is not None
+            and inputs & set(by_name[d].get("outputs", []))
+            and (d not in cache.state or not by_name[d].get("cache", True))
+        )
+        if name in force:
+            plan[name] = "forced"
+        elif unknown:
+            plan[name] = f"upstream {', '.join(unknown)} reruns with unknown outputs"
+        else:
+            plan[name] = cache.check(step, False, known)
+        if name in cache.state:
+            known.update(cache.state[name]["outputs"])
+    return plan
+
+
+def run_pipeline(steps, workers=None, policy=FAIL_FAST,
+                 log_dir=DEFAULT_LOG_DIR, echo=True, cache=None, force=()):
+    # Runs every step whose dependencies succeeded, at most `workers` at a
+    # time. FAIL_FAST stops launching steps after the first failure;
+    # CONTINUE only skips the failed step's dependents. With a BuildCache,
+    # up-to-date steps are skipped unless named in `force`.
+    deps, order = build_graph(steps)
+    by_name = {step["name"]: step for step in steps}
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(log_dir, exist_ok=True)
+
+    results = {}
+    pending = {}
+    failed = False
+
+    def ready():
+        for name in order:
+            if name in results or name in pending.values():
+                continue
+            if all(results.get(d, {}).get("status") == "ok" for d in deps[name]):
+                yield name
+
+    def skip_blocked():
+        for name in order:
+            if name in results or name in pending.values():
+                continue
+            if any(results.get(d, {}).get("status") in ("failed", "skipped")
+                   for d in deps[name]):
+                results[name] = {"status": "skipped"}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            if not (failed and policy == FAIL_FAST):
+                for name in ready():
+                    if len(pending) >= workers:
+                        break
+                    if echo:
+                        print(f"=== STARTED: {name} ===", flush=True)
+                    future = pool.submit(
+                        execute_step, by_name[name], log_dir, cache,
+                        name in force
+                    )
+                    pending[future] = name
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                result = results[name] = future.result()
+                if echo:
+                    report(name, result)
+                if result["status"] != "ok":
+                    failed = True
+                    skip_blocked()
+
+    for name in order:
+        results.setdefault(name, {"status": "skipped"})
+    return results
+
+
+def report(name, result):
+    # Print a finished step's captured output as one block.
+    duration = result["end"] - result["start"]
+    status = "cached" if result.get("cached") else result["status"]
+    print(f"\n=== {name}: {status.upper()} "
+          f"({duration:.2f}s, log: {result['log']}) ===")
+    with open(result["log"]) as log:
+        sys.stdout.write(log.read())
+    sys.stdout.flush()
+
+
+def critical_path(steps, results):
+    # Longest chain of dependent steps by measured duration.
+    deps, order = build_graph(steps)
+    finish = {}
+    previous = {}
+    for name in order:
+        result = results.get(name, {})
+        duration = result["end"] - result["start"] if "end" in result else 0.0
+        before = max(deps[name], key=lambda d: finish[d], default=None)
+        finish[name] = duration + (finish[before] if before else 0.0)
+        previous[name] = before
+
+    if not finish:
+        return [], 0.0
+    name = max(finish, key=finish.get)
+    length = finish[name]
+    chain = []
+    while name:
+        chain.append(name)
+        name = previous[name]
+    return chain[::-1], length
+
+
+def run_record_steps(steps, results):
+    # Per-step entries for run_metrics.new_record().
+    entries = {}
+    for step in steps:
+        result = results[step["name"]]
+        entry = {"status": result["status"]}
+        if result.get("cached"):
+            entry["cached"] = True
+        entry.update(result.get("metrics", {}))
+        entries[step["name"]] = entry
+    return entries
+
+
+def print_summary(steps, results, wall):
+    print("\n=== PIPELINE SUMMARY ===")
+    total = 0.0
+    for step in steps:
+        result = results[step["name"]]
+        if "end" in result:
+            duration = result["end"] - result["start"]
+            total += duration
+            status = "cached" if result.get("cached") else result["status"]
+            print(f"{step['name']:<20} {status:<8} {duration:>8.2f}s")
+        else:
+            print(f"{step['name']:<20} {result['status']:<8} {'-':>9}")
+
+    chain, length = critical_path(steps, results)
+    print(f"Wall time: {wall:.2f}s  (sum of steps {total:.2f}s)")
+    print(f"Critical path: {' -> '.join(chain)} ({length:.2f}s)")
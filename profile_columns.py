@@ -0,0 +1,324 @@
+# Single-pass column profiler for large CSV files.
+# Usage: python profile_columns.py <filename> [--chunksize N] [--workers N]
+#                                  [--top K] [--json]
+#
+# Reads the file once in chunks and keeps a fixed-size summary per column:
+# null count, inferred type, min/max, a HyperLogLog distinct estimate,
+# Misra-Gries heavy hitters for the most frequent values and, for numeric
+# columns, mean/std and sketched quartiles. Every summary can be merged
+# with another, so byte-range shards of the file are profiled on a process
+# pool and combined at the end.
+
+import io
+import json
+import mmap
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+from check_missing import MISSING_TOKENS, read_headers, split_ranges
+from numeric_summary import QUARTILES, NumericSummary
+
+
+DEFAULT_CHUNKSIZE = 100_000
+HLL_PRECISION = 12
+TOPK_CAPACITY = 1024
+
+TYPES = ["empty", "integer", "float", "datetime", "string"]
+
+
+class HyperLogLog:
+    # 2**precision one-byte registers; standard error ~1.04 / sqrt(m).
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes):
+        if not len(hashes):
+            return
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - p)) - 1)
+        # Leading zeros in the low (64 - p) bits, plus one.
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = (64 - p - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities.
+            return int(round(m * np.log(m / zeros)))
+        return int(round(raw))
+
+
+class HeavyHitters:
+    # Misra-Gries summary over at most `capacity` values. Counts are lower
+    # bounds, off by at most (total / capacity); merging two summaries keeps
+    # the same guarantee.
+
+    def __init__(self, capacity=TOPK_CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+
+    def add_counts(self, counts):
+        combined = self.counts.add(counts, fill_value=0).astype(np.int64)
+        if len(combined) > self.capacity:
+            cut = combined.nlargest(self.capacity + 1).iloc[-1]
+            combined = combined[combined > cut] - cut
+        self.counts = combined
+
+    def merge(self, other):
+        self.add_counts(other.counts)
+
+    def top(self, k):
+        return [(str(v), int(c)) for v, c in self.counts.nlargest(k).items()]
+
+
+class ColumnProfile:
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = 0
+        self.nulls = 0
+        self.type_counts = dict.fromkeys(TYPES[1:], 0)
+        self.num_min = self.num_max = None
+        self.date_min = self.date_max = None
+        self.str_min = self.str_max = None
+        self.distinct = HyperLogLog()
+        self.frequent = HeavyHitters()
+        self.numeric = NumericSummary(name)
+
+    def update(self, values):
+        self.rows += len(values)
+        present = values[~(values.isna() | values.isin(MISSING_TOKENS))]
+        self.nulls += len(values) - len(present)
+        if present.empty:
+            return
+
+        self.distinct.add_hashes(
+            pd.util.hash_pandas_object(present, index=False).to_numpy()
+        )
+        self.frequent.add_counts(present.value_counts())
+        self.str_min = _min(self.str_min, present.min())
+        self.str_max = _max(self.str_max, present.max())
+
+        # Once a column has held free text it stays a string column, so
+        # the parse attempts below are skipped for the rest of the file.
+        if self.inferred_type() == "string":
+            return
+
+        try:
+            numbers = pd.to_numeric(present)
+        except (ValueError, TypeError):
+            numbers = None
+        if numbers is not None:
+            kind = "integer" if numbers.dtype.kind in "iu" else "float"
+            self.type_counts[kind] += len(present)
+            self.num_min = _min(self.num_min, float(numbers.min()))
+            self.num_max = _max(self.num_max, float(numbers.max()))
+            self.numeric.update(numbers.to_numpy(dtype=float))
+            return
+
+        try:
+            dates = pd.to_datetime(present, format="ISO8601")
+        except (ValueError, TypeError):
+            dates = None
+        if dates is not None:
+            self.type_counts["datetime"] += len(present)
+            self.date_min = _min(self.date_min, dates.min().isoformat())
+            self.date_max = _max(self.date_max, dates.max().isoformat())
+            return
+
+        self.type_counts["string"] += len(present)
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.nulls += other.nulls
+        for kind, count in other.type_counts.items():
+            self.type_counts[kind] += count
+        self.num_min = _min(self.num_min, other.num_min)
+        self.num_max = _max(self.num_max, other.num_max)
+        self.date_min = _min(self.date_min, other.date_min)
+        self.date_max = _max(self.date_max, other.date_max)
+        self.str_min = _min(self.str_min, other.str_min)
+        self.str_max = _max(self.str_max, other.str_max)
+        self.distinct.merge(other.distinct)
+        self.frequent.merge(other.frequent)
+        self.numeric.merge(other.numeric)
+
+    def inferred_type(self):
+        # Widest type over all chunks: integer < float < string; datetimes
+        # mixed with anything else are strings.
+        counts = self.type_counts
+        if counts["string"] or (
+            counts["datetime"] and (counts["integer"] or counts["float"])
+        ):
+            return "string"
+        if counts["datetime"]:
+            return "datetime"
+        if counts["float"]:
+            return "float"
+        if counts["integer"]:
+            return "integer"
+        return "empty"
+
+    def summary(self, top=5):
+        kind = self.inferred_type()
+        low, high = {
+            "integer": (self.num_min, self.num_max),
+            "float": (self.num_min, self.num_max),
+            "datetime": (self.date_min, self.date_max),
+            "string": (self.str_min, self.str_max),
+        }.get(kind, (None, None))
+        if kind == "integer" and low is not None:
+            low, high = int(low), int(high)
+        numeric = {}
+        if kind in ("integer", "float") and self.numeric.count:
+            numeric = {
+                "mean": self.numeric.mean,
+                "std": self.numeric.std(),
+                "quartiles": [float(q) for q in self.numeric.quantile(QUARTILES)],
+            }
+        return {
+            "column": self.name,
+            "rows": self.rows,
+            "nulls": self.nulls,
+            "type": kind,
+            "min": low,
+            "max": high,
+            "distinct": self.distinct.estimate(),
+            "top": self.frequent.top(top),
+            **numeric,
+        }
+
+
+def _min(a, b):
+    return b if a is None else a if b is None else min(a, b)
+
+
+def _max(a, b):
+    return b if a is None else a if b is None else max(a, b)
+
+
+def new_profiles(headers):
+    return {name: ColumnProfile(name) for name in headers}
+
+
+def profile_chunks(chunks, headers):
+    profiles = new_profiles(headers)
+    for chunk in chunks:
+        for name in headers:
+            profiles[name].update(chunk[name])
+    return profiles
+
+
+def merge_profiles(left, right):
+    for name, profile in right.items():
+        left[name].merge(profile)
+    return left
+
+
+def read_options(headers, chunksize):
+    return dict(
+        dtype=str, keep_default_na=False, na_filter=False,
+        chunksize=chunksize, header=None, names=headers
+    )
+
+
+def profile_range(task):
+    # Profile one newline-aligned byte range; runs in a worker process.
+    filename, start, end, headers, chunksize = task
+    with open(filename, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = mm[start:end]
+    if not data.strip():
+        return new_profiles(headers)
+    chunks = pd.read_csv(io.BytesIO(data), **read_options(headers, chunksize))
+    return profile_chunks(chunks, headers)
+
+
+def profile_file(filename, chunksize=DEFAULT_CHUNKSIZE, workers=1):
+    headers, data_start = read_headers(filename)
+
+    if workers <= 1:
+        with open(filename, "rb") as f:
+            f.seek(data_start)
+            chunks = pd.read_csv(f, **read_options(headers, chunksize))
+            return profile_chunks(chunks, headers)
+
+    tasks = [
+        (filename, start, end, headers, chunksize)
+        for start, end in split_ranges(filename, data_start, workers)
+    ]
+    profiles = new_profiles(headers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for shard in pool.map(profile_range, tasks):
+            merge_profiles(profiles, shard)
+    return profiles
+
+
+def print_profiles(profiles, top):
+    for profile in profiles.values():
+        s = profile.summary(top)
+        print(f"\n=== {s['column']} ===")
+        print(f"Type: {s['type']}")
+        print(f"Rows: {s['rows']}  Nulls: {s['nulls']}")
+        print(f"Min: {s['min']}  Max: {s['max']}")
+        print(f"Distinct (approx): {s['distinct']}")
+        if "quartiles" in s:
+            print(f"Mean: {s['mean']:.6g}  Std: {s['std']:.6g}")
+            print("Quartiles (approx):", ", ".join(f"{q:.6g}" for q in s["quartiles"]))
+        print("Top values:", ", ".join(f"{v} ({c})" for v, c in s["top"]))
+
+
+def parse_args(argv):
+    options = {
+        "chunksize": DEFAULT_CHUNKSIZE,
+        "workers": 1,
+        "top": 5,
+        "json": False,
+    }
+    positional = []
+
+    args = iter(argv)
+    for arg in args:
+        if arg == "--json":
+            options["json"] = True
+        elif arg in ("--chunksize", "--workers", "--top"):
+            options[arg[2:]] = max(1, int(next(args)))
+        else:
+            positional.append(arg)
+
+    if len(positional) != 1:
+        print("Usage: python profile_columns.py <filename> [--chunksize N] "
+              "[--workers N] [--top K] [--json]")
+        sys.exit(1)
+
+    options["filename"] = positional[0]
+    return options
+
+
+def main():
+    options = parse_args(sys.argv[1:])
+    profiles = profile_file(
+        options["filename"], options["chunksize"], options["workers"]
+    )
+
+    if options["json"]:
+        summaries = [p.summary(options["top"]) for p in profiles.values()]
+        print(json.dumps(summaries, indent=2))
+    else:
+        print_profiles(profiles, options["top"])
+
+
+if __name__ == "__main__":
+    main()
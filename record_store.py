@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+import struct
+import time
+import numpy as np
+import pandas as pd
+
+
+MAGIC = b"EMPREC1\n"
+# The first record starts on a multiple of this. Later records follow at
+# multiples of the record size, so fields stay aligned only if the schema
+# keeps them so: EMPLOYEE_SCHEMA puts every field at a multiple of 8 in a
+# 224-byte record.
+ALIGN = 64
+DEFAULT_CHUNKSIZE = 500_000
+
+# pandas column -> (record field, dtype). Widths are in characters.
+EMPLOYEE_SCHEMA = {
+    "EmpID": ("emp_id", "<i8"),
+    "Name": ("name", "<U16"),
+    "Age": ("age", "<f8"),
+    "Country": ("country", "<U16"),
+    "Department": ("department", "<U16"),
+    "Salary": ("salary", "<f8"),
+    "JoinDate": ("join_date", "<M8[D]"),
+}
+
+
+def schema_dtype(schema):
+    return np.dtype([(field, kind) for field, kind in schema.values()])
+
+
+class RecordStore:
+    """Fixed-width records in one file: MAGIC, a little-endian uint32
+    header length, a JSON header with the dtype and the pandas column for
+    each field, padding to ALIGN, then the raw records. records() maps the
+    file with np.memmap, so opening costs the same at any size and
+    filters such as r[r["salary"] > 80000] run on the mapped pages. The
+    row count is the data size divided by the record size, so a torn
+    append only loses its own partial record."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a record store")
+            (length,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(length))
+        self.dtype = np.dtype([tuple(field) for field in header["dtype"]])
+        self.columns = header["columns"]
+        self.offset = len(MAGIC) + 4 + length
+
+    @classmethod
+    def create(cls, path, schema=EMPLOYEE_SCHEMA, overwrite=False):
+        # schema maps pandas column names to (field, dtype) pairs.
+        if os.path.exists(path) and not overwrite:
+            raise FileExistsError(path)
+        dtype = schema_dtype(schema)
+        body = json.dumps({
+            "dtype": dtype.descr,
+            "columns": {column: field for column, (field, _) in schema.items()},
+        }).encode()
+        # Pad the JSON with spaces so the records start aligned.
+        prefix = len(MAGIC) + 4
+        body += b" " * (-(prefix + len(body)) % ALIGN)
+
+        with open(path, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(body)) + body)
+        return cls(path)
+
+    def __len__(self):
+        return (os.path.getsize(self.path) - self.offset) // self.dtype.itemsize
+
+    def records(self, mode="r"):
+        # Zero-copy view of every record; mode="r+" writes through to disk.
+        rows = len(self)
+        if not rows:
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode=mode,
+                         offset=self.offset, shape=(rows,))
+
+    def from_frame(self, df):
+        # Build records from a DataFrame; missing columns get NaN/NaT/""
+        # (or 0 for integers). Text longer than its field, or a missing
+        # value in an integer field, is an error, not a silent truncation
+        # or a made-up number.
+        records = np.zeros(len(df), dtype=self.dtype)
+        for column, field in self.columns.items():
+            kind = self.dtype[field]
+            if column not in df:
+                if kind.kind in "fM":
+                    records[field] = np.nan if kind.kind == "f" else np.datetime64("NaT")
+                continue
+            values = df[column]
+            if kind.kind == "U":
+                text = values.fillna("").astype(str)
+                width = kind.itemsize // 4
+                too_long = text.str.len() > width
+                if too_long.any():
+                    raise ValueError(
+                        f"{column} has values longer than {width} characters, "
+                        f"e.g. {text[too_long].iloc[0]!r}"
+                    )
+                records[field] = text.to_numpy(dtype=kind)
+            elif kind.kind == "M":
+                records[field] = pd.to_datetime(values).to_numpy().astype(kind)
+            else:
+                if kind.kind in "iu" and values.isna().any():
+                    raise ValueError(
+                        f"{column} has missing values, which a {kind} field "
+                        f"cannot hold (e.g. row {values.index[values.isna()][0]!r})"
+                    )
+                records[field] = values.to_numpy(dtype=kind)
+        return records
+
+    def to_frame(self, records=None):
+        # Copies into pandas; pass a filtered slice to convert only that.
+        records = self.records() if records is None else records
+        return pd.DataFrame({
+            column: np.asarray(records[field])
+            for column, field in self.columns.items()
+        })
+
+    def append(self, data):
+        # Add records (a structured array or a DataFrame) at the end.
+        if isinstance(data, pd.DataFrame):
+            data = self.from_frame(data)
+        data = np.ascontiguousarray(data, dtype=self.dtype)
+        with open(self.path, "r+b") as f:
+            # Drop a partial record left by an interrupted append.
+            end = self.offset + len(self) * self.dtype.itemsize
+            f.truncate(end)
+            f.seek(end)
+            f.write(data.tobytes())
+        return len(data)
+
+
+def import_csv(source, path, chunksize=DEFAULT_CHUNKSIZE, schema=EMPLOYEE_SCHEMA):
+    store = RecordStore.create(path, schema, overwrite=True)
+    rows = 0
+    for chunk in pd.read_csv(source, chunksize=chunksize):
+        rows += store.append(chunk)
+    return store, rows
+
+
+def export_csv(store, target, chunksize=DEFAULT_CHUNKSIZE):
+    records = store.records()
+    for start in range(0, max(len(records), 1), chunksize):
+        frame = store.to_frame(records[start:start + chunksize])
+        frame.to_csv(target, index=False, mode="a" if start else "w",
+                     header=not start)
+    return len(records)
+
+
+def benchmark(store, source):
+    # Time opening the store against parsing the same rows from CSV.
+    start = time.perf_counter()
+    records = store.records()
+    opened = time.perf_counter() - start
+
+    start = time.perf_counter()
+    high = records[records["salary"] > 80000]
+    filtered = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pd.read_csv(source)
+    parsed = time.perf_counter() - start
+    return {
+        "rows": len(records),
+        "open_s": opened,
+        "filter_s": filtered,
+        "matches": len(high),
+        "read_csv_s": parsed,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Memory-mapped employee records.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load = commands.add_parser("import", help="build a store from a CSV file")
+    load.add_argument("source")
+    load.add_argument("store")
+    load.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+
+    dump = commands.add_parser("export", help="write a store back to CSV")
+    dump.add_argument("store")
+    dump.add_argument("target")
+
+    info = commands.add_parser("info", help="show the layout and first rows")
+    info.add_argument("store")
+    info.add_argument("-n", type=int, default=5)
+
+    bench = commands.add_parser("bench", help="open time vs pd.read_csv")
+    bench.add_argument("store")
+    bench.add_argument("source", help="the CSV the store was imported from")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    if args.command == "import":
+        _, rows = import_csv(args.source, args.store, args.chunksize)
+        print(f"{args.store}: {rows} records")
+        return
+
+    store = RecordStore(args.store)
+    if args.command == "export":
+        rows = export_csv(store, args.target)
+        print(f"{args.target}: {rows} rows written")
+    elif args.command == "info":
+        print(f"{args.store}: {len(store)} records of {store.dtype.itemsize} bytes")
+        for name in store.dtype.names:
+            print(f"  {name:<12} {store.dtype[name]}")
+        print(store.to_frame(store.records()[:args.n]))
+    elif args.command == "bench":
+        r = benchmark(store, args.source)
+        print(f"{r['rows']} records")
+        print(f"open (memmap)      {r['open_s'] * 1000:>10.2f} ms")
+        print(f"filter salary>80k  {r['filter_s'] * 1000:>10.2f} ms ({r['matches']} rows)")
+        print(f"pd.read_csv        {r['read_csv_s'] * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+
+STATS = ("sum", "mean", "var", "std", "min", "max")
+DEFAULT_CHUNKSIZE = 100_000
+# Prefix sums restart every BLOCK values (or every `window`, if larger) at
+# fixed global positions, which bounds the rounding error they pick up and
+# makes every window sum independent of where the chunks were cut.
+BLOCK = 4096
+
+
+def block_cumsum(values, start, block, carry):
+    # Running sums of `values` (global positions start...) that restart at
+    # every multiple of `block`. `carry` is the running sum just before
+    # `start`; prepending it keeps the additions in the same order as a
+    # single pass over the whole series.
+    out = np.empty(len(values))
+    i = 0
+    while i < len(values):
+        pos = start + i
+        end = min(len(values), i + block - pos % block)
+        head = carry if pos % block else 0.0
+        out[i:end] = np.cumsum(np.concatenate(([head], values[i:end])))[1:]
+        i = end
+    return out
+
+
+def sliding_extreme(values, window, ufunc, fill):
+    # van Herk / Gil-Werman: prefix and suffix extremes over blocks of
+    # `window`, combined per window. Three passes, no per-element loop.
+    n = len(values)
+    blocks = -(-n // window)
+    padded = np.full(blocks * window, fill)
+    padded[:n] = values
+    grid = padded.reshape(blocks, window)
+    prefix = ufunc.accumulate(grid, axis=1).ravel()
+    suffix = ufunc.accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+    starts = np.arange(n - window + 1)
+    return ufunc(suffix[starts], prefix[starts + window - 1])
+
+
+class RollingWindow:
+    """Rolling sum/mean/var/std/min/max over a series fed in chunks.
+
+    update() takes the next chunk and returns the statistics of every
+    full window that ends inside it, as arrays keyed by name; the first
+    window - 1 values produce nothing, like np.convolve(mode="valid").
+    Results are identical however the series is split into chunks. A
+    window containing NaN gives NaN."""
+
+    def __init__(self, window, stats=STATS, ddof=0, block=BLOCK):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        unknown = set(stats) - set(STATS)
+        if unknown:
+            raise ValueError(f"unknown statistics {sorted(unknown)}")
+        self.window = window
+        self.stats = tuple(stats)
+        self.ddof = ddof
+        self.block = max(block, window)
+        self.seen = 0
+        # For var/std every block is shifted by its own first real value
+        # before squaring, so the sums stay the size of the spread within a
+        # block and do not cancel away on large or drifting values. Keyed
+        # by block number; NaNs before the first real value add nothing, so
+        # the shift does not depend on where the chunks were cut.
+        self.shifts = {}
+        self._sums = []
+        if {"sum", "mean"} & set(self.stats):
+            self._sums.append("plain")
+        if {"var", "std"} & set(self.stats):
+            self._sums += ["moved", "squares"]
+        self._carry = dict.fromkeys(self._sums, 0.0)
+        self._nan_count = 0
+        # Last `window` prefix sums (and raw values) of the series so far.
+        self._tail = {name: np.empty(0) for name in (*self._sums, "raw")}
+        self._tail["nans"] = np.empty(0, dtype=np.int64)
+
+    def update(self, chunk):
+        values = np.asarray(chunk, dtype=float).ravel()
+        n, w = len(values), self.window
+        missing = np.isnan(values)
+        any_missing = missing.any()
+        # NaN counts are integers, so one running count is exact.
+        nans = self._nan_count + np.cumsum(missing, dtype=np.int64)
+        if n:
+            self._nan_count = nans[-1]
+        columns = {"nans": nans, "raw": values}
+        if "plain" in self._sums:
+            columns["plain"] = np.where(missing, 0.0, values) if any_missing else values
+        if "moved" in self._sums:
+            moved = values - self._block_shifts(values, missing)
+            if any_missing:
+                moved[missing] = 0.0
+            columns["moved"] = moved
+            columns["squares"] = moved * moved
+
+        merged = {}
+        for name, column in columns.items():
+            if name in self._sums:
+                column = block_cumsum(column, self.seen, self.block, self._carry[name])
+                if n:
+                    self._carry[name] = column[-1]
+            merged[name] = np.concatenate((self._tail[name], column))
+            self._tail[name] = merged[name][-w:]
+
+        base = self.seen - (len(merged["raw"]) - n)
+        self.seen += n
+        first = max(w - 1, self.seen - n)
+        if first >= self.seen:
+            return {name: np.empty(0) for name in self.stats}
+
+        ends = self._crossing_ends(first)
+        sums, heads = {}, {}
+        for name in self._sums:
+            sums[name], heads[name] = self._window_sums(
+                merged[name], first, base, ends
+            )
+        if "moved" in sums and len(ends):
+            self._rebase(sums, heads, ends, first)
+        for block in [b for b in self.shifts if b < (self.seen - w) // self.block]:
+            del self.shifts[block]
+        at_end, at_before = self._lagged(merged["nans"], first, base)
+        has_nan = at_end > at_before
+
+        result = {}
+        if "sum" in self.stats:
+            result["sum"] = sums["plain"]
+        if "mean" in self.stats:
+            result["mean"] = sums["plain"] / w
+        if "var" in self.stats or "std" in self.stats:
+            if w - self.ddof <= 0:
+                var = np.full(self.seen - first, np.nan)
+            elif w == 1:
+                var = np.zeros(self.seen - first)
+            else:
+                moved, squares = sums["moved"], sums["squares"]
+                var = (squares - moved * moved / w) / (w - self.ddof)
+                var = np.maximum(var, 0.0)
+            if "var" in self.stats:
+                result["var"] = var
+            if "std" in self.stats:
+                result["std"] = np.sqrt(var)
+        raw = merged["raw"][first - w + 1 - base:]
+        if "min" in self.stats:
+            result["min"] = sliding_extreme(
+                np.where(np.isnan(raw), np.inf, raw), w, np.minimum, np.inf
+            )
+        if "max" in self.stats:
+            result["max"] = sliding_extreme(
+                np.where(np.isnan(raw), -np.inf, raw), w, np.maximum, -np.inf
+            )
+
+        if has_nan.any():
+            for name in result:
+                result[name] = np.where(has_nan, np.nan, result[name])
+        return {name: result[name] for name in self.stats}
+
+    def _lagged(self, prefix, first, base):
+        # Prefix values at each window end and just before its start.
+        w = self.window
+        at_end = prefix[first - base:]
+        if first - w >= base:
+            return at_end, prefix[first - w - base:len(prefix) - w]
+        # Only the very first window starts at position 0.
+        zero = np.zeros(1, dtype=prefix.dtype)
+        return at_end, np.concatenate((zero, prefix[:len(prefix) - w]))
+
+    def _block_shifts(self, values, missing):
+        # The shift of every value's block: the block's first real value.
+        block, start = self.block, self.seen
+        real = np.flatnonzero(~missing)
+        blocks = (start + np.arange(len(values))) // block
+        for number in range(start // block, (start + len(values) - 1) // block + 1):
+            if number in self.shifts:
+                continue
+            i = np.searchsorted(real, max(number * block - start, 0))
+            if i < len(real) and real[i] < (number + 1) * block - start:
+                self.shifts[number] = values[real[i]]
+        return self._shifts_of(blocks)
+
+    def _shifts_of(self, blocks):
+        # Blocks without a real value yet have nothing shifted in them.
+        if not len(blocks):
+            return np.empty(0)
+        low, high = int(blocks.min()), int(blocks.max())
+        table = np.array([self.shifts.get(b, 0.0) for b in range(low, high + 1)])
+        return table[blocks - low]
+
+    def _crossing_ends(self, first):
+        # Windows ending in the first w positions of a block cross into it.
+        w, block = self.window, self.block
+        boundaries = np.arange(-(-max(first - w + 1, 1) // block) * block,
+                               self.seen, block)
+        ends = (boundaries[:, None] + np.arange(w)).ravel()
+        return ends[(ends >= first) & (ends < self.seen) & (ends >= w)]
+
+    def _window_sums(self, prefix, first, base, ends):
+        # Sums over (end - w, end] for every end from `first` to the last
+        # value seen, from block-restarted prefix sums (`prefix` starts at
+        # global position `base`). A window spans at most two blocks
+        # because block >= window; across a boundary (the `ends` from
+        # _crossing_ends) the sum is (total of the earlier block - prefix
+        # before the window) + prefix at the end. Also returns the part in
+        # the earlier block for those windows.
+        at_end, at_before = self._lagged(prefix, first, base)
+        sums = at_end - at_before
+        head = np.empty(0)
+        if len(ends):
+            crossing = ends - first
+            boundary = (ends // self.block) * self.block - 1
+            head = prefix[boundary - base] - at_before[crossing]
+            sums[crossing] = head + at_end[crossing]
+        return sums, head
+
+    def _rebase(self, sums, heads, ends, first):
+        # A window across a block boundary mixes values shifted by two
+        # different amounts. Re-shift its earlier part by delta (earlier
+        # block's shift - later block's) before adding: each of its `count`
+        # values moves by delta, and each square d*d becomes
+        # d*d + 2*delta*d + delta*delta.
+        crossing = ends - first
+        later = ends // self.block
+        delta = self._shifts_of(later - 1) - self._shifts_of(later)
+        count = later * self.block - (ends - self.window + 1)
+        moved = heads["moved"]
+        sums["squares"][crossing] += 2 * delta * moved + count * delta * delta
+        sums["moved"][crossing] += count * delta
+
+
+def rolling(data, window, stats=STATS, ddof=0):
+    # Single-shot helper: the same numbers update() gives for any chunking.
+    return RollingWindow(window, stats, ddof).update(data)
+
+
+def rolling_csv(source, target, column, window, stats=STATS,
+                chunksize=DEFAULT_CHUNKSIZE):
+    # Stream one column of a CSV through a RollingWindow; row i of the
+    # output is the window ending at data row i + window - 1.
+    roller = RollingWindow(window, stats)
+    header = True
+    for chunk in pd.read_csv(source, usecols=[column], chunksize=chunksize):
+        frame = pd.DataFrame(roller.update(chunk[column].to_numpy()))
+        frame.to_csv(target, index=False, mode="w" if header else "a",
+                     header=header)
+        header = False
+    return roller.seen
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Streaming rolling statistics.")
+    parser.add_argument("source", help="CSV file")
+    parser.add_argument("target", help="CSV file for the window statistics")
+    parser.add_argument("--column", required=True)
+    parser.add_argument("--window", type=int, required=True)
+    parser.add_argument("--stats", nargs="+", choices=STATS, default=list(STATS))
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    rows = rolling_csv(args.source, args.target, args.column, args.window,
+                       args.stats, args.chunksize)
+    print(f"{args.target}: {max(rows - args.window + 1, 0)} windows over {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
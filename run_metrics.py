@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+
+DEFAULT_RUN_DIR = "runs"
+DEFAULT_THRESHOLD = 0.25
+
+# Differences below these floors are noise, whatever the ratio.
+NOISE_FLOOR = {
+    "wall": 0.05,
+    "user": 0.05,
+    "system": 0.05,
+    "max_rss_kb": 4096,
+    "read_blocks": 64,
+    "write_blocks": 64,
+}
+
+
+def usage_metrics(usage, wall):
+    # ru_maxrss is KiB on Linux but bytes on macOS.
+    rss = usage.ru_maxrss
+    if sys.platform == "darwin":
+        rss //= 1024
+    return {
+        "wall": round(wall, 4),
+        "user": round(usage.ru_utime, 4),
+        "system": round(usage.ru_stime, 4),
+        "max_rss_kb": rss,
+        "read_blocks": usage.ru_inblock,
+        "write_blocks": usage.ru_oublock,
+    }
+
+
+def run_measured(command, **popen_kwargs):
+    # Like subprocess.run() without check, returning (returncode, metrics).
+    # The child is reaped with wait4() so its own CPU time, peak RSS and
+    # block I/O counts come back from the kernel.
+    start = time.perf_counter()
+    process = subprocess.Popen(command, **popen_kwargs)
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, usage_metrics(usage, time.perf_counter() - start)
+
+
+def new_record(steps):
+    return {
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "steps": steps,
+    }
+
+
+def write_record(record, path=None):
+    if path is None:
+        os.makedirs(DEFAULT_RUN_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(DEFAULT_RUN_DIR, f"run-{stamp}.json")
+    with open(path, "w") as f:
+        json.dump(record, f, indent=2)
+    return path
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    # Returns [(step, metric, before, after, change)] for every metric that
+    # grew by more than `threshold` (0.25 = 25%) and past its noise floor.
+    regressions = []
+    for name, after in current["steps"].items():
+        before = baseline["steps"].get(name)
+        if before is None or before.get("cached") or after.get("cached"):
+            continue
+        for metric, floor in NOISE_FLOOR.items():
+            if metric not in before or metric not in after:
+                continue
+            old, new = before[metric], after[metric]
+            if new - old <= floor:
+                continue
+            change = (new - old) / old if old else float("inf")
+            if change > threshold:
+                regressions.append((name, metric, old, new, change))
+    return regressions
+
+
+def print_record(record):
+    print(f"{'step':<20} {'wall':>8} {'user':>8} {'sys':>8} "
+          f"{'rss MiB':>8} {'in':>8} {'out':>8}")
+    for name, m in record["steps"].items():
+        if "wall" not in m:
+            print(f"{name:<20} {m.get('status', '-'):>8}")
+            continue
+        print(f"{name:<20} {m['wall']:>8.2f} {m['user']:>8.2f} "
+              f"{m['system']:>8.2f} {m['max_rss_kb'] / 1024:>8.1f} "
+              f"{m['read_blocks']:>8} {m['write_blocks']:>8}")
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline run records.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    show = commands.add_parser("show", help="print a run record")
+    show.add_argument("record")
+
+    diff = commands.add_parser(
+        "compare", help="flag steps that regressed against a baseline"
+    )
+    diff.add_argument("baseline")
+    diff.add_argument("current")
+    diff.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                      help="allowed relative growth (default 0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    if args.command == "show":
+        print_record(load(args.record))
+        return
+
+    regressions = compare(load(args.baseline), load(args.current),
+                          args.threshold)
+    for name, metric, old, new, change in regressions:
+        print(f"REGRESSION {name}.{metric}: {old} -> {new} (+{change:.0%})")
+    if regressions:
+        sys.exit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import time
+from types import SimpleNamespace
+
+
+def parse_steps(text):
+    # "6,7,12" or ranges such as "1-5,9" -> [1, 2, 3, 4, 5, 9]
+    numbers = []
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                low, high = (int(x) for x in part.split("-", 1))
+                numbers.extend(range(low, high + 1))
+            else:
+                numbers.append(int(part))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"not a step list: {text!r}")
+    if not numbers:
+        raise argparse.ArgumentTypeError("no steps given")
+    return numbers
+
+
+class StepRegistry:
+    """Numbered tutorial steps registered as functions of a shared context.
+
+    Registering costs nothing; a step runs only when run() selects it.
+    Each step names the steps whose results it reads in `requires`, and
+    selecting a step pulls those in, always in step-number order. Steps
+    pass data to later ones as attributes of the context."""
+
+    def __init__(self):
+        self.steps = {}
+
+    def step(self, number, title, requires=()):
+        def register(fn):
+            if number in self.steps:
+                raise ValueError(f"step {number} is registered twice")
+            self.steps[number] = (title, fn, tuple(requires))
+            return fn
+        return register
+
+    def select(self, numbers=None):
+        # The requested steps plus everything they require, in order.
+        if numbers is None:
+            return sorted(self.steps)
+        unknown = sorted(set(numbers) - set(self.steps))
+        if unknown:
+            raise KeyError(f"unknown steps {unknown}; steps are "
+                           f"{min(self.steps)}-{max(self.steps)}")
+        chosen, pending = set(), list(numbers)
+        while pending:
+            number = pending.pop()
+            if number not in chosen:
+                chosen.add(number)
+                pending.extend(self.steps[number][2])
+        return sorted(chosen)
+
+    def run_step(self, number, context, echo=True):
+        title, fn, _ = self.steps[number]
+        if echo:
+            print(f"\n=== STEP {number}: {title} ===")
+        start = time.perf_counter()
+        fn(context)
+        return time.perf_counter() - start
+
+    def run(self, numbers=None, context=None, echo=True):
+        # Returns [(number, seconds)] for the steps that ran.
+        context = SimpleNamespace() if context is None else context
+        return [
+            (number, self.run_step(number, context, echo))
+            for number in self.select(numbers)
+        ]
+
+    def print_list(self):
+        for number, (title, _, requires) in sorted(self.steps.items()):
+            needs = f"  (needs {', '.join(map(str, requires))})" if requires else ""
+            print(f"{number:>3}  {title}{needs}")
+
+    def print_timings(self, timings):
+        print("\n=== STEP TIMINGS ===")
+        for number, seconds in timings:
+            print(f"STEP {number:>2}  {self.steps[number][0]:<32} "
+                  f"{seconds * 1000:>9.2f} ms")
+        total = sum(seconds for _, seconds in timings)
+        print(f"{'total':<40} {total * 1000:>9.2f} ms")
+
+    def _step_list(self, text):
+        numbers = parse_steps(text)
+        try:
+            self.select(numbers)
+        except KeyError as e:
+            raise argparse.ArgumentTypeError(e.args[0])
+        return numbers
+
+    def add_arguments(self, parser):
+        # Register every step before parsing; --steps is checked against them.
+        parser.add_argument(
+            "--steps", type=self._step_list, metavar="N,N,...",
+            help="run only these steps (and the steps they need), e.g. 6,7,12"
+        )
+        parser.add_argument("--list", action="store_true",
+                            help="list the steps and exit")
+
+    def main(self, args, context=None):
+        # Handles --list and --steps for a script's parsed arguments.
+        # Returns the timings, or None when only listing.
+        if args.list:
+            self.print_list()
+            return None
+        timings = self.run(args.steps, context)
+        self.print_timings(timings)
+        return timings
+
+    def parse_args(self, description, argv=None):
+        parser = argparse.ArgumentParser(description=description)
+        self.add_arguments(parser)
+        return parser.parse_args(argv)
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+
+from agg_store import AggregateStore
+
+
+def test_delete_accepts_numpy_keys():
+    frame = pd.DataFrame({
+        "EmpID": [1, 2, 3, 4],
+        "Department": ["HR", "IT", "HR", "IT"],
+        "Country": ["UK", "UK", "UK", "UK"],
+        "Salary": [10.0, 20.0, 30.0, 40.0],
+    })
+    with AggregateStore(":memory:") as store:
+        store.load(frame)
+        assert store.delete(np.array([1, 2])) == 2
+        assert store.delete(pd.Series([np.int64(3)], dtype=object)) == 1
+        assert store.check() == []
+        assert store.pivot("Department", "Country", "count").loc["IT", "UK"] == 1
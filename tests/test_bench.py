@@ -0,0 +1,82 @@
+import sys
+
+import pytest
+
+import bench
+from bench import compare, measure, new_record, summarize
+
+
+def result(median, iqr=0.0):
+    return {"median_ns": median, "iqr_ns": iqr}
+
+
+def record(results):
+    return new_record(results, repeats=7, warmup=2)
+
+
+def test_compare_needs_threshold_and_iqr():
+    baseline = record({
+        "a": {"1000": result(100.0), "10000": result(1000.0, iqr=50.0)},
+        "b": {"1000": result(100.0, iqr=40.0)},
+    })
+    current = record({
+        "a": {"1000": result(150.0), "10000": result(1050.0, iqr=50.0)},
+        # +30%, but inside the 40 ns spread.
+        "b": {"1000": result(130.0, iqr=10.0)},
+        "c": {"1000": result(1e9)},
+    })
+    assert compare(baseline, current) == [
+        ("a", "1000", 100.0, 150.0, pytest.approx(0.5)),
+    ]
+    assert [r[:2] for r in compare(baseline, current, threshold=0.6)] == []
+
+
+def test_measure_uses_the_given_number_and_warms_up():
+    calls = []
+    trials, number = measure(lambda: calls.append(1), repeats=3, warmup=2,
+                             number=5)
+    assert number == 5
+    assert len(trials) == 3
+    assert len(calls) == 2 + 3 * 5
+
+
+def test_measure_calibrates_fast_calls(monkeypatch):
+    monkeypatch.setattr(bench, "MIN_TRIAL_NS", 1_000_000)
+    trials, number = measure(lambda: None, repeats=2, warmup=0)
+    assert number >= 100
+    assert all(t > 0 for t in trials)
+
+
+def test_summarize():
+    stats = summarize([1.0, 2.0, 3.0, 4.0, 100.0], number=10)
+    assert stats["median_ns"] == 3.0
+    assert (stats["q1_ns"], stats["q3_ns"], stats["iqr_ns"]) == (2.0, 4.0, 2.0)
+    assert stats["min_ns"] == 1.0
+    assert (stats["repeats"], stats["number"]) == (5, 10)
+
+
+def test_run_skips_sizes_above_max_and_rejects_unknown(monkeypatch):
+    monkeypatch.setitem(bench.BENCHMARKS, "noop",
+                        (lambda size: lambda: None, 100))
+    current = bench.run(["noop"], sizes=(10, 1000), repeats=2, warmup=0,
+                        echo=False)
+    assert list(current["results"]["noop"]) == ["10"]
+    with pytest.raises(KeyError):
+        bench.run(["missing"], echo=False)
+
+
+def test_compare_command_exits_nonzero_on_regression(tmp_path, monkeypatch,
+                                                     capsys):
+    before = bench.write_record(record({"a": {"10": result(100.0)}}),
+                                str(tmp_path / "a.json"))
+    after = bench.write_record(record({"a": {"10": result(300.0)}}),
+                               str(tmp_path / "b.json"))
+    monkeypatch.setattr(sys, "argv", ["bench.py", "compare", before, after])
+    with pytest.raises(SystemExit) as exc:
+        bench.main()
+    assert exc.value.code == 1
+    assert "REGRESSION a[10]: 100 ns -> 300 ns (+200%)" in capsys.readouterr().out
+
+    monkeypatch.setattr(sys, "argv", ["bench.py", "compare", after, before])
+    bench.main()
+    assert "No regressions" in capsys.readouterr().out
@@ -0,0 +1,147 @@
+import os
+
+import pytest
+
+import check_missing
+
+
+CASES = [
+    "a,b\n1,2,3\n4,5,\n,\n",        # over-long rows at the start of the data
+    "a,b\n1,2,3\n,\n",
+    "a,b,c\n1\n2,,\n",              # short rows
+    "a,b\n1,\n\n2,3,4\n,5\n\r\n6,\n",  # blank lines between rows
+    "a,b\n1,2\n3,4\n5,6,7\n,8\n",   # over-long row after good ones
+    "a,b\n",
+]
+
+
+def report(lines):
+    # What both modes must agree on: missing cell locations and totals
+    missing = sorted(line for line in lines if line.startswith('Missing value'))
+    totals = {}
+    for line in lines:
+        for name in ('Total rows', 'Total missing', 'Malformed rows'):
+            if line.startswith(name):
+                totals[name] = int(line.rsplit(' ', 1)[1])
+    totals.setdefault('Malformed rows', 0)
+    return missing, totals
+
+
+def run(path, capsys, mode, workers=1):
+    if mode == 'slow':
+        check_missing.scan_slow(path)
+    else:
+        summary = check_missing.scan_fast(path, workers, samples=1000)
+        check_missing.print_summary(path, summary)
+    lines = capsys.readouterr().out.splitlines()
+    return report(lines)
+
+
+@pytest.mark.parametrize('text', CASES)
+def test_fast_and_slow_modes_agree(tmp_path, capsys, text):
+    path = str(tmp_path / 'data.csv')
+    with open(path, 'w', newline='') as f:
+        f.write(text)
+    slow = run(path, capsys, 'slow')
+    assert run(path, capsys, 'fast') == slow
+    assert run(path, capsys, 'fast', workers=3) == slow
+
+
+def test_counts_follow_the_rules(tmp_path, capsys):
+    path = str(tmp_path / 'data.csv')
+    with open(path, 'w') as f:
+        f.write('a,b\n1,2,3\n4,5,\n,\n')
+    _, totals = run(path, capsys, 'fast')
+    assert totals == {'Total rows': 3, 'Total missing': 2, 'Malformed rows': 2}
+
+    with open(path, 'w') as f:
+        f.write('a,b,c\n1\n2,,\n')
+    _, totals = run(path, capsys, 'slow')
+    assert totals['Total missing'] == 4
+
+
+def test_empty_file_is_reported(tmp_path, capsys, monkeypatch):
+    path = str(tmp_path / 'empty.csv')
+    open(path, 'w').close()
+    check_missing.scan_slow(path)
+    assert capsys.readouterr().out.strip() == f'{path}: empty file'
+    for flag in ('--fast', '--incremental'):
+        monkeypatch.setattr('sys.argv', ['check_missing.py', path, flag])
+        check_missing.main()
+        assert capsys.readouterr().out.strip() == f'{path}: empty file'
+    assert not os.path.exists(check_missing.checkpoint_path(path))
+
+
+def test_crc_range_matches_one_pass(tmp_path, monkeypatch):
+    import mmap
+    import zlib
+
+    monkeypatch.setattr(check_missing, 'CRC_BLOCK', 7)
+    path = tmp_path / 'data.bin'
+    path.write_bytes(bytes(range(256)) * 3)
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            assert check_missing.crc_range(mm, 5, 700) == zlib.crc32(mm[5:700])
+            assert check_missing.crc_range(mm, 0, 10, 123) == zlib.crc32(mm[:10], 123)
+
+
+def incremental(path, verify=False):
+    return check_missing.scan_incremental(path, 1, 100, verify)
+
+
+def test_incremental_resumes_after_append(tmp_path):
+    path = str(tmp_path / 'data.csv')
+    with open(path, 'w') as f:
+        f.write('a,b\n1,\n2,3\n')
+    first = incremental(path)
+    assert first['full_rescan'] and first['rows'] == 2
+
+    with open(path, 'a') as f:
+        f.write(',4\n5,6,7\n8,')              # the last row is half written
+    second = incremental(path, verify=True)
+    assert not second['full_rescan']
+    assert second['scanned_bytes'] == len(',4\n5,6,7\n')
+    assert second['rows'] == 4
+    assert second['columns'] == {'a': 1, 'b': 1}
+    assert second['malformed'] == 1
+    assert second['samples'] == [(3, 'a')]     # numbered from the old rows
+
+    with open(path, 'a') as f:
+        f.write('\n')
+    third = incremental(path)
+    assert not third['full_rescan'] and third['rows'] == 5
+    assert third['columns'] == {'a': 1, 'b': 2}
+
+
+@pytest.mark.parametrize('change', ['rewrite', 'truncate'])
+def test_incremental_rescans_changed_files(tmp_path, change):
+    path = str(tmp_path / 'data.csv')
+    with open(path, 'w') as f:
+        f.write('a,b\n1,\n2,3\n4,5\n')
+    incremental(path)
+    if change == 'rewrite':
+        # Same length, different bytes inside the checked tail
+        with open(path, 'r+') as f:
+            f.seek(len('a,b\n1,\n2,3\n'))
+            f.write(',,5')
+    else:
+        with open(path, 'r+') as f:
+            f.truncate(len('a,b\n1,\n'))
+    summary = incremental(path)
+    assert summary['full_rescan']
+    expected = check_missing.scan_fast(path, 1, 100)
+    assert summary['rows'] == expected['rows']
+    assert summary['columns'] == expected['columns']
+
+
+def test_verify_catches_a_rewrite_before_the_checked_tail(tmp_path, monkeypatch):
+    monkeypatch.setattr(check_missing, 'CHECK_BYTES', 4)
+    path = str(tmp_path / 'data.csv')
+    with open(path, 'w') as f:
+        f.write('a,b\n1,2\n3,4\n5,6\n')
+    incremental(path)
+    with open(path, 'r+') as f:
+        f.seek(len('a,b\n'))
+        f.write(',')
+    assert not incremental(path)['full_rescan']   # only the tail is checked
+    assert incremental(path, verify=True)['full_rescan']
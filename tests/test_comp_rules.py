@@ -0,0 +1,12 @@
+import numpy as np
+import pandas as pd
+
+from comp_rules import DEFAULT_RULES
+
+
+def test_band_scalar_matches_vectorized_band():
+    salary = pd.Series([40_000, 70_000, 79_999.5, 80_000, np.nan, None])
+    fast = DEFAULT_RULES.band(salary)
+    slow = [DEFAULT_RULES.band_scalar(x) for x in salary]
+    assert slow == ["Low", "Medium", "Medium", "High", None, None]
+    assert [None if pd.isna(x) else x for x in fast] == slow
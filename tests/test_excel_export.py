@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from excel_export import write_excel
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def test_clashing_group_titles_get_their_own_sheets(tmp_path):
+    long = "x" * 40
+    frame = pd.DataFrame({
+        "Group": ["a/b", "a:b", long, long + "y", "A/B"],
+        "Value": [1, 2, 3, 4, 5],
+    })
+    path = tmp_path / "out.xlsx"
+    sheets = write_excel(frame, path, group_by="Group")
+    assert sheets == {
+        "a_b": 1, "a_b (2)": 1, "x" * 31: 1,
+        "x" * 27 + " (2)": 1, "A_B (3)": 1,
+    }
+    workbook = openpyxl.load_workbook(path)
+    assert workbook.sheetnames == list(sheets)
+    assert [workbook[t]["B2"].value for t in sheets] == [1, 2, 3, 4, 5]
+
+
+def test_split_parts_do_not_reuse_another_groups_title(tmp_path):
+    frame = pd.DataFrame({"Group": ["g (2)", "g", "g", "g"], "Value": range(4)})
+    sheets = write_excel(frame, tmp_path / "out.xlsx", group_by="Group",
+                         max_rows=3)
+    assert sheets == {"g (2)": 1, "g": 3}
+    names = openpyxl.load_workbook(tmp_path / "out.xlsx").sheetnames
+    assert names == ["g (2)", "g", "g (3)"]
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from frame_io import (
+    file_format, memory_bytes, optimize_dtypes, read_frame,
+    synthetic_employees, write_frame,
+)
+
+
+@pytest.fixture
+def employees():
+    return synthetic_employees(500)
+
+
+def test_optimize_dtypes_downcasts_and_keeps_values(employees):
+    optimized = optimize_dtypes(employees)
+    assert optimized["EmpID"].dtype == np.int32
+    assert optimized["Salary"].dtype == np.int32
+    # Ages are small whole numbers, so float32 holds them exactly.
+    assert optimized["Age"].dtype == np.float32
+    assert optimized["JoinDate"].dtype.kind == "M"
+    for name in ("Name", "Country", "SalaryBand", "SeniorFlag"):
+        assert isinstance(optimized[name].dtype, pd.CategoricalDtype)
+    assert memory_bytes(optimized) < memory_bytes(employees)
+    pd.testing.assert_frame_equal(
+        optimized.astype(employees.dtypes.to_dict()), employees
+    )
+
+
+def test_optimize_dtypes_keeps_lossy_floats_and_unique_strings():
+    df = pd.DataFrame({
+        "price": [0.1, 0.2, np.nan, 3.0],
+        "id": ["a", "b", "c", "d"],
+        "small": [1, 2, 3, 255],
+        "signed": [-1, 0, 1, 2],
+    })
+    optimized = optimize_dtypes(df)
+    assert optimized["price"].dtype == np.float64
+    assert not isinstance(optimized["id"].dtype, pd.CategoricalDtype)
+    assert optimized["small"].dtype == np.int16
+    assert optimized["signed"].dtype == np.int8
+    # The input is left alone.
+    assert df["small"].dtype == np.int64
+
+
+def test_csv_round_trip_parses_join_dates(tmp_path, employees):
+    path = str(tmp_path / "employees.csv")
+    write_frame(employees, path)
+    loaded = read_frame(path)
+    assert loaded["JoinDate"].dtype.kind == "M"
+    pd.testing.assert_frame_equal(loaded, employees, check_dtype=False)
+
+    subset = read_frame(path, columns=["EmpID", "JoinDate"])
+    assert list(subset.columns) == ["EmpID", "JoinDate"]
+    assert subset["JoinDate"].dtype.kind == "M"
+
+
+@pytest.mark.parametrize("ext", [".parquet", ".pq", ".feather"])
+def test_columnar_round_trip_keeps_optimized_dtypes(tmp_path, employees, ext):
+    pytest.importorskip("pyarrow")
+    optimized = optimize_dtypes(employees)
+    path = str(tmp_path / f"employees{ext}")
+    write_frame(optimized, path)
+    pd.testing.assert_frame_equal(read_frame(path), optimized)
+    assert list(read_frame(path, columns=["Salary"]).columns) == ["Salary"]
+
+
+def test_unknown_extension_is_rejected():
+    with pytest.raises(ValueError, match="unsupported file type '.xlsx'"):
+        file_format("employees.xlsx")
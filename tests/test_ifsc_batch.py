@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import ifsc
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # /<CODE> answers like the real endpoints: 200 with JSON for known
+    # codes, 404 otherwise. FLAKY fails with a 500 on its first request.
+
+    def do_GET(self):
+        code = self.path.strip("/")
+        server = self.server
+        with server.lock:
+            server.hits[code] = server.hits.get(code, 0) + 1
+            hits = server.hits[code]
+        # Later codes answer sooner, so completion order is reversed.
+        time.sleep(server.delays.get(code, 0))
+        if code == "FLAKY" and hits == 1:
+            self.send_response(500)
+            self.end_headers()
+            return
+        if code not in server.banks:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = json.dumps({
+            "IFSC": code, "BANK": server.banks[code],
+            "BRANCH": "Main", "STATE": "KA",
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.hits = {}
+    server.banks = {f"CODE{i}": f"Bank {i}" for i in range(8)}
+    server.banks["FLAKY"] = "Flaky Bank"
+    server.delays = {f"CODE{i}": (8 - i) * 0.02 for i in range(8)}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, [f"http://127.0.0.1:{server.server_address[1]}/{{}}"]
+    server.shutdown()
+    server.server_close()
+
+
+def test_results_follow_input_order(stub):
+    _, endpoints = stub
+    codes = [f"CODE{i}" for i in range(8)]
+    records = ifsc.fetch_batch(codes, workers=8, endpoints=endpoints)
+    assert [r["IFSC"] for r in records] == codes
+    assert [r["Bank"] for r in records] == [f"Bank {i}" for i in range(8)]
+
+
+def test_unknown_code_is_not_found(stub):
+    server, endpoints = stub
+    records = ifsc.fetch_batch(["NOPE0000001", "CODE1"], workers=2,
+                               endpoints=endpoints)
+    assert records[0]["IFSC"] == "NOPE0000001"
+    assert records[0]["Bank"] == "N/A"
+    assert records[1]["Bank"] == "Bank 1"
+    # A 404 is an answer, not a failure, so it is not retried.
+    assert server.hits["NOPE0000001"] == 1
+
+
+def test_server_error_is_retried(stub):
+    server, endpoints = stub
+    records = ifsc.fetch_batch(["FLAKY"], workers=1, endpoints=endpoints)
+    assert records[0]["Bank"] == "Flaky Bank"
+    assert server.hits["FLAKY"] == 2
+
+
+def test_workers_must_be_positive():
+    with pytest.raises(SystemExit):
+        ifsc.parse_args(["--batch", "codes.txt", "--workers", "0"])
+    assert ifsc.parse_args(["--workers", "1"]).workers == 1
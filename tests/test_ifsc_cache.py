@@ -0,0 +1,98 @@
+import time
+
+import pytest
+
+import ifsc_cache
+from ifsc_cache import MISSING, IfscCache
+
+
+DATA = {"IFSC": "SBIN0000001", "BANK": "State Bank", "BRANCH": "Main"}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ifsc_cache.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    with IfscCache(str(tmp_path / "cache.sqlite"), ttl=100,
+                   negative_ttl=10) as cache:
+        yield cache
+
+
+def test_entry_expires_after_its_ttl(cache, clock):
+    cache.put("SBIN0000001", DATA)
+    clock.now += 99
+    assert cache.get("SBIN0000001") == DATA
+    clock.now += 2
+    assert cache.get("SBIN0000001") is MISSING
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_negative_entry_uses_the_shorter_ttl(cache, clock):
+    cache.put_negative("SBIN9999999")
+    assert cache.get("SBIN9999999") is None
+    assert cache.stats()["negative_hits"] == 1
+    clock.now += 11
+    assert cache.get("SBIN9999999") is MISSING
+
+
+def test_explicit_ttl_overrides_the_default(cache, clock):
+    cache.put("SBIN0000001", DATA, ttl=5)
+    clock.now += 6
+    assert cache.get("SBIN0000001") is MISSING
+
+
+def test_entries_survive_a_reopen_until_they_expire(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite")
+    with IfscCache(path, ttl=100) as cache:
+        cache.put("SBIN0000001", DATA)
+        cache.put_negative("SBIN9999999")
+    with IfscCache(path, ttl=100) as cache:
+        assert cache.get("SBIN0000001") == DATA
+        assert cache.get("SBIN9999999") is None
+        assert cache.stats()["disk_hits"] == 2
+        clock.now += 101
+        assert cache.get("SBIN0000001") is MISSING
+
+
+def test_lru_evicts_to_disk_not_away(tmp_path, clock):
+    with IfscCache(str(tmp_path / "cache.sqlite"), capacity=1) as cache:
+        cache.put("A", {"IFSC": "A"})
+        cache.put("B", {"IFSC": "B"})
+        assert cache.stats()["size"] == 1
+        assert cache.get("A") == {"IFSC": "A"}
+        assert cache.stats()["disk_hits"] == 1
+
+
+def test_seed_csv_expires_from_the_row_timestamp(cache, clock, tmp_path):
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(clock.now))
+    old = time.strftime("%Y-%m-%dT%H:%M:%S",
+                        time.localtime(clock.now - 1000))
+    seed = tmp_path / "IFSC_CODE.csv"
+    seed.write_text(
+        "IFSC,Bank,Branch,State,Timestamp\n"
+        f"sbin0000001,State Bank,Main,Delhi,{stamp}\n"
+        f"SBIN0000002,State Bank,Malad,Maharashtra,{old}\n"
+        f"SBIN0000003,N/A,N/A,N/A,{stamp}\n"
+    )
+    cache.put("SBIN0000004", DATA)
+    assert cache.seed_csv(str(seed)) == 1
+    # Seeding checks for cached codes without counting lookups.
+    assert cache.stats()["hits"] == cache.stats()["misses"] == 0
+    assert cache.get("SBIN0000001")["BANK"] == "State Bank"
+    assert cache.get("SBIN0000002") is MISSING
+    clock.now += 101
+    assert cache.get("SBIN0000001") is MISSING
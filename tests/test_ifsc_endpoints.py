@@ -0,0 +1,151 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ifsc_endpoints import FAILED, NOT_FOUND, OK, EndpointManager, EndpointStats
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Answers every code with the server's status after its delay; 200s
+    # carry a body naming the server so tests can tell who won a race.
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits += 1
+        time.sleep(server.delay)
+        if server.status != 200:
+            self.send_response(server.status)
+            self.end_headers()
+            return
+        body = json.dumps({"IFSC": self.path.strip("/"),
+                           "BANK": server.name}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(name, status=200, delay=0.0):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        server.lock = threading.Lock()
+        server.name = name
+        server.status = status
+        server.delay = delay
+        server.hits = 0
+        server.url = f"http://127.0.0.1:{server.server_address[1]}/{{}}"
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        started.append(server)
+        return server
+
+    yield start
+    for server in started:
+        server.shutdown()
+        server.server_close()
+
+
+def test_breaker_opens_then_half_opens_for_one_probe():
+    stats = EndpointStats("x", max_failures=2, cooldown=0.05)
+    stats.record(0.01, False)
+    assert stats.state() == "closed"
+    stats.record(0.01, False)
+    assert stats.state() == "open"
+    assert not stats.allow()
+
+    time.sleep(0.06)
+    assert stats.state() == "half-open"
+    assert stats.allow()
+    # Only one probe at a time while half-open.
+    assert not stats.allow()
+    stats.record(0.01, False)
+    assert stats.state() == "open"
+
+    time.sleep(0.06)
+    assert stats.allow()
+    stats.record(0.01, True)
+    assert stats.state() == "closed"
+    assert stats.allow()
+
+
+def test_breaker_opens_on_windowed_error_rate():
+    stats = EndpointStats("x", min_samples=4, max_failures=10,
+                          max_error_rate=0.5)
+    for ok in (True, False, True, False):
+        stats.record(0.01, ok)
+    assert stats.state() == "open"
+
+
+def test_slow_endpoint_is_hedged(servers):
+    slow = servers("slow", delay=1.0)
+    fast = servers("fast")
+    manager = EndpointManager([slow.url, fast.url], default_hedge=0.05)
+    try:
+        start = time.monotonic()
+        data, status = manager.lookup("SBIN0000001")
+        elapsed = time.monotonic() - start
+    finally:
+        manager.close()
+    assert (status, data["BANK"]) == (OK, "fast")
+    assert elapsed < 0.5
+    assert slow.hits == fast.hits == 1
+
+
+def test_failure_starts_the_next_endpoint_and_feeds_the_breaker(servers):
+    broken = servers("broken", status=500)
+    good = servers("good")
+    manager = EndpointManager([broken.url, good.url], max_failures=2,
+                              cooldown=60)
+    try:
+        for _ in range(3):
+            data, status = manager.lookup("SBIN0000001")
+            assert (status, data["BANK"]) == (OK, "good")
+    finally:
+        manager.close()
+    # The breaker opened after two failures, so the third lookup skipped it.
+    assert broken.hits == 2
+    assert [s["state"] for s in manager.summary()] == ["open", "closed"]
+
+
+def test_all_breakers_open_still_sends(servers):
+    good = servers("good")
+    manager = EndpointManager([good.url], cooldown=60)
+    manager.endpoints[0].opened_at = time.monotonic()
+    try:
+        data, status = manager.lookup("SBIN0000001")
+    finally:
+        manager.close()
+    assert (status, data["BANK"]) == (OK, "good")
+    assert good.hits == 1
+
+
+def test_not_found_everywhere_is_not_retried(servers):
+    first = servers("a", status=404)
+    second = servers("b", status=404)
+    manager = EndpointManager([first.url, second.url], backoff=0)
+    try:
+        assert manager.lookup("SBIN0000001") == (None, NOT_FOUND)
+    finally:
+        manager.close()
+    assert first.hits == second.hits == 1
+
+
+def test_failures_are_retried_per_attempt(servers):
+    broken = servers("broken", status=503)
+    manager = EndpointManager([broken.url], attempts=3, backoff=0,
+                              max_failures=10)
+    try:
+        assert manager.lookup("SBIN0000001") == (None, FAILED)
+    finally:
+        manager.close()
+    assert broken.hits == 3
@@ -0,0 +1,41 @@
+import pytest
+
+from ifsc_index import IfscIndex, build_index
+
+
+@pytest.fixture
+def index(tmp_path):
+    dump = tmp_path / "dump.csv"
+    dump.write_text(
+        "IFSC,BANK,BRANCH,STATE\n"
+        "sbin0000001,State Bank,Main,Delhi\n"
+        "SBIN0000002,State Bank, Malad ,Maharashtra\n"
+        "SBIN0000003,State Bank,Andheri,Maharashtra\n"
+        "HDFC0000001,HDFC Bank,Main,Delhi\n"
+    )
+    path = str(tmp_path / "index.sqlite")
+    assert build_index(str(dump), path) == 4
+    with IfscIndex(path) as ix:
+        yield ix
+
+
+@pytest.mark.parametrize("branch", ["ma", "Ma", "MA", "mA"])
+def test_branch_prefix_ignores_case(index, branch):
+    found = index.search("SBIN", branch=branch)
+    assert [row["IFSC"] for row in found] == ["SBIN0000001", "SBIN0000002"]
+
+
+@pytest.mark.parametrize("branch", ["Main", "main", "MAIN"])
+def test_whole_branch_name_matches_and_keeps_its_case(index, branch):
+    found = index.search("SBIN", branch=branch)
+    assert [(row["IFSC"], row["BRANCH"]) for row in found] == [
+        ("SBIN0000001", "Main")
+    ]
+
+
+def test_other_filters_still_apply(index):
+    assert index.search("SBIN", branch="x") == []
+    assert [r["IFSC"] for r in index.search("SBIN", state="maharashtra")] == [
+        "SBIN0000002", "SBIN0000003"
+    ]
+    assert index.lookup("hdfc0000001")["BRANCH"] == "Main"
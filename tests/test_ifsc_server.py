@@ -0,0 +1,105 @@
+import asyncio
+import csv
+
+import pytest
+
+from ifsc_index import IfscIndex, build_index
+from ifsc_server import LookupService, handle
+from ifsc_store import IfscStore
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    dump = tmp_path / "dump.csv"
+    dump.write_text("IFSC,BANK,BRANCH,STATE\n"
+                    "SBIN0000001,State Bank,Main,Delhi\n")
+    build_index(str(dump), str(tmp_path / "index.sqlite"))
+    index = IfscIndex(str(tmp_path / "index.sqlite"))
+    # The index answers before the cache and the network, so every
+    # upstream fetch of the service is one lookup here.
+    lookups = []
+    real = index.lookup
+    monkeypatch.setattr(index, "lookup", lambda code: lookups.append(code) or real(code))
+    store = IfscStore(str(tmp_path / "IFSC_CODE.csv"), batch_size=1000)
+    service = LookupService(index=index, store=store, workers=4)
+    service.lookups = lookups
+    yield service
+    service.close()
+    index.close()
+
+
+def stored_rows(service):
+    service.flush()
+    with open(service.store.file, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_concurrent_requests_share_one_fetch_and_one_row(service):
+    async def burst():
+        return await asyncio.gather(
+            *(service.resolve("SBIN0000001") for _ in range(10))
+        )
+
+    records = asyncio.run(burst())
+    assert service.lookups == ["SBIN0000001"]
+    assert (service.requests, service.upstream, service.coalesced) == (10, 1, 9)
+    assert all(r == records[0] and r is not records[0] for r in records[1:])
+    assert records[0]["Branch"] == "Main"
+    rows = stored_rows(service)
+    assert [row["IFSC"] for row in rows] == ["SBIN0000001"]
+    assert service.stats()["inflight"] == 0
+
+
+def test_refresh_is_not_coalesced_with_a_plain_lookup(service):
+    async def mixed():
+        return await asyncio.gather(
+            service.resolve("SBIN0000001"),
+            service.resolve("SBIN0000001", refresh=True),
+            service.resolve("SBIN0000001", refresh=True),
+        )
+
+    asyncio.run(mixed())
+    assert (service.upstream, service.coalesced) == (2, 1)
+    assert len(stored_rows(service)) == 2
+
+
+def test_later_requests_fetch_again(service):
+    asyncio.run(service.resolve("SBIN0000001"))
+    asyncio.run(service.resolve("SBIN0000001"))
+    assert service.upstream == 2 and len(stored_rows(service)) == 2
+
+
+def exchange(service, raw):
+    # Feed one raw HTTP request through handle() and return the response.
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(raw)
+        reader.feed_eof()
+        chunks = []
+
+        class Writer:
+            write = chunks.append
+
+            async def drain(self):
+                pass
+
+            def close(self):
+                pass
+
+        await handle(service, reader, Writer())
+        return b"".join(chunks)
+
+    return asyncio.run(run())
+
+
+def test_http_errors(service, monkeypatch):
+    response = exchange(service, b"GET /ifsc/SBIN0000001 HTTP/1.1\r\n"
+                                 b"Content-Length: nope\r\n\r\n")
+    assert response.startswith(b"HTTP/1.1 400 ")
+
+    async def broken(code, refresh=False):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(service, "resolve", broken)
+    response = exchange(service, b"GET /ifsc/SBIN0000001 HTTP/1.1\r\n\r\n")
+    assert response.startswith(b"HTTP/1.1 500 ")
+    assert b"RuntimeError: boom" in response
@@ -0,0 +1,81 @@
+import csv
+import multiprocessing
+import os
+import stat
+
+from ifsc_store import DEFAULT_FIELDS, IfscStore
+
+
+def record(code, stamp, bank="State Bank"):
+    return {"IFSC": code, "Bank": bank, "Branch": "Main", "State": "Delhi",
+            "Timestamp": stamp}
+
+
+def read_rows(path):
+    with open(path, newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_flush_writes_header_once_and_lf_endings(tmp_path):
+    path = str(tmp_path / "IFSC_CODE.csv")
+    with IfscStore(path, batch_size=2) as store:
+        store.add_many(record(f"C{i}", "2024-01-01 00:00:00")
+                       for i in range(5))
+    data = open(path, "rb").read()
+    assert b"\r" not in data
+    assert data.count(b"IFSC,") == 1
+    assert [row["IFSC"] for row in read_rows(path)] == [
+        f"C{i}" for i in range(5)
+    ]
+
+
+def test_flush_repairs_a_missing_final_newline(tmp_path):
+    path = tmp_path / "IFSC_CODE.csv"
+    path.write_text(",".join(DEFAULT_FIELDS) + "\nC0,A,B,C,2024-01-01")
+    with IfscStore(str(path)) as store:
+        store.add(record("C1", "2024-01-02"))
+    assert [row["IFSC"] for row in read_rows(path)] == ["C0", "C1"]
+
+
+def test_compact_keeps_latest_row_per_code_and_file_mode(tmp_path):
+    path = str(tmp_path / "IFSC_CODE.csv")
+    with IfscStore(path) as store:
+        store.add(record("C1", "2024-01-02 00:00:00", bank="new"))
+        store.add(record("C1", "2024-01-01T00:00:00", bank="old"))
+        store.add(record("C2", "bad stamp", bank="only"))
+        store.add(record("C2", "2024-01-01", bank="dated"))
+    os.chmod(path, 0o644)
+    assert IfscStore(path).compact() == 2
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+    rows = {row["IFSC"]: row["Bank"] for row in read_rows(path)}
+    assert rows == {"C1": "new", "C2": "dated"}
+    assert not [name for name in os.listdir(tmp_path)
+                if name.endswith(".tmp")]
+
+
+def append_rows(path, worker, count):
+    with IfscStore(path, batch_size=7) as store:
+        for i in range(count):
+            store.add(record(f"W{worker}-{i}", "2024-01-01 00:00:00"))
+
+
+def test_concurrent_appends_lose_no_rows(tmp_path):
+    path = str(tmp_path / "IFSC_CODE.csv")
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=append_rows, args=(path, w, 200))
+             for w in range(4)]
+    for proc in procs:
+        proc.start()
+    # Compaction during the appends must not drop what they wrote.
+    for _ in range(5):
+        IfscStore(path).compact()
+    for proc in procs:
+        proc.join()
+        assert proc.exitcode == 0
+
+    rows = read_rows(path)
+    assert all(None not in row for row in rows)
+    assert {row["IFSC"] for row in rows} == {
+        f"W{w}-{i}" for w in range(4) for i in range(200)
+    }
+    assert open(path).read().count("IFSC,Bank") == 1
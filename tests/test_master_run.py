@@ -0,0 +1,156 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pytest
+
+import master_run
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def warm_server():
+    # A short socket path: AF_UNIX paths are limited to about 100 bytes.
+    folder = tempfile.mkdtemp(prefix="mr-")
+    path = os.path.join(folder, "s.sock")
+    env = dict(os.environ, MASTER_RUN_SOCKET=path)
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, "master_run.py"), "--serve",
+         "--preload=json"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        # The socket file appears at bind(), before the server listens.
+        for _ in range(200):
+            probe = master_run._connect(path)
+            if probe is not None:
+                probe.close()
+                break
+            time.sleep(0.02)
+        yield path
+    finally:
+        master_run.stop_server(path)
+        try:
+            server.wait(5)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def run_warm(path, script, args):
+    conn = master_run._connect(path)
+    assert conn is not None, "warm server is not listening"
+    return master_run.run_script_warm(script, args, conn)
+
+
+def test_warm_server_runs_scripts_in_the_callers_cwd(warm_server, tmp_path,
+                                                     monkeypatch):
+    script = tmp_path / "job.py"
+    script.write_text(
+        "import os, sys\n"
+        "open('out.txt', 'w').write(os.getcwd() + '|' + ' '.join(sys.argv[1:]))\n"
+        "sys.exit(int(sys.argv[1]))\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    for code in (0, 3):
+        returncode, metrics = run_warm(warm_server, str(script), [str(code), "x"])
+        assert returncode == code
+        assert metrics["wall"] > 0 and metrics["max_rss_kb"] > 0
+        assert (tmp_path / "out.txt").read_text() == f"{tmp_path}|{code} x"
+
+
+def test_silent_client_does_not_block_others(warm_server, tmp_path, monkeypatch):
+    script = tmp_path / "job.py"
+    script.write_text("pass\n")
+    monkeypatch.chdir(tmp_path)
+    silent = master_run._connect(warm_server)
+    try:
+        start = time.perf_counter()
+        assert run_warm(warm_server, str(script), [])[0] == 0
+        assert time.perf_counter() - start < master_run.REQUEST_TIMEOUT
+    finally:
+        silent.close()
+
+
+def test_stop_server_removes_the_socket(warm_server):
+    assert master_run.stop_server(warm_server)
+    for _ in range(200):
+        if not os.path.exists(warm_server):
+            break
+        time.sleep(0.02)
+    assert master_run._connect(warm_server) is None
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("-r base.txt", ("r", "base.txt")),
+    ("-rbase.txt", ("r", "base.txt")),
+    ("--requirement=base.txt", ("r", "base.txt")),
+    ("--requirement base.txt", ("r", "base.txt")),
+    ("-c pins.txt", ("c", "pins.txt")),
+    ("--constraint=pins.txt", ("c", "pins.txt")),
+    ("--requirements.txt", None),
+    ("-r", None),
+    ("-e .", None),
+    ("pandas>=2", None),
+])
+def test_include_target_spellings(line, expected):
+    assert master_run.include_target(line) == expected
+
+
+def test_read_requirements_follows_includes(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "base.txt").write_text(
+        "numpy>=1  # inline comment\n-r ../requirements.txt\n"
+    )
+    (tmp_path / "pins.txt").write_text("numpy==1.26.4\n")
+    req = tmp_path / "requirements.txt"
+    req.write_text(
+        "# top\n--requirement=sub/base.txt\n-cpins.txt\n"
+        "--index-url https://example.invalid\npandas[excel]>=2\n"
+    )
+    requirements, raw = master_run.read_requirements(str(req))
+    assert [str(r) for r in requirements] == ["numpy>=1", "pandas[excel]>=2"]
+    # Every file read feeds the cache key, constraints included.
+    assert b"numpy==1.26.4" in raw and b"numpy>=1" in raw
+
+
+def test_unsatisfied_reports_missing_and_wrong_versions():
+    Requirement = master_run.Requirement
+    missing = master_run.unsatisfied([
+        Requirement("pytest>=1"),
+        Requirement("no-such-package-for-master-run==1.0"),
+        Requirement("pytest<1"),
+        Requirement('pytest<1; python_version < "3"'),
+    ])
+    assert missing[0] == "no-such-package-for-master-run==1.0"
+    assert missing[1].startswith("pytest<1 (installed ")
+    assert len(missing) == 2
+
+
+def test_install_dependencies_caches_the_verdict(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    req = tmp_path / "requirements.txt"
+    req.write_text("pytest>=1\n")
+    checks = []
+    real_unsatisfied = master_run.unsatisfied
+    monkeypatch.setattr(master_run, "unsatisfied",
+                        lambda *a: checks.append(a) or real_unsatisfied(*a))
+
+    master_run.install_dependencies(str(req))
+    assert len(checks) == 1
+    key = master_run.load_verdict(str(req))
+    assert key == master_run.dependency_key(req.read_bytes())
+
+    # Same file, same environment: no metadata scan.
+    master_run.install_dependencies(str(req))
+    assert len(checks) == 1
+
+    req.write_text("pytest>=1\npluggy\n")
+    master_run.install_dependencies(str(req))
+    assert len(checks) == 2
+    assert master_run.load_verdict(str(req)) != key
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from numeric_summary import DEFAULT_K, QuantileSketch
+
+LEVELS = np.linspace(0.01, 0.99, 99)
+
+
+def sample(dist, n, seed):
+    rng = np.random.default_rng(seed)
+    if dist == "lognormal":
+        return rng.lognormal(size=n)
+    values = rng.normal(size=n)
+    return np.sort(values) if dist == "sorted" else values
+
+
+def rank_error(values, chunk, k, seed):
+    # Largest gap between q and the true rank of the sketch's q-quantile.
+    sketch = QuantileSketch(k, seed=seed)
+    for start in range(0, len(values), chunk):
+        sketch.update(values[start:start + chunk])
+    ranks = np.searchsorted(np.sort(values), sketch.quantile(LEVELS),
+                            side="right") / len(values)
+    return np.max(np.abs(ranks - LEVELS))
+
+
+@pytest.mark.parametrize("dist", ["normal", "lognormal", "sorted"])
+@pytest.mark.parametrize("chunk", [1_000, 100_000])
+def test_rank_error_stays_under_one_percent(dist, chunk):
+    errors = [
+        rank_error(sample(dist, 300_000, seed), chunk, DEFAULT_K, seed)
+        for seed in range(4)
+    ]
+    assert max(errors) < 0.01
+
+
+def test_merged_shards_keep_the_bound():
+    values = sample("normal", 400_000, 7)
+    merged = QuantileSketch(seed=0)
+    for i, shard in enumerate(np.array_split(values, 4)):
+        part = QuantileSketch(seed=i)
+        part.update(shard)
+        merged.merge(part)
+    ranks = np.searchsorted(np.sort(values), merged.quantile(LEVELS),
+                            side="right") / len(values)
+    assert merged.n == len(values)
+    assert np.max(np.abs(ranks - LEVELS)) < 0.01
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+import pandas_advance_step as advance
+
+
+def in_memory(path, optimize=False):
+    ctx = advance.SimpleNamespace(output=str(path), age_mean=None,
+                                  optimize=optimize, append=False)
+    advance.steps.run(None, ctx, echo=False)
+    return path.read_text()
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+@pytest.mark.parametrize("chunksize", [1, 2, 100])
+def test_streaming_matches_the_in_memory_run(tmp_path, chunksize, optimize):
+    expected = in_memory(tmp_path / "memory.csv", optimize)
+    source = tmp_path / "source.csv"
+    advance.create_dataframe().to_csv(source, index=False)
+    target = tmp_path / "streamed.csv"
+    rows, _ = advance.stream(str(source), str(target), chunksize,
+                             optimize=optimize)
+    assert rows == 5
+    assert target.read_text() == expected
+
+
+def test_optimize_reaches_every_chunk(tmp_path, monkeypatch):
+    seen = []
+    real = advance.optimize_dtypes
+    monkeypatch.setattr(advance, "optimize_dtypes",
+                        lambda df: seen.append(len(df)) or real(df))
+    source = tmp_path / "source.csv"
+    advance.create_dataframe().to_csv(source, index=False)
+    advance.stream(str(source), str(tmp_path / "out.csv"), 2, optimize=True)
+    assert seen == [2, 2, 1]
+
+
+def test_source_without_join_date_is_rejected(tmp_path):
+    source = tmp_path / "source.csv"
+    advance.create_dataframe().drop(columns="JoinDate").to_csv(source, index=False)
+    with pytest.raises(ValueError, match="no JoinDate column"):
+        advance.stream(str(source), str(tmp_path / "out.csv"))
+    rows, _ = advance.stream(str(source), str(tmp_path / "out.csv"),
+                             only=[2, 3, 5, 6])
+    assert rows == 5
+    assert "JoinDate" not in pd.read_csv(tmp_path / "out.csv")
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from partition_join import join, partitioned_join
+
+LEFT = pd.DataFrame({"EmpID": [1.0, np.nan, 3.0, 2.0], "Name": list("abcd")})
+RIGHT = pd.DataFrame({"EmpID": [2.0, np.nan, 1.0, 1.0], "Dept": list("wxyz")})
+
+
+def both_paths(left, right, how):
+    indexed = pd.concat(join(left, right, "EmpID", how), ignore_index=True)
+    partitioned = pd.concat(
+        partitioned_join(left, right, "EmpID", how, parts=3, workers=1),
+        ignore_index=True,
+    )
+    return indexed, partitioned
+
+
+def ordered(frame):
+    return frame.sort_values(list(frame.columns)).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("how", ["inner", "left"])
+def test_paths_agree_and_missing_keys_match_nothing(how):
+    indexed, partitioned = both_paths(LEFT, RIGHT, how)
+    pd.testing.assert_frame_equal(ordered(indexed), ordered(partitioned))
+    assert "x" not in set(indexed["Dept"].dropna())
+    missing = indexed[indexed["EmpID"].isna()]
+    assert len(missing) == (how == "left")
+    assert missing["Dept"].isna().all()
+
+
+def test_object_keys_with_missing_values():
+    left = pd.DataFrame({"Code": ["a", None, "b"], "N": [1, 2, 3]})
+    right = pd.DataFrame({"Code": ["b", None, "a"], "D": [4, 5, 6]})
+    joined = pd.concat(join(left, right, "Code", "left"), ignore_index=True)
+    assert joined["D"].tolist()[::2] == [6, 4]
+    assert pd.isna(joined["D"][1])
+
+
+@pytest.mark.parametrize("how", ["inner", "left"])
+def test_empty_left_gives_empty_frame_with_joined_columns(how):
+    for result in both_paths(LEFT.iloc[:0], RIGHT, how):
+        assert len(result) == 0
+        assert list(result.columns) == ["EmpID", "Name", "Dept"]
@@ -0,0 +1,32 @@
+import os
+
+import pipeline
+
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def test_local_imports_follow_local_modules(tmp_path):
+    write(tmp_path / "main.py", "import os\nimport helper\n"
+                                "def later():\n    from lazy import x\n")
+    write(tmp_path / "helper.py", "from deep import y\nimport numpy\n")
+    write(tmp_path / "lazy.py", "x = 1\n")
+    write(tmp_path / "deep.py", "y = 2\n")
+    write(tmp_path / "unused.py", "")
+    found = pipeline.local_imports(str(tmp_path / "main.py"))
+    assert [os.path.basename(p) for p in found] == [
+        "deep.py", "helper.py", "lazy.py"
+    ]
+
+
+def test_step_sources_cover_the_pipeline_imports():
+    import call_python
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    step = next(s for s in call_python.pipeline_steps("SBIN0000001")
+                if s["name"] == "numpy_advance")
+    step = dict(step, script=os.path.join(root, step["script"]))
+    names = {os.path.basename(p) for p in pipeline.step_sources(step)}
+    assert {"steps.py", "rolling.py", "record_store.py"} <= names
@@ -0,0 +1,64 @@
+import pytest
+
+from check_missing import read_headers, split_ranges
+from profile_columns import (
+    merge_profiles, new_profiles, profile_file, profile_range,
+)
+
+
+@pytest.fixture
+def source(tmp_path):
+    # Few enough numbers that the quantile sketch stays exact, and a
+    # column that turns from numbers to text halfway through the file.
+    lines = ["id,amount,joined,city,mixed"]
+    for i in range(300):
+        amount = "" if i % 7 == 0 else f"{(i * 37) % 101 / 4}"
+        mixed = str(i) if i < 150 else f"x{i}"
+        city = ["Pune", "Delhi", "Goa", "nan"][i % 4]
+        lines.append(f"{i},{amount},2024-01-{i % 28 + 1:02d},{city},{mixed}")
+    path = tmp_path / "data.csv"
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+
+def summaries(profiles):
+    return {name: p.summary(top=3) for name, p in profiles.items()}
+
+
+def assert_same(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name, summary in expected.items():
+        other = dict(actual[name])
+        for key in ("mean", "std"):
+            if key in summary:
+                assert other.pop(key) == pytest.approx(summary[key])
+        assert other == {k: v for k, v in summary.items()
+                         if k not in ("mean", "std")}
+
+
+def test_single_pass_summary(source):
+    profiles = summaries(profile_file(source, chunksize=64))
+    assert profiles["id"]["type"] == "integer"
+    assert (profiles["id"]["min"], profiles["id"]["max"]) == (0, 299)
+    assert profiles["amount"]["nulls"] == 43
+    assert profiles["joined"]["type"] == "datetime"
+    assert profiles["city"]["nulls"] == 75
+    assert profiles["mixed"]["type"] == "string"
+
+
+@pytest.mark.parametrize("shards", [2, 3, 7])
+def test_shard_merge_equals_single_pass(source, shards):
+    expected = summaries(profile_file(source, chunksize=64))
+    headers, data_start = read_headers(source)
+    merged = new_profiles(headers)
+    for start, end in split_ranges(source, data_start, shards):
+        merge_profiles(
+            merged, profile_range((source, start, end, headers, 64))
+        )
+    assert_same(summaries(merged), expected)
+
+
+def test_worker_pool_equals_single_pass(source):
+    expected = summaries(profile_file(source, chunksize=64))
+    assert_same(summaries(profile_file(source, chunksize=64, workers=3)),
+                expected)
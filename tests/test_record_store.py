@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from record_store import EMPLOYEE_SCHEMA, RecordStore, schema_dtype
+
+
+def test_employee_fields_are_eight_byte_aligned():
+    dtype = schema_dtype(EMPLOYEE_SCHEMA)
+    assert dtype.itemsize % 8 == 0
+    assert all(dtype.fields[name][1] % 8 == 0 for name in dtype.names)
+
+
+def test_missing_integer_is_an_error(tmp_path):
+    store = RecordStore.create(str(tmp_path / "emp.rec"))
+    frame = pd.DataFrame({"EmpID": [1.0, np.nan], "Salary": [1.0, 2.0]})
+    with pytest.raises(ValueError, match="EmpID has missing values"):
+        store.from_frame(frame)
+    assert len(store) == 0
+
+
+def test_round_trip_keeps_age_precision(tmp_path):
+    store = RecordStore.create(str(tmp_path / "emp.rec"))
+    frame = pd.DataFrame({"EmpID": [1, 2], "Age": [33.25, 41.123456789]})
+    store.append(frame)
+    back = store.to_frame()
+    assert back["Age"].tolist() == [33.25, 41.123456789]
+    assert back["EmpID"].tolist() == [1, 2]
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+from rolling import RollingWindow, rolling
+
+
+def drifting(n, slope, noise, seed=0):
+    rng = np.random.default_rng(seed)
+    return 1e6 + slope * np.arange(n) + rng.normal(0, noise, n)
+
+
+@pytest.mark.parametrize("slope, noise, window", [
+    (1.0, 0.01, 20), (50.0, 1.0, 7), (1.0, 1.0, 5000),
+])
+def test_variance_on_drifting_series(slope, noise, window):
+    values = drifting(60_000, slope, noise)
+    expected = sliding_window_view(values, window).var(axis=1)
+    got = rolling(values, window, stats=("var",))["var"]
+    np.testing.assert_allclose(got, expected, rtol=1e-5)
+
+
+def test_results_do_not_depend_on_chunking():
+    values = drifting(30_000, 3.0, 0.5)
+    values[[5, 4096, 9000, 9001]] = np.nan
+    whole = rolling(values, 50)
+    for pieces in (7, 37, 300):
+        roller = RollingWindow(50)
+        parts = [roller.update(c) for c in np.array_split(values, pieces)]
+        for name, expected in whole.items():
+            got = np.concatenate([part[name] for part in parts])
+            np.testing.assert_array_equal(got, expected)
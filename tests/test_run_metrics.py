@@ -0,0 +1,80 @@
+import sys
+
+import pytest
+
+import run_metrics
+from run_metrics import compare, load, new_record, run_measured, write_record
+
+
+def step(wall=1.0, rss=100_000, **extra):
+    return {"status": "ok", "wall": wall, "user": wall, "system": 0.1,
+            "max_rss_kb": rss, "read_blocks": 0, "write_blocks": 0, **extra}
+
+
+def test_compare_flags_growth_past_threshold_and_floor():
+    baseline = new_record({"load": step(), "join": step(), "tiny": step(0.01)})
+    current = new_record({
+        "load": step(wall=1.5),           # +50%: regression
+        "join": step(wall=1.2),           # +20%: under the threshold
+        "tiny": step(wall=0.04),          # 4x, but under the noise floor
+        "new": step(wall=9.0),            # no baseline to compare with
+    })
+    assert compare(baseline, current) == [
+        ("load", "wall", 1.0, 1.5, pytest.approx(0.5)),
+        ("load", "user", 1.0, 1.5, pytest.approx(0.5)),
+    ]
+    assert [r[:2] for r in compare(baseline, current, threshold=0.1)] == [
+        ("load", "wall"), ("load", "user"), ("join", "wall"), ("join", "user"),
+    ]
+
+
+def test_compare_skips_cached_and_failed_steps():
+    baseline = new_record({"a": step(), "b": {"status": "failed"},
+                           "c": step(rss=10_000)})
+    current = new_record({"a": step(wall=5.0, cached=True), "b": step(),
+                          "c": step(rss=50_000)})
+    assert compare(baseline, current) == [
+        ("c", "max_rss_kb", 10_000, 50_000, pytest.approx(4.0)),
+    ]
+
+
+def test_record_round_trip(tmp_path):
+    record = new_record({"load": step()})
+    path = write_record(record, str(tmp_path / "run.json"))
+    assert load(path) == record
+
+
+def test_write_record_defaults_to_the_run_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = write_record(new_record({}))
+    assert path.startswith(run_metrics.DEFAULT_RUN_DIR)
+    assert load(path)["steps"] == {}
+
+
+def test_run_measured_reports_the_child_usage():
+    code, metrics = run_measured([
+        sys.executable, "-c",
+        "import sys; b = bytearray(64 << 20); sys.exit(3)",
+    ])
+    assert code == 3
+    assert metrics["wall"] > 0
+    assert metrics["max_rss_kb"] > 64 * 1024
+
+
+def test_compare_command_exits_nonzero_on_regression(tmp_path, monkeypatch,
+                                                     capsys):
+    before = write_record(new_record({"load": step()}),
+                          str(tmp_path / "a.json"))
+    after = write_record(new_record({"load": step(wall=2.0)}),
+                         str(tmp_path / "b.json"))
+    monkeypatch.setattr(sys, "argv", ["run_metrics.py", "compare", before,
+                                      after])
+    with pytest.raises(SystemExit) as exc:
+        run_metrics.main()
+    assert exc.value.code == 1
+    assert "REGRESSION load.wall: 1.0 -> 2.0 (+100%)" in capsys.readouterr().out
+
+    monkeypatch.setattr(sys, "argv", ["run_metrics.py", "compare", before,
+                                      before])
+    run_metrics.main()
+    assert "No regressions" in capsys.readouterr().out
@@ -0,0 +1,72 @@
+import argparse
+from types import SimpleNamespace
+
+import pytest
+
+import pandas_basic_step
+from steps import StepRegistry, parse_steps
+
+
+@pytest.fixture
+def registry():
+    # 1 <- 2 <- 4, 1 <- 3, 5 stands alone.
+    registry = StepRegistry()
+    for number, requires in ((1, ()), (2, (1,)), (3, (1,)), (4, (2,)),
+                             (5, ())):
+        registry.step(number, f"STEP {number}", requires)(
+            lambda ctx, n=number: ctx.ran.append(n)
+        )
+    return registry
+
+
+@pytest.mark.parametrize("numbers, expected", [
+    (None, [1, 2, 3, 4, 5]),
+    ([4], [1, 2, 4]),
+    ([5], [5]),
+    ([3, 4], [1, 2, 3, 4]),
+    ([4, 4, 2], [1, 2, 4]),
+])
+def test_select_pulls_in_requirements_in_order(registry, numbers, expected):
+    assert registry.select(numbers) == expected
+
+
+def test_run_follows_the_selection(registry):
+    ctx = SimpleNamespace(ran=[])
+    timings = registry.run([3, 4], ctx, echo=False)
+    assert ctx.ran == [1, 2, 3, 4]
+    assert [number for number, _ in timings] == [1, 2, 3, 4]
+
+
+def test_unknown_steps_are_rejected(registry):
+    with pytest.raises(KeyError, match=r"unknown steps \[7, 9\]; steps are 1-5"):
+        registry.select([1, 9, 7])
+    with pytest.raises(ValueError, match="step 1 is registered twice"):
+        registry.step(1, "again")(lambda ctx: None)
+
+
+def test_steps_argument(registry):
+    assert parse_steps("1-3, 5,") == [1, 2, 3, 5]
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_steps("one")
+    assert registry.parse_args("x", ["--steps", "4"]).steps == [4]
+    with pytest.raises(SystemExit):
+        registry.parse_args("x", ["--steps", "2,8"])
+
+
+def test_unknown_group_column_lists_the_columns(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(SystemExit) as exc:
+        pandas_basic_step.main(["--steps", "19", "--group-by", "Dept"])
+    assert str(exc.value) == (
+        "--group-by Dept: no such column; columns are "
+        "EmpID, Name, Age, Country, Salary, Department"
+    )
+    assert not (tmp_path / "employees_final.xlsx").exists()
+
+
+def test_group_by_pulls_in_the_join(tmp_path, monkeypatch):
+    pytest.importorskip("openpyxl")
+    monkeypatch.chdir(tmp_path)
+    ctx = pandas_basic_step.main(["--steps", "19", "--group-by", "Department"])
+    assert "Department" in ctx.df
+    assert (tmp_path / "employees_final.xlsx").exists()